@@ -0,0 +1,98 @@
+"""
+Benchmark dos métodos de detecção de cenas.
+
+Compara tempo de execução, frames por segundo e precisão dos cortes de cada
+método em relação a um método de referência (passada completa).
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.benchmark_scene_detection video1.mp4 [video2.mp4 ...]
+    python -m benchmarks.benchmark_scene_detection video.mp4 --methods adaptive two_pass --reference adaptive
+"""
+
+import argparse
+import logging
+import time
+from scenedetect import open_video
+from src.modules.scene_detector import SceneDetector, DETECTION_METHODS
+
+# Tolerância (em frames) para considerar dois cortes como o mesmo
+DEFAULT_TOLERANCE = 2
+
+
+def cut_frames(scene_list) -> list[int]:
+    """Extrai os frames de corte (início de cada cena, exceto a primeira)."""
+    return [start.get_frames() for start, _ in scene_list[1:]]
+
+
+def compare_cuts(reference: list[int], candidate: list[int], tolerance: int) -> dict:
+    """
+    Compara os cortes de um método com os cortes de referência.
+    
+    Returns:
+        Dicionário com precisão, recall e F1.
+    """
+    unmatched = list(reference)
+    matched = 0
+    for cut in candidate:
+        match = next((ref for ref in unmatched if abs(ref - cut) <= tolerance), None)
+        if match is not None:
+            unmatched.remove(match)
+            matched += 1
+    
+    precision = matched / len(candidate) if candidate else 1.0
+    recall = matched / len(reference) if reference else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': precision, 'recall': recall, 'f1': f1}
+
+
+def run_method(detector: SceneDetector, video_path: str, method: str) -> tuple[list[int], float]:
+    """Executa um método e retorna (cortes, tempo em segundos)."""
+    start = time.perf_counter()
+    scene_list = detector.detect_scenes(video_path, method)
+    elapsed = time.perf_counter() - start
+    return cut_frames(scene_list), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos métodos de detecção de cenas")
+    parser.add_argument('videos', nargs='+', help="Arquivos de vídeo usados no benchmark")
+    parser.add_argument('--methods', nargs='+', default=list(DETECTION_METHODS), choices=DETECTION_METHODS)
+    parser.add_argument('--reference', default='adaptive', choices=DETECTION_METHODS,
+                        help="Método usado como referência de precisão")
+    parser.add_argument('--tolerance', type=int, default=DEFAULT_TOLERANCE,
+                        help="Tolerância em frames para casar cortes")
+    parser.add_argument('--adaptive-threshold', type=float, default=3.0)
+    parser.add_argument('--content-threshold', type=float, default=27.0)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING)
+    detector = SceneDetector(
+        adaptive_threshold=args.adaptive_threshold,
+        content_threshold=args.content_threshold
+    )
+    methods = [args.reference] + [m for m in args.methods if m != args.reference]
+    
+    for video_path in args.videos:
+        total_frames = open_video(video_path).duration.get_frames()
+        print(f"\n{video_path} ({total_frames} frames)")
+        print(
+            f"{'método':<12} {'tempo (s)':>10} {'fps':>8} {'cortes':>8} "
+            f"{'precisão':>9} {'recall':>8} {'F1':>6} {'speedup':>8}"
+        )
+        
+        reference_cuts, reference_time = None, None
+        for method in methods:
+            cuts, elapsed = run_method(detector, video_path, method)
+            if reference_cuts is None:
+                reference_cuts, reference_time = cuts, elapsed
+            
+            scores = compare_cuts(reference_cuts, cuts, args.tolerance)
+            print(
+                f"{method:<12} {elapsed:>10.2f} {total_frames / elapsed:>8.1f} {len(cuts):>8} "
+                f"{scores['precision']:>9.3f} {scores['recall']:>8.3f} {scores['f1']:>6.3f} "
+                f"{reference_time / elapsed:>7.2f}x"
+            )
+
+
+if __name__ == '__main__':
+    main()
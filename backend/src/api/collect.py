@@ -4,19 +4,28 @@ Responsável apenas pela validação da requisição e disparo da tarefa Celery.
 """
 
 import logging
+import uuid
 from fastapi import APIRouter, HTTPException
-from src.models import CollectRequest, CollectResponse, TaskStatusResponse
-from src.tasks import collect_youtube_videos
+from src.models import CollectRequest, CollectResponse, ModeEnum, TaskStatusResponse
+from src.modules.collect_cache import get_collect_cache, make_collect_cache_key
+from src.tasks import annotate_collect_result, collect_youtube_videos
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/collect", tags=["collect"])
 
+# Prefixo dos task_id de resultados servidos pelo cache
+CACHE_TASK_PREFIX = "cache-"
+
 
 @router.post("/youtube", response_model=CollectResponse)
 async def collect_youtube(request: CollectRequest) -> CollectResponse:
     """
     Dispara uma tarefa de coleta de vídeos do YouTube.
     
+    Requisições idênticas reutilizam o resultado do cache. Resultados vencidos são
+    retornados imediatamente e atualizados em segundo plano por uma única tarefa.
+    O modo incremental não usa cache, pois depende das marcas d'água dos canais.
+    
     Args:
         request: Requisição com parâmetros de coleta
     
@@ -30,20 +39,70 @@ async def collect_youtube(request: CollectRequest) -> CollectResponse:
     try:
         logger.info(f"Disparando tarefa de coleta: {request.mode}")
         
-        # Disparar tarefa Celery de forma não-bloqueante
-        task = collect_youtube_videos.delay(
-            mode=request.mode.value,
-            search_query=request.search_query or "",
-            channel_ids=request.channel_ids or [],
-            filter_by=request.filter_by.value,
-            time_range=request.time_range.value,
-            max_duration=request.max_duration,
-        )
+        task_kwargs = {
+            'mode': request.mode.value,
+            'search_query': request.search_query or "",
+            'channel_ids': request.channel_ids or [],
+            'filter_by': request.filter_by.value,
+            'time_range': request.time_range.value,
+            'max_duration': request.max_duration,
+            'max_results': request.max_results,
+            'exclude_seen': request.exclude_seen,
+        }
+        
+        if request.mode == ModeEnum.INCREMENTAL:
+            task = collect_youtube_videos.delay(**task_kwargs)
+            logger.info(f"Tarefa disparada com ID: {task.id}")
+            return CollectResponse(
+                task_id=task.id,
+                status="PENDING",
+                message="Tarefa de coleta iniciada com sucesso",
+            )
+        
+        # A coleta bruta não depende de exclude_seen: as marcas de vistos são aplicadas por requisição
+        cache = get_collect_cache()
+        cache_key = make_collect_cache_key(**{
+            name: value for name, value in task_kwargs.items() if name != 'exclude_seen'
+        })
+        cached = cache.get(cache_key)
         
-        logger.info(f"Tarefa disparada com ID: {task.id}")
+        # Reservar a atualização: apenas uma tarefa por chave, mesmo com vários editores
+        task_id = None
+        if cached is None or cached[1]:
+            new_task_id = str(uuid.uuid4())
+            if not cache.acquire_refresh(cache_key, new_task_id):
+                task_id = cache.get_refresh_task(cache_key)
+            if task_id is None:
+                task_id = new_task_id
+                try:
+                    collect_youtube_videos.apply_async(
+                        kwargs={**task_kwargs, 'cache_key': cache_key},
+                        task_id=task_id,
+                    )
+                except Exception:
+                    # A task não foi enfileirada: não deixar a atualização reservada para ela
+                    cache.release_refresh(cache_key, task_id)
+                    raise
+                logger.info(f"Tarefa disparada com ID: {task_id}")
+            else:
+                logger.info(f"Coleta idêntica já em andamento: {task_id}")
         
+        if cached is not None:
+            result, stale = cached
+            cache.record('stale_hits' if stale else 'hits')
+            logger.info(f"Resultado de coleta encontrado no cache: {cache_key} (vencido: {stale})")
+            return CollectResponse(
+                task_id=f"{CACHE_TASK_PREFIX}{cache_key}",
+                status="SUCCESS",
+                message="Resultado obtido do cache" + (" (atualizando em segundo plano)" if stale else ""),
+                cached=True,
+                stale=stale,
+                result=annotate_collect_result(result, exclude_seen=request.exclude_seen),
+            )
+        
+        cache.record('misses')
         return CollectResponse(
-            task_id=task.id,
+            task_id=task_id,
             status="PENDING",
             message="Tarefa de coleta iniciada com sucesso",
         )
@@ -74,6 +133,13 @@ async def get_task_status(task_id: str) -> TaskStatusResponse:
     try:
         logger.info(f"Consultando status da tarefa: {task_id}")
         
+        if task_id.startswith(CACHE_TASK_PREFIX):
+            cached = get_collect_cache().get(task_id[len(CACHE_TASK_PREFIX):])
+            if cached is None:
+                raise HTTPException(status_code=404, detail="Resultado não encontrado no cache")
+            # Coleta bruta: as marcas de vistos acompanham a resposta da requisição de coleta
+            return TaskStatusResponse(task_id=task_id, status='SUCCESS', result=cached[0])
+        
         task = collect_youtube_videos.AsyncResult(task_id)
         
         if task.state == 'PENDING':
@@ -110,9 +176,31 @@ async def get_task_status(task_id: str) -> TaskStatusResponse:
         logger.info(f"Status da tarefa {task_id}: {task.state}")
         return response
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro ao consultar status: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao consultar status: {str(e)}"
         )
+
+
+@router.get("/cache/stats")
+async def get_cache_stats() -> dict:
+    """
+    Retorna os contadores do cache de coleta.
+    
+    Returns:
+        Acertos ('hits'), acertos com resultado vencido ('stale_hits'), falhas ('misses') e taxa de acerto
+    """
+    
+    try:
+        return get_collect_cache().get_stats()
+    
+    except Exception as e:
+        logger.error(f"Erro ao consultar o cache de coleta: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao consultar o cache de coleta: {str(e)}"
+        )
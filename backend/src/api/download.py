@@ -4,19 +4,36 @@ Responsável apenas pela validação da requisição e disparo da tarefa Celery.
 """
 
 import logging
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from src.tasks_download import download_youtube_video, download_multiple_youtube_videos, get_video_info_task, get_available_formats_task
 from src.models import TaskStatusResponse
+from src.modules.info_dict_cache import get_info_dict_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/download", tags=["download"])
 
 
+class TimeRange(BaseModel):
+    """Trecho de um vídeo, em segundos."""
+    start: float = Field(ge=0)
+    end: float
+    
+    @model_validator(mode='after')
+    def check_order(self):
+        """Garante que o trecho não é vazio."""
+        if self.end <= self.start:
+            raise ValueError("O fim do trecho deve ser maior que o início")
+        return self
+
+
 class DownloadRequest(BaseModel):
     """Requisição para download de vídeo."""
     video_url: str
     format_choice: str = "best"
+    force: bool = False  # Baixa novamente mesmo se o vídeo já foi baixado
+    sections: Optional[List[TimeRange]] = Field(default=None, max_length=50)  # Baixa apenas esses trechos
 
 
 class DownloadResponse(BaseModel):
@@ -30,6 +47,8 @@ class MultipleDownloadRequest(BaseModel):
     """Requisição para download múltiplo."""
     video_urls: list[str]
     format_choice: str = "best"
+    force: bool = False  # Baixa novamente os vídeos já baixados
+    max_workers: Optional[int] = Field(default=None, ge=1, le=16)  # Downloads simultâneos
 
 
 class VideoInfoRequest(BaseModel):
@@ -62,6 +81,8 @@ async def download_video(request: DownloadRequest) -> DownloadResponse:
         task = download_youtube_video.delay(
             video_url=request.video_url,
             format_choice=request.format_choice,
+            force=request.force,
+            sections=[(section.start, section.end) for section in request.sections] if request.sections else None,
         )
         
         logger.info(f"Tarefa de download disparada com ID: {task.id}")
@@ -105,6 +126,8 @@ async def download_multiple_videos(request: MultipleDownloadRequest) -> Download
         task = download_multiple_youtube_videos.delay(
             video_urls=request.video_urls,
             format_choice=request.format_choice,
+            force=request.force,
+            max_workers=request.max_workers,
         )
         
         logger.info(f"Tarefa de download múltiplo disparada com ID: {task.id}")
@@ -251,3 +274,23 @@ async def get_formats(request: VideoInfoRequest):
             status_code=500,
             detail=f"Erro ao obter formatos: {str(e)}"
         )
+
+
+@router.get("/info-cache/stats")
+async def get_info_cache_stats() -> dict:
+    """
+    Retorna os contadores do cache de informações dos vídeos.
+    
+    Returns:
+        Acertos ('hits'), falhas ('misses') e taxa de acerto
+    """
+    
+    try:
+        return get_info_dict_cache().get_stats()
+    
+    except Exception as e:
+        logger.error(f"Erro ao consultar o cache de informações: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao consultar o cache de informações: {str(e)}"
+        )
@@ -0,0 +1,217 @@
+"""
+Rotas da API para consultar a biblioteca de vídeos.
+Lê apenas o banco de metadados, sem acessar o YouTube ou o Redis.
+"""
+
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.repository import VideoRepository, get_session
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/v1/library", tags=["library"])
+
+
+class DownloadedVideo(BaseModel):
+    """Vídeo baixado registrado na biblioteca."""
+    id: str
+    video_id: Optional[str] = None
+    video_url: str
+    video_title: str
+    video_channel: str
+    file_path: str
+    file_size: Optional[int] = None
+    quality: Optional[str] = None
+    duration: Optional[int] = None
+    downloaded_at: Optional[str] = None
+    status: Optional[str] = None
+
+
+class CollectedVideoInfo(BaseModel):
+    """Vídeo encontrado em uma coleta."""
+    video_id: str
+    video_url: str
+    title: Optional[str] = None
+    channel: Optional[str] = None
+    duration: Optional[int] = None
+    upload_date: Optional[str] = None
+    source: Optional[str] = None
+    first_collected_at: Optional[str] = None
+    last_collected_at: Optional[str] = None
+
+
+class ClipInfo(BaseModel):
+    """Trecho de um vídeo (exportado de uma cena ou baixado por seção)."""
+    id: str
+    source_video_id: Optional[str] = None
+    title: str
+    start_time: Optional[int] = None
+    end_time: Optional[int] = None
+    duration: Optional[int] = None
+    file_path: Optional[str] = None
+    created_at: Optional[str] = None
+
+
+class DownloadedVideoPage(BaseModel):
+    """Página de vídeos baixados."""
+    total: int
+    items: List[DownloadedVideo]
+
+
+class CollectedVideoPage(BaseModel):
+    """Página de vídeos coletados."""
+    total: int
+    items: List[CollectedVideoInfo]
+
+
+class ClipPage(BaseModel):
+    """Página de trechos."""
+    total: int
+    items: List[ClipInfo]
+
+
+def _isoformat(value) -> Optional[str]:
+    """Converte datas do banco para ISO 8601."""
+    return value.isoformat() if value else None
+
+
+@router.get("/videos", response_model=DownloadedVideoPage)
+async def list_downloaded_videos(
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    channel: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+) -> DownloadedVideoPage:
+    """
+    Lista os vídeos baixados, do mais recente para o mais antigo.
+    
+    Args:
+        limit: Número máximo de vídeos na página
+        offset: Posição do primeiro vídeo da página
+        channel: Filtra pelo canal do vídeo
+    
+    Returns:
+        Página de vídeos e total
+    """
+    
+    try:
+        downloads, total = await VideoRepository(session).list_downloads(limit, offset, channel)
+        return DownloadedVideoPage(
+            total=total,
+            items=[
+                DownloadedVideo(
+                    id=download.id,
+                    video_id=download.video_id,
+                    video_url=download.video_url,
+                    video_title=download.video_title,
+                    video_channel=download.video_channel,
+                    file_path=download.file_path,
+                    file_size=download.file_size,
+                    quality=download.quality,
+                    duration=download.duration,
+                    downloaded_at=_isoformat(download.downloaded_at),
+                    status=download.status,
+                )
+                for download in downloads
+            ],
+        )
+    
+    except Exception as e:
+        logger.error(f"Erro ao listar a biblioteca: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao listar a biblioteca: {str(e)}"
+        )
+
+
+@router.get("/collected", response_model=CollectedVideoPage)
+async def list_collected_videos(
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    session: AsyncSession = Depends(get_session),
+) -> CollectedVideoPage:
+    """
+    Lista os vídeos encontrados nas coletas, dos vistos mais recentemente para os mais antigos.
+    
+    Args:
+        limit: Número máximo de vídeos na página
+        offset: Posição do primeiro vídeo da página
+    
+    Returns:
+        Página de vídeos e total
+    """
+    
+    try:
+        videos, total = await VideoRepository(session).list_collected(limit, offset)
+        return CollectedVideoPage(
+            total=total,
+            items=[
+                CollectedVideoInfo(
+                    video_id=video.video_id,
+                    video_url=video.video_url,
+                    title=video.title,
+                    channel=video.channel,
+                    duration=video.duration,
+                    upload_date=video.upload_date,
+                    source=video.source,
+                    first_collected_at=_isoformat(video.first_collected_at),
+                    last_collected_at=_isoformat(video.last_collected_at),
+                )
+                for video in videos
+            ],
+        )
+    
+    except Exception as e:
+        logger.error(f"Erro ao listar os vídeos coletados: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao listar os vídeos coletados: {str(e)}"
+        )
+
+
+@router.get("/clips", response_model=ClipPage)
+async def list_clips(
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    video_id: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+) -> ClipPage:
+    """
+    Lista os trechos de vídeos, do mais recente para o mais antigo.
+    
+    Args:
+        limit: Número máximo de trechos na página
+        offset: Posição do primeiro trecho da página
+        video_id: Filtra pelo vídeo de origem
+    
+    Returns:
+        Página de trechos e total
+    """
+    
+    try:
+        clips, total = await VideoRepository(session).list_clips(limit, offset, video_id)
+        return ClipPage(
+            total=total,
+            items=[
+                ClipInfo(
+                    id=clip.id,
+                    source_video_id=clip.source_video_id,
+                    title=clip.title,
+                    start_time=clip.start_time,
+                    end_time=clip.end_time,
+                    duration=clip.duration,
+                    file_path=clip.file_path,
+                    created_at=_isoformat(clip.created_at),
+                )
+                for clip in clips
+            ],
+        )
+    
+    except Exception as e:
+        logger.error(f"Erro ao listar os trechos: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao listar os trechos: {str(e)}"
+        )
@@ -2,14 +2,28 @@
 Endpoints FastAPI para detecção de cenas.
 """
 
+import fcntl
+import hashlib
+import json
 import logging
 import os
-import shutil
-from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException
+import time
+import uuid
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
 from celery.result import AsyncResult
-from src.tasks_scene_detection import detect_scenes_task
+from src.tasks_scene_detection import detect_scenes_task, export_scene_clips_task
+from src.modules.scene_detector import DETECTION_METHODS, serialize_scenes
+from src.modules.scene_cache import FILE_HASH_PATTERN, compute_file_hash, make_cache_key, get_scene_cache
+from src.modules.scene_checkpoint import get_checkpoint_store
+from src.modules.youtube_downloader import YouTubeDownloader
+from src.modules.frame_metrics import FrameMetricsStore, METRIC_METHODS
+from src.settings import get_settings
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 router = APIRouter(prefix="/scene-detection", tags=["scene-detection"])
 
@@ -17,56 +31,249 @@ router = APIRouter(prefix="/scene-detection", tags=["scene-detection"])
 TEMP_UPLOAD_DIR = "/tmp/video_uploads"
 os.makedirs(TEMP_UPLOAD_DIR, exist_ok=True)
 
+# Prefixo dos IDs de resultados servidos diretamente do cache (sem task Celery)
+CACHE_TASK_PREFIX = "cache-"
+
+# Uploads são gravados em blocos, sem carregar o arquivo inteiro na memória
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MB
+PART_SUFFIX = ".part"
+
+
+class ThresholdSweepRequest(BaseModel):
+    """Requisição para testar vários thresholds sobre as métricas persistidas."""
+    file_hash: str = Field(pattern=FILE_HASH_PATTERN)
+    method: str = "adaptive"
+    thresholds: list[float]
+
+
+class LibraryDetectRequest(BaseModel):
+    """Requisição para detectar cenas em um vídeo já baixado."""
+    video_id: Optional[str] = None
+    filename: Optional[str] = None
+    method: str = "adaptive"
+    adaptive_threshold: float = 3.0
+    content_threshold: float = 27.0
+    shards: int = Field(default=1, ge=1, le=settings.max_scene_shards)
+    shard_overlap: float = Field(default=5.0, ge=0)
+
+
+class ClipExportRequest(BaseModel):
+    """Requisição para exportar as cenas de uma detecção como clipes."""
+    task_id: str
+    video_id: Optional[str] = None
+    scene_indices: Optional[list[int]] = None
+    max_workers: Optional[int] = None
+
+
+class UploadInitRequest(BaseModel):
+    """Requisição para iniciar um upload em partes (retomável)."""
+    filename: str
+    size: int
+    sha256: Optional[str] = Field(default=None, pattern=r'^[0-9a-fA-F]{64}$')
+    # Parâmetros da detecção iniciada quando o arquivo já existe (como no /complete)
+    method: str = "adaptive"
+    adaptive_threshold: float = 3.0
+    content_threshold: float = 27.0
+    shards: int = Field(default=1, ge=1, le=settings.max_scene_shards)
+    shard_overlap: float = Field(default=5.0, ge=0)
+
+
+def _safe_extension(filename: str) -> str:
+    """Retorna a extensão do arquivo apenas com caracteres seguros."""
+    _, extension = os.path.splitext(filename)
+    return "".join(c for c in extension if c.isalnum() or c == '.')
+
+
+def _content_path(sha256_hex: str, extension: str) -> str:
+    """Caminho do upload endereçado pelo conteúdo (`<sha256><extensão>`)."""
+    return os.path.join(TEMP_UPLOAD_DIR, f"{sha256_hex}{extension}")
+
+
+def _find_upload_by_hash(sha256_hex: str) -> Optional[str]:
+    """Procura um upload já existente com o mesmo conteúdo, qualquer que seja a extensão."""
+    for name in os.listdir(TEMP_UPLOAD_DIR):
+        if os.path.splitext(name)[0] == sha256_hex and not name.endswith(PART_SUFFIX):
+            return os.path.join(TEMP_UPLOAD_DIR, name)
+    return None
+
+
+def _finalize_upload(part_path: str, sha256_hex: str, extension: str) -> str:
+    """
+    Move o arquivo parcial para o caminho endereçado pelo conteúdo.
+    Se o mesmo conteúdo já existir, descarta o arquivo parcial em vez de duplicá-lo.
+    """
+    existing = _find_upload_by_hash(sha256_hex)
+    if existing:
+        os.remove(part_path)
+        os.utime(existing)  # Renovar a retenção do arquivo reaproveitado
+        logger.info(f"Upload duplicado descartado, reaproveitando: {existing}")
+        return existing
+    
+    file_location = _content_path(sha256_hex, extension)
+    os.replace(part_path, file_location)
+    logger.info(f"Arquivo salvo temporariamente em: {file_location}")
+    return file_location
+
+
+def _write_chunk(f, digest, chunk: bytes) -> None:
+    """Grava um bloco e atualiza o hash (executado na threadpool)."""
+    f.write(chunk)
+    if digest is not None:
+        digest.update(chunk)
+
+
+def _lock_part(f) -> bool:
+    """Reserva o arquivo parcial para uma única requisição (também entre processos da API)."""
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
+def _truncate(f, size: int) -> None:
+    """Descarta os bytes gravados após `size` (executado na threadpool)."""
+    f.flush()
+    f.truncate(size)
+
+
+def _hash_file(file_path: str) -> str:
+    """Calcula o SHA-256 completo de um arquivo."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def _save_upload(file: UploadFile) -> tuple[str, str]:
+    """
+    Grava um upload em blocos sem bloquear o event loop, calculando o SHA-256 durante a cópia.
+    
+    Returns:
+        Tupla (caminho do arquivo, file_hash)
+    """
+    digest = hashlib.sha256()
+    part_path = os.path.join(TEMP_UPLOAD_DIR, f"{uuid.uuid4().hex}{PART_SUFFIX}")
+    
+    try:
+        f = await run_in_threadpool(open, part_path, 'wb')
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await run_in_threadpool(_write_chunk, f, digest, chunk)
+        finally:
+            await run_in_threadpool(f.close)
+    except Exception:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    
+    sha256_hex = digest.hexdigest()
+    file_location = await run_in_threadpool(_finalize_upload, part_path, sha256_hex, _safe_extension(file.filename))
+    return file_location, f"sha256:{sha256_hex}"
+
+
+def _prune_stale_uploads() -> None:
+    """Remove uploads (completos ou parciais) mais antigos que o período de retenção."""
+    cutoff = time.time() - settings.scene_upload_retention_hours * 3600
+    for name in os.listdir(TEMP_UPLOAD_DIR):
+        path = os.path.join(TEMP_UPLOAD_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                logger.info(f"Upload antigo removido: {path}")
+        except OSError:
+            pass
+
 @router.post("/detect")
 async def detect_scenes(
     file: UploadFile = File(..., description="Arquivo de vídeo para análise."),
     method: str = "adaptive",
     adaptive_threshold: float = 3.0,
     content_threshold: float = 27.0,
+    shards: int = Query(1, ge=1, le=settings.max_scene_shards),
+    shard_overlap: float = Query(5.0, ge=0),
 ):
     """
     Inicia a detecção de cenas em um vídeo.
-    O vídeo é salvo temporariamente e a tarefa é enfileirada no Celery.
+    O vídeo é salvo temporariamente (endereçado pelo SHA-256 do conteúdo, sem duplicatas)
+    e a tarefa é enfileirada no Celery.
     """
     
-    # 1. Salvar arquivo temporário com nome padronizado (sem espaços)
-    # Gerar um nome de arquivo seguro e único
-    original_filename, file_extension = os.path.splitext(file.filename)
-    # Remove espaços e caracteres especiais, mantendo apenas letras, números e hífens
-    safe_filename = "".join(c if c.isalnum() or c in ('-', '_') else '_' for c in original_filename).strip('_')
+    if method not in DETECTION_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Método inválido: {method}. Use um de: {', '.join(DETECTION_METHODS)}."
+        )
     
-    # Adicionar um timestamp ou UUID para garantir unicidade, mas por simplicidade, usaremos um nome seguro
-    # Para o caso de upload, vamos usar um nome seguro e a extensão original
+    # 1. Gravar o upload em blocos, calculando o hash do conteúdo durante a cópia
+    await run_in_threadpool(_prune_stale_uploads)
     
-    # Se o nome seguro estiver vazio, use 'uploaded_file'
-    if not safe_filename:
-        safe_filename = "uploaded_file"
-        
-    # Construir o caminho final do arquivo
-    file_location = os.path.join(TEMP_UPLOAD_DIR, f"{safe_filename}{file_extension}")
-    
-    # Se o arquivo já existir (improvável, mas possível), adicione um número
-    counter = 1
-    while os.path.exists(file_location):
-        file_location = os.path.join(TEMP_UPLOAD_DIR, f"{safe_filename}_{counter}{file_extension}")
-        counter += 1
-        
     try:
-        with open(file_location, "wb") as f:
-            shutil.copyfileobj(file.file, f)
-        logger.info(f"Arquivo salvo temporariamente em: {file_location}")
+        file_location, file_hash = await _save_upload(file)
     except Exception as e:
         logger.error(f"Erro ao salvar arquivo: {e}")
         raise HTTPException(status_code=500, detail="Erro ao salvar o arquivo de vídeo.")
     finally:
-        file.file.close()
+        await file.close()
+    
+    return _start_detection(
+        file_location,
+        file_hash,
+        file.filename,
+        method=method,
+        adaptive_threshold=adaptive_threshold,
+        content_threshold=content_threshold,
+        shards=shards,
+        shard_overlap=shard_overlap,
+    )
+
+
+def _start_detection(
+    file_location: str,
+    file_hash: str,
+    filename: str,
+    method: str,
+    adaptive_threshold: float,
+    content_threshold: float,
+    shards: int,
+    shard_overlap: float,
+) -> dict:
+    """
+    Consulta o cache de resultados e, se necessário, enfileira a detecção de cenas.
+    """
+    
+    # 2. Consultar o cache pelo conteúdo do arquivo e parâmetros
+    cache_key = make_cache_key(
+        file_hash,
+        method,
+        adaptive_threshold=adaptive_threshold,
+        content_threshold=content_threshold,
+    )
+    cached_result = get_scene_cache().get(cache_key)
+    
+    if cached_result is not None:
+        logger.info(f"Resultado encontrado no cache: {cache_key}")
+        return {
+            'task_id': f"{CACHE_TASK_PREFIX}{cache_key}",
+            'status': 'SUCCESS',
+            'cache_hit': True,
+            'file_hash': file_hash,
+            'result': cached_result,
+            'message': 'Resultado obtido do cache.',
+            'filename': filename,
+        }
     
-    # 2. Enfileirar task no Celery
+    # 3. Enfileirar task no Celery
     task = detect_scenes_task.delay(
         video_path=file_location,
         method=method,
         adaptive_threshold=adaptive_threshold,
         content_threshold=content_threshold,
+        shards=shards,
+        shard_overlap=shard_overlap,
+        cache_key=cache_key,
+        file_hash=file_hash,
     )
     
     logger.info(f"Detecção de cenas iniciada. Task ID: {task.id}")
@@ -74,15 +281,303 @@ async def detect_scenes(
     return {
         'task_id': task.id,
         'status': 'processing',
+        'cache_hit': False,
+        'file_hash': file_hash,
         'message': 'Detecção de cenas iniciada. Use o endpoint /status/{task_id} para acompanhar.',
-        'filename': file.filename,
+        'filename': filename,
+    }
+
+@router.post("/detect-library")
+async def detect_library_scenes(request: LibraryDetectRequest):
+    """
+    Inicia a detecção de cenas em um vídeo já baixado (pasta de downloads),
+    identificado pelo `video_id` ou pelo nome do arquivo. O arquivo é lido
+    diretamente da biblioteca, sem upload nem cópia.
+    """
+    if request.method not in DETECTION_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Método inválido: {request.method}. Use um de: {', '.join(DETECTION_METHODS)}."
+        )
+    
+    downloader = YouTubeDownloader(output_path=settings.download_dir)
+    if request.video_id:
+        file_location = downloader.find_downloaded_file(request.video_id)
+    elif request.filename:
+        # Aceitar apenas arquivos dentro da pasta de downloads
+        candidate = os.path.join(settings.download_dir, os.path.basename(request.filename))
+        file_location = candidate if os.path.isfile(candidate) else None
+    else:
+        raise HTTPException(status_code=400, detail="Informe video_id ou filename.")
+    
+    if not file_location:
+        raise HTTPException(status_code=404, detail="Vídeo não encontrado na biblioteca.")
+    
+    file_hash = await run_in_threadpool(compute_file_hash, file_location)
+    
+    return _start_detection(
+        os.path.abspath(file_location),
+        file_hash,
+        os.path.basename(file_location),
+        method=request.method,
+        adaptive_threshold=request.adaptive_threshold,
+        content_threshold=request.content_threshold,
+        shards=request.shards,
+        shard_overlap=request.shard_overlap,
+    )
+
+
+@router.post("/resume/{task_id}")
+async def resume_detection(task_id: str):
+    """
+    Retoma manualmente uma detecção de cenas interrompida (ex: retries esgotados),
+    continuando do último checkpoint gravado pela task.
+    """
+    checkpoint = get_checkpoint_store().load_for_task(task_id)
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="Nenhum checkpoint encontrado para esta task.")
+    
+    task_kwargs = checkpoint['task_kwargs']
+    if not os.path.exists(task_kwargs['video_path']):
+        raise HTTPException(status_code=404, detail="Arquivo de vídeo da detecção não encontrado.")
+    
+    task = detect_scenes_task.delay(**task_kwargs)
+    
+    logger.info(f"Detecção de cenas {task_id} retomada do frame {checkpoint['frame']}. Task ID: {task.id}")
+    
+    return {
+        'task_id': task.id,
+        'status': 'processing',
+        'resumed_from': checkpoint['frame'],
+        'message': 'Detecção de cenas retomada. Use o endpoint /status/{task_id} para acompanhar.',
+    }
+
+
+@router.post("/export")
+async def export_clips(request: ClipExportRequest):
+    """
+    Exporta as cenas de uma detecção concluída como clipes, em paralelo.
+    Cenas que começam em keyframes são copiadas sem recodificação.
+    
+    O vídeo é localizado pelo resultado da detecção; para resultados vindos do
+    cache de vídeos da biblioteca, informe também o `video_id`.
+    """
+    if request.task_id.startswith(CACHE_TASK_PREFIX):
+        result = get_scene_cache().get(request.task_id[len(CACHE_TASK_PREFIX):])
+    else:
+        task = AsyncResult(request.task_id)
+        result = task.result if task.state == 'SUCCESS' else None
+    
+    if not result:
+        raise HTTPException(status_code=404, detail="Detecção não encontrada ou ainda não concluída.")
+    
+    video_path = result.get('video_path')
+    if not video_path and request.video_id:
+        video_path = YouTubeDownloader(output_path=settings.download_dir).find_downloaded_file(request.video_id)
+    if not video_path and (result.get('file_hash') or '').startswith('sha256:'):
+        video_path = _find_upload_by_hash(result['file_hash'].split(':', 1)[1])
+    if not video_path or not os.path.exists(video_path):
+        raise HTTPException(status_code=404, detail="Arquivo de vídeo da detecção não encontrado.")
+    
+    scenes = result['scenes']
+    if request.scene_indices:
+        try:
+            scenes = [scenes[index - 1] for index in request.scene_indices]
+        except IndexError:
+            raise HTTPException(status_code=400, detail="Índice de cena inválido.")
+    
+    task = export_scene_clips_task.delay(
+        video_path=os.path.abspath(video_path),
+        scenes=scenes,
+        max_workers=request.max_workers,
+    )
+    
+    logger.info(f"Exportação de {len(scenes)} clipes iniciada. Task ID: {task.id}")
+    
+    return {
+        'task_id': task.id,
+        'status': 'processing',
+        'clips_count': len(scenes),
+        'message': 'Exportação de clipes iniciada. Use o endpoint /status/{task_id} para acompanhar.',
+    }
+
+
+@router.post("/uploads")
+async def init_upload(request: UploadInitRequest):
+    """
+    Inicia um upload em partes, que pode ser retomado após falhas de conexão.
+    Se o SHA-256 informado corresponder a um arquivo já recebido, o upload é
+    dispensado e a detecção é iniciada (ou obtida do cache) sobre esse arquivo.
+    """
+    if request.method not in DETECTION_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Método inválido: {request.method}. Use um de: {', '.join(DETECTION_METHODS)}."
+        )
+    
+    if request.sha256:
+        existing = await run_in_threadpool(_find_upload_by_hash, request.sha256.lower())
+        if existing:
+            os.utime(existing)
+            logger.info(f"Upload dispensado, arquivo já existente: {existing}")
+            detection = _start_detection(
+                existing,
+                f"sha256:{request.sha256.lower()}",
+                request.filename,
+                method=request.method,
+                adaptive_threshold=request.adaptive_threshold,
+                content_threshold=request.content_threshold,
+                shards=request.shards,
+                shard_overlap=request.shard_overlap,
+            )
+            return {
+                'upload_id': None,
+                'complete': True,
+                **detection,
+            }
+    
+    await run_in_threadpool(_prune_stale_uploads)
+    upload_id = uuid.uuid4().hex
+    part_path = os.path.join(TEMP_UPLOAD_DIR, f"{upload_id}{PART_SUFFIX}")
+    with open(part_path, 'wb'):
+        pass
+    with open(os.path.join(TEMP_UPLOAD_DIR, f"{upload_id}.json"), 'w') as f:
+        json.dump({'filename': request.filename, 'size': request.size}, f)
+    
+    return {
+        'upload_id': upload_id,
+        'complete': False,
+        'offset': 0,
+        'size': request.size,
     }
 
+
+def _load_upload(upload_id: str) -> tuple[str, dict]:
+    """Retorna (caminho parcial, metadados) de um upload em partes."""
+    if not upload_id.isalnum():
+        raise HTTPException(status_code=400, detail="upload_id inválido.")
+    part_path = os.path.join(TEMP_UPLOAD_DIR, f"{upload_id}{PART_SUFFIX}")
+    meta_path = os.path.join(TEMP_UPLOAD_DIR, f"{upload_id}.json")
+    if not os.path.exists(part_path) or not os.path.exists(meta_path):
+        raise HTTPException(status_code=404, detail="Upload não encontrado ou expirado.")
+    with open(meta_path) as f:
+        return part_path, json.load(f)
+
+
+@router.get("/uploads/{upload_id}")
+async def get_upload(upload_id: str):
+    """Retorna quantos bytes do upload já foram recebidos (offset para retomar)."""
+    part_path, meta = _load_upload(upload_id)
+    return {
+        'upload_id': upload_id,
+        'offset': os.path.getsize(part_path),
+        'size': meta['size'],
+    }
+
+
+@router.put("/uploads/{upload_id}")
+async def upload_part(upload_id: str, offset: int, request: Request):
+    """
+    Recebe uma parte do arquivo (corpo bruto da requisição) a partir de `offset`.
+    O offset deve ser igual ao número de bytes já recebidos. Uma parte que
+    ultrapasse o tamanho declarado é descartada inteira.
+    """
+    part_path, meta = _load_upload(upload_id)
+    
+    f = await run_in_threadpool(open, part_path, 'ab')
+    try:
+        # Uma parte por vez: dois PUTs no mesmo offset gravariam os bytes duas vezes
+        if not _lock_part(f):
+            raise HTTPException(
+                status_code=409,
+                detail={'message': 'Outra parte deste upload está sendo recebida.', 'offset': os.path.getsize(part_path)},
+            )
+        
+        current_offset = os.path.getsize(part_path)
+        if offset != current_offset:
+            raise HTTPException(
+                status_code=409,
+                detail={'message': 'Offset divergente. Retome a partir do offset informado.', 'offset': current_offset},
+            )
+        
+        remaining = meta['size'] - offset
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > remaining:
+                # Parar de ler e voltar o arquivo ao offset anterior, mantendo o upload retomável
+                await run_in_threadpool(_truncate, f, offset)
+                raise HTTPException(status_code=400, detail="Upload maior que o tamanho declarado.")
+            if chunk:
+                await run_in_threadpool(_write_chunk, f, None, chunk)
+    finally:
+        await run_in_threadpool(f.close)
+    
+    # Renovar a retenção dos metadados enquanto o upload estiver ativo
+    os.utime(os.path.join(TEMP_UPLOAD_DIR, f"{upload_id}.json"))
+    
+    new_offset = os.path.getsize(part_path)
+    return {
+        'upload_id': upload_id,
+        'offset': new_offset,
+        'size': meta['size'],
+    }
+
+
+@router.post("/uploads/{upload_id}/complete")
+async def complete_upload(
+    upload_id: str,
+    method: str = "adaptive",
+    adaptive_threshold: float = 3.0,
+    content_threshold: float = 27.0,
+    shards: int = Query(1, ge=1, le=settings.max_scene_shards),
+    shard_overlap: float = Query(5.0, ge=0),
+):
+    """
+    Finaliza um upload em partes e inicia a detecção de cenas, como o /detect.
+    """
+    if method not in DETECTION_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Método inválido: {method}. Use um de: {', '.join(DETECTION_METHODS)}."
+        )
+    
+    part_path, meta = _load_upload(upload_id)
+    if os.path.getsize(part_path) != meta['size']:
+        raise HTTPException(status_code=409, detail="Upload incompleto.")
+    
+    # O hash é calculado ao final, pois o upload pode ter sido recebido por vários processos
+    sha256_hex = await run_in_threadpool(_hash_file, part_path)
+    file_location = await run_in_threadpool(_finalize_upload, part_path, sha256_hex, _safe_extension(meta['filename']))
+    os.remove(os.path.join(TEMP_UPLOAD_DIR, f"{upload_id}.json"))
+    
+    return _start_detection(
+        file_location,
+        f"sha256:{sha256_hex}",
+        meta['filename'],
+        method=method,
+        adaptive_threshold=adaptive_threshold,
+        content_threshold=content_threshold,
+        shards=shards,
+        shard_overlap=shard_overlap,
+    )
+
 @router.get("/status/{task_id}")
 async def get_scenes_status(task_id: str):
     """
     Obtém o status e o resultado da tarefa de detecção de cenas.
     """
+    if task_id.startswith(CACHE_TASK_PREFIX):
+        cached_result = get_scene_cache().get(task_id[len(CACHE_TASK_PREFIX):])
+        if cached_result is None:
+            raise HTTPException(status_code=404, detail="Resultado não encontrado no cache.")
+        return {
+            'task_id': task_id,
+            'status': 'SUCCESS',
+            'cache_hit': True,
+            'result': cached_result,
+        }
+    
     task = AsyncResult(task_id)
     
     if task.state == 'PENDING':
@@ -98,21 +593,25 @@ async def get_scenes_status(task_id: str):
             'progress': task.info.get('current', 0),
             'total': task.info.get('total', 100),
             'status_message': task.info.get('status', 'Processando...'),
+            'shards': task.info.get('shards'),
+            'clips': task.info.get('clips'),
+            'frame': task.info.get('frame'),
+            'total_frames': task.info.get('total_frames'),
+            'resumed_from': task.info.get('resumed_from'),
+            'scenes': task.info.get('scenes', []),
         }
     elif task.state == 'SUCCESS':
         # O resultado contém a lista de cenas e o caminho do vídeo
         result = task.result
         
-        # Limpar o arquivo temporário após o sucesso
-        if 'video_path' in result and os.path.exists(result['video_path']):
-            os.remove(result['video_path'])
-            logger.info(f"Arquivo temporário removido: {result['video_path']}")
-            # Remover o caminho do vídeo do resultado final para o frontend
-            del result['video_path'] 
+        # O upload é mantido (endereçado pelo conteúdo) até expirar a retenção, para que
+        # reenvios do mesmo arquivo não o dupliquem. Remover o caminho do resultado para o frontend.
+        result.pop('video_path', None)
             
         response = {
             'task_id': task_id,
             'status': task.state,
+            'cache_hit': False,
             'result': result,
         }
     elif task.state == 'FAILURE':
@@ -138,3 +637,41 @@ async def get_scenes_status(task_id: str):
         }
         
     return response
+
+
+@router.post("/sweep")
+async def sweep_thresholds(request: ThresholdSweepRequest):
+    """
+    Aplica vários thresholds sobre as métricas por frame já persistidas de um vídeo.
+    Não decodifica o vídeo: as métricas são gravadas na primeira detecção
+    ('adaptive' ou 'content') e identificadas pelo `file_hash` retornado por /detect.
+    """
+    if request.method not in METRIC_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Método inválido: {request.method}. Use um de: {', '.join(METRIC_METHODS)}."
+        )
+    
+    metrics_store = FrameMetricsStore(settings.scene_metrics_dir)
+    if not metrics_store.exists(request.file_hash):
+        raise HTTPException(
+            status_code=404,
+            detail="Métricas não encontradas. Execute uma detecção 'adaptive' ou 'content' primeiro."
+        )
+    
+    def _sweep() -> list[dict]:
+        results = []
+        for threshold in request.thresholds:
+            scene_list = metrics_store.detect_scenes(request.file_hash, request.method, threshold)
+            results.append({
+                'threshold': threshold,
+                'scenes_count': len(scene_list),
+                'scenes': serialize_scenes(scene_list),
+            })
+        return results
+    
+    return {
+        'file_hash': request.file_hash,
+        'method': request.method,
+        'results': await run_in_threadpool(_sweep),
+    }
@@ -0,0 +1,352 @@
+"""
+Repositório de metadados da biblioteca (vídeos coletados e baixados).
+
+Usa sessões assíncronas do SQLAlchemy sobre o schema de `database/schema.py`.
+Localmente o banco é um arquivo SQLite (aiosqlite); em produção basta trocar
+`DATABASE_URL` por outro banco suportado pelo SQLAlchemy assíncrono.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import func, insert, inspect, select, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from src.database.schema import Base, CollectedVideo, VideoClip, VideoDownload
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Linhas por comando nas inserções em lote (abaixo do limite de parâmetros do SQLite)
+BULK_CHUNK_SIZE = 500
+
+# `insert` com ON CONFLICT de cada banco, para gravações concorrentes da mesma chave
+UPSERT_INSERTS = {'sqlite': sqlite_insert, 'postgresql': postgresql_insert}
+
+
+@lru_cache()
+def get_engine() -> AsyncEngine:
+    """Retorna o engine assíncrono da API (pool de conexões do processo)."""
+    return create_async_engine(get_settings().database_url)
+
+
+@lru_cache()
+def get_sessionmaker() -> async_sessionmaker:
+    """Retorna a fábrica de sessões assíncronas da API."""
+    return async_sessionmaker(get_engine(), expire_on_commit=False)
+
+
+def _add_missing_columns(conn: Connection) -> None:
+    """
+    Atualiza tabelas criadas por versões anteriores do schema.
+    
+    `create_all` não altera tabelas existentes: colunas novas do schema (ex:
+    `video_clips.source_video_id`) são adicionadas aqui, com os seus índices.
+    Alterações de tipo ou remoções de colunas não são tratadas.
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in existing_columns]
+        for column in missing:
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            logger.info(f"Coluna adicionada ao banco: {table.name}.{column.name}")
+        for index in table.indexes:
+            if any(column in missing for column in index.columns):
+                index.create(conn, checkfirst=True)
+
+
+async def init_db(engine: Optional[AsyncEngine] = None) -> None:
+    """Cria as tabelas e índices que ainda não existem e adiciona as colunas novas do schema."""
+    async with (engine or get_engine()).begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """Dependência do FastAPI que fornece uma sessão por requisição."""
+    async with get_sessionmaker()() as session:
+        yield session
+
+
+def _utcnow() -> datetime:
+    """Instante atual em UTC, sem fuso: as colunas DateTime do schema não guardam fuso."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _chunks(rows: List[dict]) -> List[List[dict]]:
+    """Divide as linhas em lotes de `BULK_CHUNK_SIZE`."""
+    return [rows[start:start + BULK_CHUNK_SIZE] for start in range(0, len(rows), BULK_CHUNK_SIZE)]
+
+
+class VideoRepository:
+    """Consultas e gravações em lote dos vídeos coletados e baixados."""
+    
+    def __init__(self, session: AsyncSession):
+        """
+        Inicializa o repositório.
+        
+        Args:
+            session: Sessão assíncrona do SQLAlchemy
+        """
+        self.session = session
+    
+    async def add_collected_videos(self, videos: List[dict], source: str) -> int:
+        """
+        Registra os vídeos de uma coleta.
+        
+        Vídeos novos são inseridos em lote; os já registrados apenas têm
+        `last_collected_at` atualizado. A gravação é um upsert (ON CONFLICT), então
+        coletas simultâneas que encontram o mesmo vídeo novo não conflitam.
+        
+        Args:
+            videos: Vídeos no formato de `VideoInfo`
+            source: Modo da coleta ('manual', 'auto' ou 'incremental')
+        
+        Returns:
+            Número de vídeos registrados (novos ou atualizados)
+        """
+        videos = {video['video_id']: video for video in videos if video.get('video_id')}
+        if not videos:
+            return 0
+        
+        dialect = self.session.get_bind().dialect.name
+        if dialect not in UPSERT_INSERTS:
+            raise ValueError(f"Banco sem suporte a upsert: {dialect}. Use um de: {', '.join(UPSERT_INSERTS)}.")
+        upsert = UPSERT_INSERTS[dialect]
+        
+        now = _utcnow()
+        rows = [
+            {
+                'video_id': video_id,
+                'video_url': video.get('url') or f"https://www.youtube.com/watch?v={video_id}",
+                'title': video.get('title'),
+                'channel': video.get('channel'),
+                'duration': video.get('duration'),
+                'upload_date': video.get('upload_date'),
+                'source': source,
+                'first_collected_at': now,
+                'last_collected_at': now,
+            }
+            for video_id, video in videos.items()
+        ]
+        for chunk in _chunks(rows):
+            statement = upsert(CollectedVideo).values(chunk)
+            await self.session.execute(statement.on_conflict_do_update(
+                index_elements=[CollectedVideo.video_id],
+                set_={'last_collected_at': statement.excluded.last_collected_at},
+            ))
+        
+        await self.session.commit()
+        return len(rows)
+    
+    async def add_downloads(self, downloads: List[dict], quality: Optional[str] = None) -> int:
+        """
+        Registra downloads concluídos em lote.
+        
+        Args:
+            downloads: Resultados de `YouTubeDownloader.download_video`
+            quality: Formato usado no download (ex: 'best')
+        
+        Returns:
+            Número de downloads registrados
+        """
+        now = _utcnow()
+        rows = [
+            {
+                'id': str(uuid.uuid4()),
+                'video_id': download.get('video_id'),
+                'video_url': download.get('url') or '',
+                'video_title': download.get('title') or download.get('video_id') or '',
+                'video_channel': download.get('uploader') or '',
+                'file_path': download.get('filename') or '',
+                'file_size': download.get('file_size'),
+                'quality': quality,
+                'duration': download.get('duration'),
+                'downloaded_at': now,
+                'status': 'completed',
+            }
+            for download in downloads
+        ]
+        for chunk in _chunks(rows):
+            await self.session.execute(insert(VideoDownload), chunk)
+        await self.session.commit()
+        return len(rows)
+    
+    async def add_clips(self, source: dict, clips: List[dict]) -> int:
+        """
+        Registra trechos exportados ou baixados por seção, ligados ao vídeo de origem.
+        
+        Args:
+            source: Informações do vídeo de origem ('video_id', 'title')
+            clips: Trechos com 'filename', 'start_time' e 'end_time'
+        
+        Returns:
+            Número de trechos registrados
+        """
+        now = _utcnow()
+        title = source.get('title') or source.get('video_id') or ''
+        rows = [
+            {
+                'id': str(uuid.uuid4()),
+                'source_video_id': source.get('video_id'),
+                'title': f"{title} [{int(clip['start_time'])}-{int(clip['end_time'])}]",
+                'start_time': int(clip['start_time']),
+                'end_time': int(clip['end_time']),
+                'duration': int(clip['end_time'] - clip['start_time']),
+                'file_path': clip.get('filename'),
+                'created_at': now,
+                'is_exported': True,
+            }
+            for clip in clips
+        ]
+        for chunk in _chunks(rows):
+            await self.session.execute(insert(VideoClip), chunk)
+        await self.session.commit()
+        return len(rows)
+    
+    async def list_downloads(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        channel: Optional[str] = None,
+    ) -> tuple[List[VideoDownload], int]:
+        """
+        Lista os downloads, do mais recente para o mais antigo.
+        
+        Returns:
+            Tupla (downloads da página, total de downloads)
+        """
+        query = select(VideoDownload)
+        count_query = select(func.count()).select_from(VideoDownload)
+        if channel:
+            query = query.where(VideoDownload.video_channel == channel)
+            count_query = count_query.where(VideoDownload.video_channel == channel)
+        
+        result = await self.session.execute(
+            query.order_by(VideoDownload.downloaded_at.desc()).limit(limit).offset(offset)
+        )
+        total = await self.session.scalar(count_query)
+        return list(result.scalars()), total
+    
+    async def list_collected(self, limit: int = 50, offset: int = 0) -> tuple[List[CollectedVideo], int]:
+        """
+        Lista os vídeos coletados, dos vistos mais recentemente para os mais antigos.
+        
+        Returns:
+            Tupla (vídeos da página, total de vídeos)
+        """
+        result = await self.session.execute(
+            select(CollectedVideo)
+            .order_by(CollectedVideo.last_collected_at.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        total = await self.session.scalar(select(func.count()).select_from(CollectedVideo))
+        return list(result.scalars()), total
+    
+    async def list_clips(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        source_video_id: Optional[str] = None,
+    ) -> tuple[List[VideoClip], int]:
+        """
+        Lista os trechos, do mais recente para o mais antigo.
+        
+        Returns:
+            Tupla (trechos da página, total de trechos)
+        """
+        query = select(VideoClip)
+        count_query = select(func.count()).select_from(VideoClip)
+        if source_video_id:
+            query = query.where(VideoClip.source_video_id == source_video_id)
+            count_query = count_query.where(VideoClip.source_video_id == source_video_id)
+        
+        result = await self.session.execute(
+            query.order_by(VideoClip.created_at.desc()).limit(limit).offset(offset)
+        )
+        total = await self.session.scalar(count_query)
+        return list(result.scalars()), total
+    
+    async def get_downloads_by_url(self, video_url: str) -> List[VideoDownload]:
+        """Retorna os downloads de uma URL, do mais recente para o mais antigo."""
+        result = await self.session.execute(
+            select(VideoDownload)
+            .where(VideoDownload.video_url == video_url)
+            .order_by(VideoDownload.downloaded_at.desc())
+        )
+        return list(result.scalars())
+
+
+# O event loop dos workers é único por processo; threads (ex: downloads em paralelo) usam um de cada vez
+_worker_lock = threading.Lock()
+
+
+@lru_cache()
+def _get_worker_runtime(pid: int) -> tuple[asyncio.AbstractEventLoop, async_sessionmaker]:
+    """
+    Event loop e fábrica de sessões dos workers Celery.
+    
+    As conexões do engine ficam presas ao event loop que as criou, então cada
+    processo (após o fork do worker) mantém um único loop e engine, criados e
+    inicializados (`init_db`) uma vez e fechados quando o processo termina.
+    """
+    loop = asyncio.new_event_loop()
+    engine = create_async_engine(get_settings().database_url)
+    loop.run_until_complete(init_db(engine))
+    atexit.register(_close_worker_runtime, pid, loop, engine)
+    return loop, async_sessionmaker(engine, expire_on_commit=False)
+
+
+def _close_worker_runtime(pid: int, loop: asyncio.AbstractEventLoop, engine: AsyncEngine) -> None:
+    """Fecha as conexões e o event loop do worker (apenas no processo que os criou)."""
+    if os.getpid() != pid or loop.is_closed():
+        return
+    loop.run_until_complete(engine.dispose())
+    loop.close()
+
+
+def _run_in_worker_session(operation) -> int:
+    """Executa uma operação do repositório no engine do processo do worker."""
+    with _worker_lock:
+        loop, sessionmaker = _get_worker_runtime(os.getpid())
+        
+        async def run() -> int:
+            async with sessionmaker() as session:
+                return await operation(VideoRepository(session))
+        
+        return loop.run_until_complete(run())
+
+
+def save_collected_videos(videos: List[dict], source: str) -> int:
+    """Versão síncrona de `add_collected_videos` para as tarefas Celery."""
+    return _run_in_worker_session(
+        lambda repository: repository.add_collected_videos(videos, source)
+    )
+
+
+def save_downloads(downloads: List[dict], quality: Optional[str] = None) -> int:
+    """Versão síncrona de `add_downloads` para as tarefas Celery."""
+    return _run_in_worker_session(
+        lambda repository: repository.add_downloads(downloads, quality)
+    )
+
+
+def save_clips(source: dict, clips: List[dict]) -> int:
+    """Versão síncrona de `add_clips` para as tarefas Celery."""
+    return _run_in_worker_session(
+        lambda repository: repository.add_clips(source, clips)
+    )
@@ -16,17 +16,33 @@ class VideoDownload(Base):
     __tablename__ = "video_downloads"
     
     id = Column(String, primary_key=True)
-    video_url = Column(String, nullable=False)
+    video_id = Column(String, index=True)  # ID do vídeo no YouTube
+    video_url = Column(String, nullable=False, index=True)
     video_title = Column(String, nullable=False)
     video_channel = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
     file_size = Column(Integer)  # em bytes
     quality = Column(String)  # ex: "720p", "1080p", "best"
     duration = Column(Integer)  # em segundos
-    downloaded_at = Column(DateTime, default=datetime.utcnow)
+    downloaded_at = Column(DateTime, default=datetime.utcnow, index=True)
     status = Column(String, default="completed")  # completed, failed, pending
 
 
+class CollectedVideo(Base):
+    """Vídeos encontrados nas coletas"""
+    __tablename__ = "collected_videos"
+    
+    video_id = Column(String, primary_key=True)  # ID do vídeo no YouTube
+    video_url = Column(String, nullable=False, index=True)
+    title = Column(String)
+    channel = Column(String)
+    duration = Column(Integer)  # em segundos
+    upload_date = Column(String)  # YYYYMMDD
+    source = Column(String)  # modo da coleta: manual, auto, incremental
+    first_collected_at = Column(DateTime, default=datetime.utcnow)
+    last_collected_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
 class VideoTemplate(Base):
     """Templates para automação de criação de vídeos"""
     __tablename__ = "video_templates"
@@ -47,7 +63,8 @@ class VideoClip(Base):
     __tablename__ = "video_clips"
     
     id = Column(String, primary_key=True)
-    video_download_id = Column(String, ForeignKey("video_downloads.id"))
+    video_download_id = Column(String, ForeignKey("video_downloads.id"), index=True)
+    source_video_id = Column(String, index=True)  # ID do vídeo de origem no YouTube
     title = Column(String, nullable=False)
     start_time = Column(Integer)  # em segundos
     end_time = Column(Integer)  # em segundos
@@ -62,7 +79,7 @@ class VideoAnalytics(Base):
     __tablename__ = "video_analytics"
     
     id = Column(String, primary_key=True)
-    video_download_id = Column(String, ForeignKey("video_downloads.id"))
+    video_download_id = Column(String, ForeignKey("video_downloads.id"), index=True)
     views = Column(Integer, default=0)
     likes = Column(Integer, default=0)
     comments = Column(Integer, default=0)
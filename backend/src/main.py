@@ -3,12 +3,15 @@ Aplicação FastAPI principal.
 """
 
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.settings import get_settings
 from src.api.collect import router as collect_router
 from src.api.download import router as download_router
 from src.api.scene_detection import router as scene_detection_router
+from src.api.library import router as library_router
+from src.database.repository import init_db
 
 # Configurar logging
 logging.basicConfig(
@@ -20,11 +23,20 @@ logger = logging.getLogger(__name__)
 # Obter configurações
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Cria as tabelas do banco de metadados ao iniciar a API."""
+    await init_db()
+    yield
+
+
 # Criar aplicação FastAPI
 app = FastAPI(
     title="Flamengo AI Creator - Coleta de Vídeos",
     description="API para coleta automatizada de vídeos do YouTube",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configurar CORS
@@ -40,6 +52,7 @@ app.add_middleware(
 app.include_router(collect_router)
 app.include_router(download_router)
 app.include_router(scene_detection_router)
+app.include_router(library_router)
 
 
 @app.get("/")
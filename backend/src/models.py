@@ -11,6 +11,7 @@ class ModeEnum(str, Enum):
     """Enum para os modos de coleta."""
     MANUAL = "manual"
     AUTO = "auto"
+    INCREMENTAL = "incremental"
 
 
 class FilterByEnum(str, Enum):
@@ -32,12 +33,22 @@ class TimeRangeEnum(str, Enum):
 class CollectRequest(BaseModel):
     """Modelo para requisição de coleta de vídeos."""
     
-    mode: ModeEnum = Field(default=ModeEnum.MANUAL, description="Modo de coleta: 'manual' ou 'auto'")
+    mode: ModeEnum = Field(default=ModeEnum.MANUAL, description="Modo de coleta: 'manual', 'auto' ou 'incremental'")
     search_query: Optional[str] = Field(default="", description="Query de busca (apenas para modo manual)")
     channel_ids: Optional[List[str]] = Field(default=None, description="IDs de canais para filtrar")
     filter_by: FilterByEnum = Field(default=FilterByEnum.RELEVANCE, description="Filtro de busca")
     time_range: TimeRangeEnum = Field(default=TimeRangeEnum.ANY, description="Intervalo de tempo")
     max_duration: Optional[int] = Field(default=None, description="Duração máxima em minutos")
+    max_results: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=500,
+        description="Número máximo de vídeos (manual: padrão 20; automático: por query)",
+    )
+    exclude_seen: bool = Field(
+        default=False,
+        description="Remove vídeos já coletados ou baixados em execuções anteriores (por padrão, apenas marca com 'seen')",
+    )
     
     class Config:
         json_schema_extra = {
@@ -47,7 +58,8 @@ class CollectRequest(BaseModel):
                 "channel_ids": ["UCxxx", "UCyyy"],
                 "filter_by": "date",
                 "time_range": "week",
-                "max_duration": 120
+                "max_duration": 120,
+                "max_results": 20
             }
         }
 
@@ -69,6 +81,9 @@ class CollectResponse(BaseModel):
     task_id: str = Field(description="ID da tarefa Celery")
     status: str = Field(description="Status da tarefa")
     message: str = Field(description="Mensagem descritiva")
+    cached: bool = Field(default=False, description="Indica se o resultado veio do cache")
+    stale: bool = Field(default=False, description="Indica se o resultado do cache está sendo atualizado")
+    result: Optional[dict] = Field(default=None, description="Resultado obtido do cache")
 
 
 class TaskStatusResponse(BaseModel):
@@ -1,33 +1,220 @@
 """
 Gerenciador de chaves de API com fallback automático.
 Tenta usar uma chave de API e, em caso de falha, tenta a próxima.
+
+Com um `KeyScheduler`, as chaves são escolhidas pela quota restante e pela taxa
+de chamadas, com estado compartilhado entre os workers no Redis.
+
+Os erros são classificados em temporários (nova tentativa com backoff exponencial
+e jitter), de rede (novas tentativas sem penalizar a chave), de chave (quota
+esgotada ou chave inválida: passa para a próxima chave) e fatais (requisição
+inválida ou erro de programação: nenhuma chave resolveria). Cada chave tem um circuit
+breaker no processo, que pula sem espera as chaves que falham repetidamente.
+`retry_with_fallback_async` faz o mesmo sem bloquear o event loop.
 """
 
+import asyncio
+import inspect
 import logging
+import random
+import threading
 from typing import List, Optional, Callable, Any
 from functools import wraps
 import time
+import httpx
+from src.modules.key_scheduler import KeyScheduler, key_fingerprint
+from src.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Motivos de erro que indicam quota diária esgotada (a chave só volta no próximo dia de quota)
+QUOTA_ERROR_REASONS = {'quotaExceeded', 'dailyLimitExceeded'}
+
+# Motivos de erro temporários (limite de taxa, falha do servidor)
+RETRYABLE_ERROR_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded', 'backendError', 'internalError'}
+
+# Motivos de erro da chave em si (inválida, sem acesso à API)
+KEY_ERROR_REASONS = {'keyInvalid', 'keyExpired', 'accessNotConfigured', 'ipRefererBlocked', 'forbidden'}
+
+# Erros de transporte (conexão, timeout): temporários e sem relação com a chave
+TRANSPORT_ERRORS = (httpx.TransportError, TimeoutError, ConnectionError)
+
+# Classes de erro retornadas por `classify_error`
+ERROR_RETRYABLE = 'retryable'
+ERROR_NETWORK = 'network'
+ERROR_QUOTA = 'quota'
+ERROR_KEY = 'key'
+ERROR_FATAL = 'fatal'
+
+
+def is_quota_error(error: Exception) -> bool:
+    """Indica se o erro é de quota diária esgotada."""
+    return getattr(error, 'reason', None) in QUOTA_ERROR_REASONS
+
+
+def classify_error(error: Exception) -> str:
+    """
+    Classifica um erro de chamada à API.
+    
+    Usa os atributos `reason` e `status_code` quando existem (ex: `YouTubeAPIError`).
+    Erros de transporte (rede, timeout) são temporários; os demais erros sem status
+    HTTP (ex: `KeyError` ao interpretar a resposta) são fatais.
+    
+    Returns:
+        ERROR_RETRYABLE, ERROR_NETWORK, ERROR_QUOTA, ERROR_KEY ou ERROR_FATAL
+    """
+    if isinstance(error, TRANSPORT_ERRORS):
+        return ERROR_NETWORK
+    
+    reason = getattr(error, 'reason', None)
+    status_code = getattr(error, 'status_code', None)
+    
+    if reason in QUOTA_ERROR_REASONS:
+        return ERROR_QUOTA
+    if reason in RETRYABLE_ERROR_REASONS:
+        return ERROR_RETRYABLE
+    if reason in KEY_ERROR_REASONS or status_code in (401, 403):
+        return ERROR_KEY
+    if status_code is not None and (status_code == 429 or status_code >= 500):
+        return ERROR_RETRYABLE
+    return ERROR_FATAL
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Espera antes da próxima tentativa: backoff exponencial com jitter completo."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de uma chave.
+    
+    - closed: chamadas liberadas; falhas consecutivas são contadas.
+    - open: após `failure_threshold` falhas consecutivas, a chave é pulada.
+    - half_open: passado `reset_timeout`, uma única chamada é liberada como teste
+      (as demais continuam bloqueadas); sucesso fecha o circuito e falha o abre novamente.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        """
+        Inicializa o circuit breaker.
+        
+        Args:
+            failure_threshold: Falhas consecutivas que abrem o circuito
+            reset_timeout: Segundos em aberto antes de liberar uma chamada de teste
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None  # Chamada de teste em andamento (half_open)
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> str:
+        """Estado atual do circuito."""
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+    
+    def _trial_in_flight(self) -> bool:
+        """Indica se há uma chamada de teste em andamento (sem resposta após `reset_timeout`, é descartada)."""
+        return (
+            self.trial_started_at is not None
+            and time.monotonic() - self.trial_started_at < self.reset_timeout
+        )
+    
+    def is_available(self) -> bool:
+        """Indica se a chave pode ser escolhida, sem reservar a chamada de teste."""
+        state = self.state
+        if state == self.HALF_OPEN:
+            return not self._trial_in_flight()
+        return state == self.CLOSED
+    
+    def allow_request(self) -> bool:
+        """Indica se a chave pode ser usada agora; em half_open, reserva a única chamada de teste."""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.OPEN or self._trial_in_flight():
+                return False
+            self.trial_started_at = time.monotonic()
+            return True
+    
+    def release(self) -> None:
+        """Libera a chamada de teste sem mudar o estado (erro que não depende da chave)."""
+        with self._lock:
+            self.trial_started_at = None
+    
+    def record_success(self) -> None:
+        """Registra uma chamada bem-sucedida e fecha o circuito."""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_started_at = None
+    
+    def record_failure(self) -> None:
+        """Registra uma falha; abre o circuito no limite ou se a chamada de teste falhou."""
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+            self.trial_started_at = None
+    
+    def trip(self) -> None:
+        """Abre o circuito imediatamente (ex: chave inválida ou sem quota)."""
+        with self._lock:
+            self.failures = self.failure_threshold
+            self.opened_at = time.monotonic()
+            self.trial_started_at = None
+
+
+# Circuit breakers por (API, fingerprint da chave), compartilhados por todos os gerenciadores do processo
+_circuit_breakers = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(api_name: str, api_key: str) -> CircuitBreaker:
+    """Retorna o circuit breaker da chave no processo atual."""
+    breaker_key = (api_name, key_fingerprint(api_key))
+    with _circuit_breakers_lock:
+        if breaker_key not in _circuit_breakers:
+            settings = get_settings()
+            _circuit_breakers[breaker_key] = CircuitBreaker(
+                failure_threshold=settings.circuit_breaker_failure_threshold,
+                reset_timeout=settings.circuit_breaker_reset_seconds,
+            )
+        return _circuit_breakers[breaker_key]
+
 
 class APIKeyManager:
     """
     Gerenciador de múltiplas chaves de API com suporte a fallback automático.
     """
     
-    def __init__(self, api_keys: List[str], api_name: str = "API"):
+    def __init__(self, api_keys: List[str], api_name: str = "API", scheduler: Optional[KeyScheduler] = None):
         """
         Inicializa o gerenciador de chaves.
         
         Args:
             api_keys: Lista de chaves de API
             api_name: Nome da API para logging
+            scheduler: Escalonador compartilhado (opcional). Sem ele, as chaves são
+                usadas em sequência, com estado local ao processo.
         """
         self.api_keys = [key for key in api_keys if key]  # Filtrar chaves vazias
         self.api_name = api_name
+        self.scheduler = scheduler
         self.current_key_index = 0
         self.failed_keys = set()
+        self.max_delay = get_settings().api_retry_max_delay_seconds
         
         if not self.api_keys:
             logger.warning(f"Nenhuma chave de API válida fornecida para {api_name}")
@@ -81,12 +268,119 @@ class APIKeyManager:
         """Retorna o conjunto de chaves que falharam."""
         return self.failed_keys.copy()
     
+    def get_status(self) -> dict:
+        """Retorna o estado das chaves (com escalonador, o estado compartilhado por todos os workers)."""
+        circuits = {
+            key_fingerprint(api_key): get_circuit_breaker(self.api_name, api_key).state
+            for api_key in self.api_keys
+        }
+        if self.scheduler is not None:
+            return {**self.scheduler.get_status(), 'circuits': circuits}
+        return {
+            'total_keys': len(self.api_keys),
+            'current_key_index': self.current_key_index,
+            'failed_keys_count': len(self.failed_keys),
+            'available_keys': sum(1 for state in circuits.values() if state != CircuitBreaker.OPEN),
+            'circuits': circuits,
+        }
+    
+    def _select_key(self, tried_keys: set, required_units: int) -> Optional[str]:
+        """
+        Escolhe a próxima chave a usar, ignorando as já tentadas e as de circuito aberto.
+        
+        Com escalonador, a escolha considera quota, taxa e cooldown compartilhados;
+        sem ele, as chaves são percorridas em ordem. Uma chave em half_open só é
+        escolhida se a chamada de teste ainda não foi reservada por outra chamada.
+        """
+        skipped = set(tried_keys)
+        skipped.update(
+            api_key for api_key in self.api_keys
+            if not get_circuit_breaker(self.api_name, api_key).is_available()
+        )
+        
+        while True:
+            if self.scheduler is not None:
+                api_key = self.scheduler.acquire(required_units, exclude=skipped)
+            else:
+                api_key = next((key for key in self.api_keys if key not in skipped), None)
+            if api_key is None:
+                return None
+            
+            if get_circuit_breaker(self.api_name, api_key).allow_request():
+                if self.scheduler is None:
+                    self.current_key_index = self.api_keys.index(api_key)
+                return api_key
+            # Outra chamada reservou o teste da chave entre a verificação e a escolha
+            skipped.add(api_key)
+    
+    def _handle_failure(self, api_key: str, error: Exception, attempt: int, max_retries: int) -> bool:
+        """
+        Registra a falha de uma tentativa.
+        
+        Returns:
+            True para tentar de novo com a mesma chave, False para passar à próxima
+        
+        Raises:
+            Exception: O próprio erro, se for fatal ou de rede após `max_retries` tentativas
+        """
+        kind = classify_error(error)
+        breaker = get_circuit_breaker(self.api_name, api_key)
+        logger.warning(
+            f"{self.api_name}: Erro ({kind}) na tentativa {attempt + 1}/{max_retries} "
+            f"com chave {key_fingerprint(api_key)}: {str(error)}"
+        )
+        
+        if kind == ERROR_FATAL:
+            breaker.release()
+            raise error
+        
+        if kind == ERROR_NETWORK:
+            # A rede não depende da chave: sem circuit breaker nem cooldown no escalonador
+            if attempt < max_retries - 1:
+                return True
+            breaker.release()
+            raise error
+        
+        if kind == ERROR_QUOTA:
+            breaker.trip()
+            if self.scheduler is not None:
+                self.scheduler.cooldown_until_reset(api_key)
+        elif kind == ERROR_KEY:
+            breaker.trip()
+            if self.scheduler is not None:
+                self.scheduler.cooldown(api_key, str(error)[:200])
+        else:
+            breaker.record_failure()
+            if breaker.state == CircuitBreaker.CLOSED and attempt < max_retries - 1:
+                return True
+            if self.scheduler is not None:
+                self.scheduler.cooldown(api_key, str(error)[:200])
+        
+        self.failed_keys.add(api_key)
+        return False
+    
+    def _record_success(self, api_key: str) -> None:
+        """Registra o sucesso de uma chamada com a chave."""
+        get_circuit_breaker(self.api_name, api_key).record_success()
+        self.failed_keys.discard(api_key)
+        logger.info(f"{self.api_name}: Sucesso com chave {key_fingerprint(api_key)}")
+    
+    def _exhausted_error(self, tried_keys: set, last_error: Optional[Exception]) -> Exception:
+        """Monta o erro final quando nenhuma chave conseguiu atender a chamada."""
+        error_msg = (
+            f"{self.api_name}: Nenhuma chave disponível após tentar {len(tried_keys)} de "
+            f"{len(self.api_keys)} chaves. Último erro: {str(last_error)}"
+        )
+        logger.error(error_msg)
+        return Exception(error_msg)
+    
     def retry_with_fallback(
         self,
         func: Callable,
         *args,
         max_retries: int = 3,
         delay: float = 1.0,
+        required_units: int = 1,
         **kwargs
     ) -> Any:
         """
@@ -95,7 +389,8 @@ class APIKeyManager:
         Args:
             func: Função a executar
             max_retries: Número máximo de tentativas por chave
-            delay: Delay em segundos entre tentativas
+            delay: Delay base em segundos do backoff exponencial entre tentativas
+            required_units: Unidades de quota que a chamada deve consumir (com escalonador)
             *args: Argumentos posicionais para a função
             **kwargs: Argumentos nomeados para a função
         
@@ -103,62 +398,104 @@ class APIKeyManager:
             Resultado da função se bem-sucedida
         
         Raises:
-            Exception: Se todas as chaves falharem
+            Exception: Se o erro for fatal ou todas as chaves falharem
         """
         last_error = None
+        tried_keys = set()
         
-        while self.current_key_index < len(self.api_keys):
-            current_key = self.get_current_key()
+        while True:
+            current_key = self._select_key(tried_keys, required_units)
+            if current_key is None:
+                break
             
             for attempt in range(max_retries):
                 try:
-                    logger.info(
-                        f"{self.api_name}: Tentativa {attempt + 1}/{max_retries} "
-                        f"com chave {self.current_key_index + 1}/{len(self.api_keys)}"
-                    )
-                    
                     # Passar a chave atual como argumento
                     result = func(current_key, *args, **kwargs)
-                    
-                    logger.info(
-                        f"{self.api_name}: Sucesso com chave {self.current_key_index + 1}"
-                    )
+                    self._record_success(current_key)
                     return result
                 
                 except Exception as e:
                     last_error = e
-                    logger.warning(
-                        f"{self.api_name}: Erro na tentativa {attempt + 1}/{max_retries}: {str(e)}"
-                    )
-                    
-                    if attempt < max_retries - 1:
-                        time.sleep(delay)
+                    if not self._handle_failure(current_key, e, attempt, max_retries):
+                        break
+                    time.sleep(backoff_delay(attempt, delay, self.max_delay))
             
-            # Se chegou aqui, todas as tentativas falharam com esta chave
-            if not self.mark_key_failed():
+            tried_keys.add(current_key)
+        
+        raise self._exhausted_error(tried_keys, last_error)
+    
+    async def retry_with_fallback_async(
+        self,
+        func: Callable,
+        *args,
+        max_retries: int = 3,
+        delay: float = 1.0,
+        required_units: int = 1,
+        **kwargs
+    ) -> Any:
+        """
+        Versão assíncrona de `retry_with_fallback`, para handlers FastAPI e corrotinas.
+        
+        As esperas usam `asyncio.sleep`. Funções síncronas e as consultas ao
+        escalonador (Redis) rodam em uma thread, sem bloquear o event loop.
+        
+        Args:
+            func: Função ou corrotina a executar
+            max_retries: Número máximo de tentativas por chave
+            delay: Delay base em segundos do backoff exponencial entre tentativas
+            required_units: Unidades de quota que a chamada deve consumir (com escalonador)
+            *args: Argumentos posicionais para a função
+            **kwargs: Argumentos nomeados para a função
+        
+        Returns:
+            Resultado da função se bem-sucedida
+        
+        Raises:
+            Exception: Se o erro for fatal ou todas as chaves falharem
+        """
+        last_error = None
+        tried_keys = set()
+        is_coroutine = inspect.iscoroutinefunction(func)
+        
+        while True:
+            current_key = await asyncio.to_thread(self._select_key, tried_keys, required_units)
+            if current_key is None:
                 break
+            
+            for attempt in range(max_retries):
+                try:
+                    if is_coroutine:
+                        result = await func(current_key, *args, **kwargs)
+                    else:
+                        result = await asyncio.to_thread(func, current_key, *args, **kwargs)
+                    self._record_success(current_key)
+                    return result
+                
+                except Exception as e:
+                    last_error = e
+                    retry = await asyncio.to_thread(self._handle_failure, current_key, e, attempt, max_retries)
+                    if not retry:
+                        break
+                    await asyncio.sleep(backoff_delay(attempt, delay, self.max_delay))
+            
+            tried_keys.add(current_key)
         
-        # Se chegou aqui, todas as chaves falharam
-        error_msg = (
-            f"{self.api_name}: Falha após tentar todas as "
-            f"{len(self.api_keys)} chaves. Último erro: {str(last_error)}"
-        )
-        logger.error(error_msg)
-        raise Exception(error_msg)
+        raise self._exhausted_error(tried_keys, last_error)
 
 
 class OpenAIKeyManager(APIKeyManager):
     """Gerenciador específico para chaves OpenAI."""
     
-    def __init__(self, api_keys: List[str]):
-        super().__init__(api_keys, api_name="OpenAI")
+    def __init__(self, api_keys: List[str], scheduler: Optional[KeyScheduler] = None):
+        super().__init__(api_keys, api_name="OpenAI", scheduler=scheduler)
 
 
 class YouTubeKeyManager(APIKeyManager):
     """Gerenciador específico para chaves YouTube."""
     
-    def __init__(self, api_keys: List[str]):
-        super().__init__(api_keys, api_name="YouTube")
+    def __init__(self, api_keys: List[str], scheduler: Optional[KeyScheduler] = None):
+        super().__init__(api_keys, api_name="YouTube", scheduler=scheduler)
 
 
 def retry_with_api_key_fallback(
@@ -169,15 +506,29 @@ def retry_with_api_key_fallback(
     """
     Decorator para aplicar retry com fallback de chaves de API.
     
+    Funciona com funções síncronas e com corrotinas (`async def`).
+    
     Args:
         api_key_manager: Instância do APIKeyManager
         max_retries: Número máximo de tentativas por chave
-        delay: Delay em segundos entre tentativas
+        delay: Delay base em segundos entre tentativas
     
     Returns:
         Função decorada
     """
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await api_key_manager.retry_with_fallback_async(
+                    func,
+                    *args,
+                    max_retries=max_retries,
+                    delay=delay,
+                    **kwargs
+                )
+            return async_wrapper
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             return api_key_manager.retry_with_fallback(
@@ -0,0 +1,171 @@
+"""
+Módulo de coleta incremental de vídeos pelos feeds de upload dos canais.
+
+Cada canal do YouTube publica um feed Atom leve com os uploads mais recentes.
+O poller consulta esses feeds e guarda no Redis uma marca d'água por canal
+(último video_id e data de publicação), retornando apenas os uploads novos.
+"""
+
+import logging
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import List
+import httpx
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Namespaces do feed Atom do YouTube
+FEED_NAMESPACES = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'yt': 'http://www.youtube.com/xml/schemas/2015',
+}
+
+
+def parse_feed(xml_content: bytes) -> List[dict]:
+    """
+    Converte o feed Atom de um canal em uma lista de vídeos.
+    
+    Args:
+        xml_content: Conteúdo do feed
+    
+    Returns:
+        Lista de vídeos, do mais recente para o mais antigo
+    """
+    root = ET.fromstring(xml_content)
+    videos = []
+    
+    for entry in root.findall('atom:entry', FEED_NAMESPACES):
+        video_id = entry.findtext('yt:videoId', namespaces=FEED_NAMESPACES)
+        published = entry.findtext('atom:published', namespaces=FEED_NAMESPACES)
+        if not video_id or not published:
+            continue
+        
+        published_at = datetime.fromisoformat(published.replace('Z', '+00:00'))
+        videos.append({
+            'video_id': video_id,
+            'title': entry.findtext('atom:title', namespaces=FEED_NAMESPACES),
+            'channel': entry.findtext('atom:author/atom:name', namespaces=FEED_NAMESPACES),
+            'duration': None,
+            'upload_date': published_at.strftime('%Y%m%d'),
+            'published': published_at.isoformat(),
+            'url': f"https://www.youtube.com/watch?v={video_id}",
+        })
+    
+    videos.sort(key=lambda video: video['published'], reverse=True)
+    return videos
+
+
+class ChannelFeedPoller:
+    """Consulta os feeds dos canais e retorna apenas os uploads novos desde a última consulta."""
+    
+    WATERMARK_KEY_PREFIX = "channel_watermark:"  # Hash por canal: video_id, published, etag, last_modified
+    
+    def __init__(
+        self,
+        client: redis.Redis,
+        feed_base_url: str = "https://www.youtube.com/feeds/videos.xml",
+        timeout: float = 10.0,
+    ):
+        """
+        Inicializa o poller.
+        
+        Args:
+            client: Cliente Redis
+            feed_base_url: URL base dos feeds (configurável para apontar para um servidor local)
+            timeout: Timeout das requisições em segundos
+        """
+        self.client = client
+        self.feed_base_url = feed_base_url
+        self.timeout = timeout
+    
+    def get_watermark(self, channel_id: str) -> dict:
+        """Retorna a marca d'água do canal (vazia se o canal nunca foi consultado)."""
+        return self.client.hgetall(self.WATERMARK_KEY_PREFIX + channel_id)
+    
+    def reset_watermark(self, channel_id: str) -> None:
+        """Remove a marca d'água do canal, fazendo a próxima consulta retornar o feed inteiro."""
+        self.client.delete(self.WATERMARK_KEY_PREFIX + channel_id)
+    
+    def poll_channel(self, http: httpx.Client, channel_id: str) -> List[dict]:
+        """
+        Consulta o feed de um canal e atualiza sua marca d'água.
+        
+        Usa requisição condicional (ETag / Last-Modified): se o feed não mudou,
+        o servidor responde 304 sem corpo.
+        
+        Args:
+            http: Cliente HTTP
+            channel_id: ID do canal
+        
+        Returns:
+            Vídeos publicados depois da marca d'água, do mais recente para o mais antigo
+        """
+        watermark = self.get_watermark(channel_id)
+        headers = {}
+        if watermark.get('etag'):
+            headers['If-None-Match'] = watermark['etag']
+        if watermark.get('last_modified'):
+            headers['If-Modified-Since'] = watermark['last_modified']
+        
+        response = http.get(self.feed_base_url, params={'channel_id': channel_id}, headers=headers)
+        if response.status_code == 304:
+            logger.info(f"Feed do canal {channel_id} sem alterações")
+            return []
+        response.raise_for_status()
+        
+        videos = parse_feed(response.content)
+        last_published = watermark.get('published')
+        last_video_id = watermark.get('video_id')
+        
+        new_videos = []
+        for video in videos:
+            if video['video_id'] == last_video_id:
+                break
+            if last_published and video['published'] <= last_published:
+                break
+            new_videos.append(video)
+        
+        mapping = {
+            'etag': response.headers.get('etag', ''),
+            'last_modified': response.headers.get('last-modified', ''),
+        }
+        if new_videos:
+            mapping['video_id'] = new_videos[0]['video_id']
+            mapping['published'] = new_videos[0]['published']
+        self.client.hset(self.WATERMARK_KEY_PREFIX + channel_id, mapping=mapping)
+        
+        logger.info(f"Canal {channel_id}: {len(new_videos)} uploads novos ({len(response.content)} bytes)")
+        return new_videos
+    
+    def poll_channels(self, channel_ids: dict) -> List[dict]:
+        """
+        Consulta os feeds de vários canais.
+        
+        Falhas em um canal não interrompem a consulta dos demais e não alteram sua marca d'água.
+        
+        Args:
+            channel_ids: Dicionário nome -> ID do canal (ex: {'getv': 'UCxxx'})
+        
+        Returns:
+            Vídeos novos de todos os canais, do mais recente para o mais antigo
+        """
+        logger.info(f"Consultando feeds de {len(channel_ids)} canais")
+        
+        videos = []
+        errors = 0
+        with httpx.Client(timeout=self.timeout, follow_redirects=True) as http:
+            for name, channel_id in channel_ids.items():
+                try:
+                    for video in self.poll_channel(http, channel_id):
+                        videos.append({**video, 'channel_key': name})
+                except (httpx.HTTPError, ET.ParseError) as e:
+                    logger.error(f"Erro ao consultar o feed do canal {name} ({channel_id}): {str(e)}")
+                    errors += 1
+        
+        if channel_ids and errors == len(channel_ids):
+            raise RuntimeError("Não foi possível consultar o feed de nenhum canal")
+        
+        videos.sort(key=lambda video: video['published'], reverse=True)
+        logger.info(f"Encontrados {len(videos)} uploads novos nos feeds")
+        return videos
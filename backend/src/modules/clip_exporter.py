@@ -0,0 +1,303 @@
+"""
+Módulo para exportação de clipes das cenas detectadas usando ffmpeg.
+
+Cada clipe é copiado sem recodificação (stream copy) quando começa em um keyframe.
+Quando não começa, apenas o trecho entre o início da cena e o próximo keyframe é
+recodificado e concatenado ao restante copiado ("smart cut").
+
+O trecho recodificado usa o mesmo codec, perfil, nível e formato de pixel da
+origem, mas os parâmetros do encoder (SPS/PPS) não são idênticos aos do trecho
+copiado, e o MP4 guarda um único conjunto no cabeçalho (avcC/hvcC). Por isso as
+duas partes são unidas em MPEG-TS (Annex B), com os SPS/PPS de cada parte no
+próprio fluxo antes dos seus keyframes, e só então remultiplexadas no contêiner
+final: o trecho copiado é decodificado com os seus próprios parâmetros.
+"""
+
+import bisect
+import json
+import logging
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tolerância (em segundos) para considerar que a cena começa em um keyframe
+KEYFRAME_TOLERANCE = 0.05
+
+# Encoders usados para recodificar o trecho inicial, por codec de origem.
+# Codecs fora desta lista (ex: VP9, AV1) fazem o clipe inteiro ser recodificado em H.264/AAC (.mp4).
+VIDEO_ENCODERS = {'h264': 'libx264', 'hevc': 'libx265'}
+AUDIO_ENCODERS = {'aac': 'aac', 'opus': 'libopus', 'mp3': 'libmp3lame'}
+
+# Recodificação completa quando não há encoder para os codecs de origem
+FALLBACK_EXTENSION = '.mp4'
+
+# Filtros que levam os SPS/PPS do cabeçalho do contêiner para o fluxo (Annex B), por codec
+ANNEXB_FILTERS = {'h264': 'h264_mp4toannexb', 'hevc': 'hevc_mp4toannexb'}
+
+# Repetição dos SPS/PPS em todos os keyframes do trecho recodificado, por encoder
+REPEAT_HEADERS_ARGS = {
+    'libx264': ['-x264-params', 'repeat-headers=1'],
+    'libx265': ['-x265-params', 'repeat-headers=1'],
+}
+
+# Perfis do ffprobe -> nomes aceitos por `-profile:v` do libx264/libx265
+ENCODER_PROFILES = {
+    'constrained baseline': 'baseline',
+    'baseline': 'baseline',
+    'main': 'main',
+    'high': 'high',
+    'high 10': 'high10',
+    'high 4:2:2': 'high422',
+    'high 4:4:4 predictive': 'high444',
+    'main 10': 'main10',
+}
+
+
+def _run(command: list[str]) -> str:
+    """Executa um comando (ffmpeg/ffprobe) e retorna a saída padrão."""
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{command[0]} falhou: {result.stderr.strip()[-500:]}")
+    return result.stdout
+
+
+class ClipExporter:
+    """Exporta as cenas de um vídeo como clipes, em paralelo."""
+    
+    def __init__(
+        self,
+        output_dir: str = "clips",
+        max_workers: int = 4,
+        name_template: str = "{stem}-Scene-{index:03d}{ext}",
+        smart_cut: bool = True,
+    ):
+        """
+        Inicializa o exportador.
+        
+        Args:
+            output_dir: Diretório para salvar os clipes
+            max_workers: Número máximo de processos ffmpeg simultâneos
+            name_template: Nome dos clipes; recebe `stem`, `index`, `start`, `end` e `ext`
+            smart_cut: Recodifica só o início das cenas fora de keyframes (False: o clipe inteiro)
+        """
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.name_template = name_template
+        self.smart_cut = smart_cut
+        os.makedirs(self.output_dir, exist_ok=True)
+    
+    def probe(self, video_path: str) -> dict:
+        """
+        Obtém os keyframes e os codecs do vídeo.
+        
+        Os keyframes são lidos das flags dos pacotes, sem decodificar o vídeo, e
+        medidos a partir do início do stream, como os tempos das cenas.
+        
+        Returns:
+            Dicionário com 'keyframes' (segundos, ordenados), os codecs e o perfil,
+            nível e formato de pixel do vídeo
+        """
+        def stream_info(stream: str, entries: str) -> dict:
+            output = _run([
+                'ffprobe', '-v', 'error', '-select_streams', stream,
+                '-show_entries', f'stream={entries}', '-of', 'json', video_path,
+            ])
+            streams = json.loads(output).get('streams') or [{}]
+            return streams[0]
+        
+        video = stream_info('v:0', 'codec_name,profile,level,pix_fmt,start_time')
+        audio = stream_info('a:0', 'codec_name')
+        
+        # Os pts são absolutos (ex: MPEG-TS começa em ~1.4s); as cenas começam em 0
+        start_time = float(video.get('start_time') or 0)
+        packets = _run([
+            'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', video_path,
+        ])
+        keyframes = sorted(
+            float(pts) - start_time
+            for pts, _, flags in (line.partition(',') for line in packets.splitlines())
+            if 'K' in flags and pts not in ('', 'N/A')
+        )
+        return {
+            'keyframes': keyframes,
+            'video_codec': video.get('codec_name'),
+            'video_profile': video.get('profile'),
+            'video_level': video.get('level'),
+            'pix_fmt': video.get('pix_fmt'),
+            'audio_codec': audio.get('codec_name'),
+        }
+    
+    def _has_matching_encoders(self, probe: dict) -> bool:
+        """Indica se há encoders para os codecs de origem (o clipe mantém o contêiner original)."""
+        return (
+            probe['video_codec'] in VIDEO_ENCODERS
+            and (probe['audio_codec'] is None or probe['audio_codec'] in AUDIO_ENCODERS)
+        )
+    
+    def _reencode_args(self, probe: dict, repeat_headers: bool = False) -> list[str]:
+        """
+        Argumentos de codificação: os codecs da origem, com o mesmo perfil, nível e
+        formato de pixel; sem encoder compatível, H.264/AAC.
+        
+        Args:
+            probe: Resultado de `probe`
+            repeat_headers: Repete os SPS/PPS em todos os keyframes (trecho inicial do smart cut)
+        """
+        if not self._has_matching_encoders(probe):
+            args = ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '18', '-pix_fmt', 'yuv420p']
+            return args + (['-c:a', 'aac'] if probe['audio_codec'] else [])
+        
+        encoder = VIDEO_ENCODERS[probe['video_codec']]
+        args = ['-c:v', encoder, '-preset', 'veryfast', '-crf', '18']
+        if repeat_headers:
+            args += REPEAT_HEADERS_ARGS[encoder]
+        profile = ENCODER_PROFILES.get((probe.get('video_profile') or '').lower())
+        if profile:
+            args += ['-profile:v', profile]
+        if probe['video_codec'] == 'h264' and (probe.get('video_level') or 0) > 0:
+            args += ['-level', str(probe['video_level'])]
+        if probe.get('pix_fmt'):
+            args += ['-pix_fmt', probe['pix_fmt']]
+        if probe['audio_codec']:
+            args += ['-c:a', AUDIO_ENCODERS[probe['audio_codec']]]
+        return args
+    
+    def export_clip(self, video_path: str, probe: dict, index: int, start: float, end: float) -> dict:
+        """
+        Exporta uma cena como clipe.
+        
+        Args:
+            video_path: Caminho para o vídeo de origem
+            probe: Resultado de `probe(video_path)`
+            index: Número da cena (a partir de 1)
+            start: Início da cena em segundos
+            end: Fim da cena em segundos
+        
+        Returns:
+            Dicionário com o caminho do clipe e o modo de corte ('copy', 'smart' ou 'reencode')
+        """
+        stem, extension = os.path.splitext(os.path.basename(video_path))
+        
+        keyframes = probe['keyframes']
+        position = bisect.bisect_left(keyframes, start - KEYFRAME_TOLERANCE)
+        keyframe = keyframes[position] if position < len(keyframes) else None
+        starts_on_keyframe = keyframe is not None and abs(keyframe - start) <= KEYFRAME_TOLERANCE
+        can_smart_cut = self.smart_cut and self._has_matching_encoders(probe)
+        
+        if not starts_on_keyframe and not self._has_matching_encoders(probe):
+            # H.264/AAC não cabem em todo contêiner (ex: .webm): a recodificação completa sai em .mp4
+            extension = FALLBACK_EXTENSION
+        output_path = os.path.join(
+            self.output_dir,
+            self.name_template.format(stem=stem, index=index, start=start, end=end, ext=extension),
+        )
+        
+        if starts_on_keyframe:
+            # Cena começa em um keyframe: cópia direta dos streams
+            mode = 'copy'
+            _run([
+                'ffmpeg', '-y', '-v', 'error', '-ss', f"{keyframe:.6f}", '-i', video_path,
+                '-t', f"{end - keyframe:.6f}", '-map', '0', '-c', 'copy',
+                '-avoid_negative_ts', 'make_zero', output_path,
+            ])
+        elif keyframe is not None and keyframe < end and can_smart_cut:
+            # Recodificar só até o próximo keyframe e copiar o restante. As partes são gravadas
+            # em MPEG-TS com os SPS/PPS no fluxo, pois os do início diferem dos do trecho copiado
+            # (ver docstring do módulo), e unidas antes de irem para o contêiner final.
+            mode = 'smart'
+            streams = ['-map', '0:v:0', '-map', '0:a?']
+            with tempfile.TemporaryDirectory(dir=self.output_dir) as temp_dir:
+                head_path = os.path.join(temp_dir, "head.ts")
+                tail_path = os.path.join(temp_dir, "tail.ts")
+                
+                _run([
+                    'ffmpeg', '-y', '-v', 'error', '-ss', f"{start:.6f}", '-i', video_path,
+                    '-t', f"{keyframe - start:.6f}", *streams,
+                    *self._reencode_args(probe, repeat_headers=True), '-f', 'mpegts', head_path,
+                ])
+                _run([
+                    'ffmpeg', '-y', '-v', 'error', '-ss', f"{keyframe:.6f}", '-i', video_path,
+                    '-t', f"{end - keyframe:.6f}", *streams, '-c', 'copy',
+                    '-bsf:v', ANNEXB_FILTERS[probe['video_codec']],
+                    '-avoid_negative_ts', 'make_zero', '-f', 'mpegts', tail_path,
+                ])
+                _run([
+                    'ffmpeg', '-y', '-v', 'error', '-i', f"concat:{head_path}|{tail_path}",
+                    '-map', '0', '-c', 'copy', output_path,
+                ])
+        else:
+            # Sem keyframe dentro da cena (ou codec sem encoder compatível): recodificar o clipe
+            mode = 'reencode'
+            _run([
+                'ffmpeg', '-y', '-v', 'error', '-ss', f"{start:.6f}", '-i', video_path,
+                '-t', f"{end - start:.6f}", '-map', '0',
+                *self._reencode_args(probe), output_path,
+            ])
+        
+        return {
+            'index': index,
+            'path': output_path,
+            'start_time': start,
+            'end_time': end,
+            'mode': mode,
+        }
+    
+    def export_clips(
+        self,
+        video_path: str,
+        scenes: list[tuple[float, float]],
+        progress_callback: Optional[Callable] = None,
+    ) -> dict:
+        """
+        Exporta várias cenas em paralelo, limitado a `max_workers` processos ffmpeg.
+        
+        Args:
+            video_path: Caminho para o vídeo de origem
+            scenes: Lista de tuplas (início, fim) em segundos
+            progress_callback: Chamado a cada clipe concluído com (clip_info, completed, total)
+        
+        Returns:
+            Dicionário com os clipes exportados e os erros
+        """
+        logger.info(f"Exportando {len(scenes)} clipes de {video_path} com até {self.max_workers} processos")
+        
+        probe = self.probe(video_path)
+        results = {
+            'total': len(scenes),
+            'successful': 0,
+            'failed': 0,
+            'clips': [],
+            'errors': [],
+        }
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.export_clip, video_path, probe, index, start, end): index
+                for index, (start, end) in enumerate(scenes, start=1)
+            }
+            
+            for completed, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                try:
+                    clip_info = future.result()
+                    results['clips'].append(clip_info)
+                    results['successful'] += 1
+                except Exception as e:
+                    logger.error(f"Erro ao exportar a cena {index}: {e}")
+                    clip_info = {'index': index, 'error': str(e)}
+                    results['errors'].append(clip_info)
+                    results['failed'] += 1
+                
+                if progress_callback:
+                    progress_callback(clip_info, completed, len(scenes))
+        
+        results['clips'].sort(key=lambda clip: clip['index'])
+        logger.info(
+            f"Exportação concluída: {results['successful']} sucesso, {results['failed']} falhas"
+        )
+        return results
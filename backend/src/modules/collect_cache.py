@@ -0,0 +1,183 @@
+"""
+Cache compartilhado dos resultados de coleta de vídeos.
+
+Requisições idênticas de coleta (mesmos parâmetros normalizados) reutilizam o
+último resultado armazenado no Redis. Resultados vencidos continuam sendo
+servidos enquanto uma única tarefa os atualiza em segundo plano
+(stale-while-revalidate).
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import List, Optional
+import redis
+from src.redis_client import get_redis_client
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def make_collect_cache_key(
+    mode: str,
+    search_query: str = "",
+    channel_ids: Optional[List[str]] = None,
+    filter_by: str = "relevance",
+    time_range: str = "any",
+    max_duration: Optional[int] = None,
+    max_results: Optional[int] = None,
+) -> str:
+    """
+    Monta a chave do cache a partir dos parâmetros normalizados da coleta.
+    
+    A query é comparada sem diferença de maiúsculas e espaços extras, e a ordem
+    dos canais não importa.
+    
+    Returns:
+        Chave hexadecimal
+    """
+    payload = json.dumps({
+        'mode': mode,
+        'search_query': ' '.join((search_query or '').lower().split()),
+        'channel_ids': sorted(set(channel_ids or [])),
+        'filter_by': filter_by,
+        'time_range': time_range,
+        'max_duration': max_duration,
+        'max_results': max_results,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CollectResultCache:
+    """Cache TTL de resultados de coleta com stale-while-revalidate, armazenado no Redis."""
+    
+    KEY_PREFIX = "collect_cache:entry:"
+    REFRESH_KEY_PREFIX = "collect_cache:refresh:"  # Lock de atualização -> ID da task
+    STATS_KEY = "collect_cache:stats"  # Hash: hits, stale_hits, misses
+    
+    def __init__(
+        self,
+        client: redis.Redis,
+        ttl_seconds: int = 600,
+        stale_seconds: int = 3600,
+        refresh_lock_seconds: int = 300,
+    ):
+        """
+        Inicializa o cache.
+        
+        Args:
+            client: Cliente Redis
+            ttl_seconds: Tempo em que um resultado é considerado atual
+            stale_seconds: Tempo adicional em que um resultado vencido ainda é servido
+            refresh_lock_seconds: Tempo máximo de uma atualização em andamento
+        """
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.refresh_lock_seconds = refresh_lock_seconds
+    
+    def get(self, key: str) -> Optional[tuple[dict, bool]]:
+        """
+        Retorna o resultado armazenado.
+        
+        Args:
+            key: Chave do cache (ver `make_collect_cache_key`)
+        
+        Returns:
+            Tupla (resultado, vencido) ou None se não existir
+        """
+        try:
+            data = self.client.get(self.KEY_PREFIX + key)
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao consultar o cache de coleta: {e}")
+            return None
+        if data is None:
+            return None
+        entry = json.loads(data)
+        return entry['result'], time.time() - entry['stored_at'] > self.ttl_seconds
+    
+    def set(self, key: str, result: dict) -> None:
+        """
+        Armazena um resultado e libera o lock de atualização.
+        
+        Args:
+            key: Chave do cache (ver `make_collect_cache_key`)
+            result: Resultado serializável em JSON
+        """
+        data = json.dumps({'result': result, 'stored_at': time.time()})
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(self.KEY_PREFIX + key, data, ex=self.ttl_seconds + self.stale_seconds)
+            pipe.delete(self.REFRESH_KEY_PREFIX + key)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao gravar no cache de coleta: {e}")
+    
+    def acquire_refresh(self, key: str, task_id: str) -> bool:
+        """
+        Reserva a atualização do resultado para uma task.
+        
+        Returns:
+            True se a atualização foi reservada, False se outra task já está atualizando
+        """
+        try:
+            return bool(self.client.set(
+                self.REFRESH_KEY_PREFIX + key, task_id, nx=True, ex=self.refresh_lock_seconds
+            ))
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao reservar a atualização do cache de coleta: {e}")
+            return True
+    
+    def release_refresh(self, key: str, task_id: str) -> None:
+        """Libera a atualização do resultado, se ainda pertencer à task (ex: a coleta falhou)."""
+        lock_key = self.REFRESH_KEY_PREFIX + key
+        try:
+            with self.client.pipeline() as pipe:
+                pipe.watch(lock_key)
+                if pipe.get(lock_key) == task_id:
+                    pipe.multi()
+                    pipe.delete(lock_key)
+                    pipe.execute()
+        except redis.WatchError:
+            pass  # A atualização mudou de dono durante a liberação
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao liberar a atualização do cache de coleta: {e}")
+    
+    def get_refresh_task(self, key: str) -> Optional[str]:
+        """Retorna o ID da task que está atualizando o resultado, se houver."""
+        try:
+            return self.client.get(self.REFRESH_KEY_PREFIX + key)
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao consultar o cache de coleta: {e}")
+            return None
+    
+    def record(self, outcome: str) -> None:
+        """Incrementa o contador de 'hits', 'stale_hits' ou 'misses'."""
+        try:
+            self.client.hincrby(self.STATS_KEY, outcome, 1)
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao atualizar os contadores do cache de coleta: {e}")
+    
+    def get_stats(self) -> dict:
+        """Retorna os contadores de acertos e falhas do cache."""
+        stats = {name: int(value) for name, value in self.client.hgetall(self.STATS_KEY).items()}
+        hits = stats.get('hits', 0) + stats.get('stale_hits', 0)
+        misses = stats.get('misses', 0)
+        return {
+            'hits': stats.get('hits', 0),
+            'stale_hits': stats.get('stale_hits', 0),
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 3) if hits + misses else 0.0,
+        }
+
+
+def get_collect_cache() -> CollectResultCache:
+    """Retorna o cache de coleta configurado a partir das Settings."""
+    settings = get_settings()
+    return CollectResultCache(
+        get_redis_client(),
+        ttl_seconds=settings.collect_cache_ttl_seconds,
+        stale_seconds=settings.collect_cache_stale_seconds,
+        refresh_lock_seconds=settings.collect_cache_refresh_lock_seconds,
+    )
@@ -0,0 +1,208 @@
+"""
+Persistência das métricas por frame da detecção de cenas.
+
+As métricas (content_val, adaptive_ratio, delta_lum) são gravadas em um arquivo
+NumPy mapeado em memória na primeira detecção. Novos thresholds são aplicados
+diretamente sobre esse array, sem decodificar o vídeo novamente.
+"""
+
+import json
+import logging
+import os
+from typing import Optional
+import numpy as np
+from scenedetect import open_video, StatsManager
+from scenedetect.frame_timecode import FrameTimecode
+from src.modules.scene_cache import is_valid_file_hash
+from src.modules.scene_detector import SceneDetector, MIN_SCENE_LEN
+
+logger = logging.getLogger(__name__)
+
+# Colunas do array de métricas (uma linha por frame)
+METRIC_COLUMNS = ('content_val', 'adaptive_ratio', 'delta_lum')
+
+# Métodos que podem ser recalculados a partir das métricas
+METRIC_METHODS = ('adaptive', 'content')
+
+# Parâmetros padrão do AdaptiveDetector do PySceneDetect
+ADAPTIVE_WINDOW_WIDTH = 2
+ADAPTIVE_MIN_CONTENT_VAL = 15.0
+ADAPTIVE_MAX_RATIO = 255.0
+
+
+def compute_adaptive_ratio(content_val: np.ndarray, window_width: int = ADAPTIVE_WINDOW_WIDTH) -> np.ndarray:
+    """
+    Calcula o adaptive_ratio de cada frame a partir do content_val, como o AdaptiveDetector.
+    
+    O ratio é o content_val do frame dividido pela média dos `window_width` frames
+    vizinhos de cada lado (sem incluir o próprio frame).
+    """
+    values = np.nan_to_num(content_val.astype(np.float64))
+    kernel = np.ones(2 * window_width + 1)
+    kernel[window_width] = 0
+    window_avg = np.convolve(values, kernel, mode='same') / (2 * window_width)
+    
+    ratio = np.full(len(values), ADAPTIVE_MAX_RATIO)
+    np.divide(values, window_avg, out=ratio, where=np.abs(window_avg) >= 0.00001)
+    ratio = np.minimum(ratio, ADAPTIVE_MAX_RATIO)
+    
+    # Frames sem janela completa não são avaliados pelo AdaptiveDetector
+    ratio[:window_width + 1] = np.nan
+    ratio[len(ratio) - window_width:] = np.nan
+    return ratio.astype(np.float32)
+
+
+def read_stats_columns(stats_manager: StatsManager, metric_keys: list[str], total_frames: int) -> np.ndarray:
+    """
+    Lê de uma vez as métricas de todos os frames de um StatsManager.
+    
+    O StatsManager não tem acesso público em lote (apenas `get_metrics` por frame),
+    então o dicionário interno é percorrido uma única vez.
+    
+    Returns:
+        Array (total_frames, len(metric_keys)); frames sem a métrica ficam com NaN
+    """
+    frame_metrics = stats_manager._frame_metrics
+    frames = np.fromiter(
+        (getattr(frame, 'frame_num', frame) for frame in frame_metrics),
+        dtype=np.int64,
+        count=len(frame_metrics),
+    )
+    values = np.array(
+        [[metrics.get(key, np.nan) for key in metric_keys] for metrics in frame_metrics.values()],
+        dtype=np.float32,
+    ).reshape(len(frames), len(metric_keys))
+    
+    columns = np.full((total_frames, len(metric_keys)), np.nan, dtype=np.float32)
+    in_range = (frames >= 0) & (frames < total_frames)
+    columns[frames[in_range]] = values[in_range]
+    return columns
+
+
+def find_cuts(metrics: np.ndarray, method: str, threshold: float) -> list[int]:
+    """
+    Aplica um threshold sobre as métricas e retorna os frames de corte.
+    
+    Args:
+        metrics: Array (frames, len(METRIC_COLUMNS))
+        method: 'adaptive' ou 'content'
+        threshold: adaptive_threshold ou content_threshold
+    
+    Returns:
+        Lista com os números de frame dos cortes
+    """
+    content_val = metrics[:, METRIC_COLUMNS.index('content_val')]
+    
+    if method == 'content':
+        candidates = np.flatnonzero(content_val >= threshold)
+    elif method == 'adaptive':
+        adaptive_ratio = metrics[:, METRIC_COLUMNS.index('adaptive_ratio')]
+        candidates = np.flatnonzero(
+            (adaptive_ratio >= threshold) & (content_val >= ADAPTIVE_MIN_CONTENT_VAL)
+        )
+    else:
+        raise ValueError(f"Método sem métricas persistidas: {method}. Use 'adaptive' ou 'content'.")
+    
+    # Aplicar a duração mínima de cena na ordem dos frames, como os detectores
+    cuts = []
+    last_cut = 0
+    for frame in candidates:
+        if frame - last_cut >= MIN_SCENE_LEN:
+            cuts.append(int(frame))
+            last_cut = frame
+    return cuts
+
+
+class FrameMetricsStore:
+    """Armazena as métricas por frame de cada vídeo, indexadas pelo hash do conteúdo."""
+    
+    def __init__(self, metrics_dir: str = "scene_metrics"):
+        """
+        Inicializa o armazenamento.
+        
+        Args:
+            metrics_dir: Diretório dos arquivos de métricas
+        """
+        self.metrics_dir = metrics_dir
+        os.makedirs(self.metrics_dir, exist_ok=True)
+    
+    def _base_path(self, file_hash: str) -> str:
+        """Caminho base (sem extensão) dos arquivos de um vídeo."""
+        if not is_valid_file_hash(file_hash):
+            raise ValueError(f"Hash de arquivo inválido: {file_hash!r}")
+        return os.path.join(self.metrics_dir, file_hash.replace(':', '_'))
+    
+    def exists(self, file_hash: str) -> bool:
+        """Indica se já existem métricas para o vídeo."""
+        base_path = self._base_path(file_hash)
+        return os.path.exists(f"{base_path}.npy") and os.path.exists(f"{base_path}.json")
+    
+    def save(self, file_hash: str, stats_manager: StatsManager, video_path: str) -> None:
+        """
+        Grava as métricas coletadas por um StatsManager durante a detecção.
+        
+        Args:
+            file_hash: Hash do conteúdo do vídeo
+            stats_manager: StatsManager usado na detecção
+            video_path: Caminho para o vídeo (para obter fps e total de frames)
+        """
+        video = open_video(video_path)
+        total_frames = video.duration.get_frames()
+        base_path = self._base_path(file_hash)
+        
+        content_val, delta_lum = read_stats_columns(stats_manager, ['content_val', 'delta_lum'], total_frames).T
+        
+        # Gravar em arquivos temporários e renomear, para leitores nunca verem um arquivo parcial.
+        # O .npy é renomeado por último: `exists` só considera o par completo.
+        with open(f"{base_path}.tmp.json", 'w') as f:
+            json.dump({
+                'fps': float(video.frame_rate),
+                'total_frames': total_frames,
+                'columns': list(METRIC_COLUMNS),
+            }, f)
+        os.replace(f"{base_path}.tmp.json", f"{base_path}.json")
+        
+        metrics = np.lib.format.open_memmap(
+            f"{base_path}.tmp.npy", mode='w+', dtype=np.float32, shape=(total_frames, len(METRIC_COLUMNS))
+        )
+        metrics[:, METRIC_COLUMNS.index('content_val')] = content_val
+        metrics[:, METRIC_COLUMNS.index('adaptive_ratio')] = compute_adaptive_ratio(content_val)
+        metrics[:, METRIC_COLUMNS.index('delta_lum')] = delta_lum
+        metrics.flush()
+        del metrics
+        os.replace(f"{base_path}.tmp.npy", f"{base_path}.npy")
+        
+        logger.info(f"Métricas de {total_frames} frames gravadas em {base_path}.npy")
+    
+    def load(self, file_hash: str) -> Optional[tuple[np.ndarray, dict]]:
+        """
+        Carrega as métricas de um vídeo mapeadas em memória.
+        
+        Returns:
+            Tupla (métricas, metadados) ou None se não existirem
+        """
+        if not self.exists(file_hash):
+            return None
+        base_path = self._base_path(file_hash)
+        with open(f"{base_path}.json") as f:
+            meta = json.load(f)
+        return np.load(f"{base_path}.npy", mmap_mode='r'), meta
+    
+    def detect_scenes(
+        self,
+        file_hash: str,
+        method: str,
+        threshold: float,
+    ) -> Optional[list[tuple[FrameTimecode, FrameTimecode]]]:
+        """
+        Detecta cenas aplicando um threshold sobre as métricas persistidas.
+        
+        Returns:
+            Lista de tuplas (start_timecode, end_timecode) ou None se não houver métricas
+        """
+        loaded = self.load(file_hash)
+        if loaded is None:
+            return None
+        metrics, meta = loaded
+        cuts = find_cuts(metrics, method, threshold)
+        return SceneDetector._scenes_from_cuts(cuts, meta['total_frames'], meta['fps'])
@@ -0,0 +1,151 @@
+"""
+Cache compartilhado do `info_dict` do yt-dlp.
+
+`/video-info`, `/formats` e o download extraem as informações do mesmo vídeo.
+O resultado da primeira extração fica no Redis, por ID do vídeo, e é
+reaproveitado pelas seguintes. As URLs dos streams expiram (parâmetro
+`expire` das URLs do YouTube), então a entrada vence antes delas.
+"""
+
+import json
+import logging
+import re
+import time
+from typing import Optional
+import redis
+from src.modules.video_index import extract_video_id
+from src.redis_client import get_redis_client
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Expiração das URLs do YouTube: "...&expire=1700000000&..." ou ".../expire/1700000000/..."
+EXPIRE_PATTERN = re.compile(r'[?&/]expire[=/](\d+)')
+
+# Campos que os downloads não usam e que ocupam a maior parte do info_dict
+DROPPED_FIELDS = ('automatic_captions',)
+
+# Resultado da seleção de formatos de quem extraiu; cada chamada seleciona os seus
+SELECTION_FIELDS = ('requested_formats', 'requested_downloads', 'requested_subtitles')
+
+
+def stream_expiry(info: dict) -> Optional[float]:
+    """
+    Retorna o instante (epoch) em que a primeira URL de stream do vídeo expira.
+    
+    Args:
+        info: info_dict do yt-dlp
+    
+    Returns:
+        Timestamp da expiração ou None se as URLs não informam expiração
+    """
+    formats = [*(info.get('formats') or []), *(info.get('requested_formats') or [])]
+    urls = [info.get('url'), *(fmt.get('url') for fmt in formats), *(fmt.get('manifest_url') for fmt in formats)]
+    expirations = [
+        int(match.group(1))
+        for url in urls
+        if url
+        for match in [EXPIRE_PATTERN.search(url)]
+        if match
+    ]
+    return min(expirations) if expirations else None
+
+
+class InfoDictCache:
+    """Cache do info_dict do yt-dlp por ID do vídeo, armazenado no Redis."""
+    
+    KEY_PREFIX = "info_dict_cache:entry:"
+    STATS_KEY = "info_dict_cache:stats"  # Hash: hits, misses
+    
+    def __init__(
+        self,
+        client: redis.Redis,
+        max_ttl_seconds: int = 3600,
+        expiry_margin_seconds: int = 600,
+    ):
+        """
+        Inicializa o cache.
+        
+        Args:
+            client: Cliente Redis
+            max_ttl_seconds: Tempo máximo de uma entrada
+            expiry_margin_seconds: A entrada vence esse tempo antes da expiração das URLs dos streams
+        """
+        self.client = client
+        self.max_ttl_seconds = max_ttl_seconds
+        self.expiry_margin_seconds = expiry_margin_seconds
+    
+    def ttl_for(self, info: dict) -> int:
+        """Tempo de vida da entrada: o menor entre o máximo e a expiração das URLs (menos a margem)."""
+        expiry = stream_expiry(info)
+        if expiry is None:
+            return self.max_ttl_seconds
+        return min(self.max_ttl_seconds, int(expiry - time.time() - self.expiry_margin_seconds))
+    
+    def get(self, video_url: str) -> Optional[dict]:
+        """
+        Retorna o info_dict armazenado do vídeo.
+        
+        Args:
+            video_url: URL do vídeo ou o próprio ID
+        
+        Returns:
+            info_dict ou None se não estiver no cache
+        """
+        video_id = extract_video_id(video_url)
+        if not video_id:
+            return None
+        try:
+            data = self.client.get(self.KEY_PREFIX + video_id)
+            self.client.hincrby(self.STATS_KEY, 'hits' if data else 'misses', 1)
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao consultar o cache de informações: {e}")
+            return None
+        if data is None:
+            return None
+        logger.info(f"Informações do vídeo {video_id} obtidas do cache")
+        info = json.loads(data)
+        for field in SELECTION_FIELDS:
+            info.pop(field, None)
+        return info
+    
+    def set(self, info: dict) -> None:
+        """
+        Armazena o info_dict de um vídeo.
+        
+        Args:
+            info: info_dict serializável (ver `YoutubeDL.sanitize_info`)
+        """
+        video_id = info.get('id')
+        ttl = self.ttl_for(info)
+        if not video_id or ttl <= 0:
+            return
+        data = json.dumps({
+            key: value for key, value in info.items()
+            if key not in DROPPED_FIELDS and key not in SELECTION_FIELDS
+        })
+        try:
+            self.client.set(self.KEY_PREFIX + video_id, data, ex=ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao gravar no cache de informações: {e}")
+    
+    def get_stats(self) -> dict:
+        """Retorna os contadores de acertos e falhas do cache."""
+        stats = {name: int(value) for name, value in self.client.hgetall(self.STATS_KEY).items()}
+        hits = stats.get('hits', 0)
+        misses = stats.get('misses', 0)
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 3) if hits + misses else 0.0,
+        }
+
+
+def get_info_dict_cache() -> InfoDictCache:
+    """Retorna o cache de informações configurado a partir das Settings."""
+    settings = get_settings()
+    return InfoDictCache(
+        get_redis_client(),
+        max_ttl_seconds=settings.info_dict_cache_max_ttl_seconds,
+        expiry_margin_seconds=settings.info_dict_cache_expiry_margin_seconds,
+    )
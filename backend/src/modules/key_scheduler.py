@@ -0,0 +1,271 @@
+"""
+Escalonador de chaves de API compartilhado entre processos via Redis.
+
+Controla, para cada chave:
+- as unidades de quota gastas no dia de quota atual (o dia da quota do YouTube
+  vira à meia-noite no horário do Pacífico);
+- um token bucket que distribui as chamadas entre as chaves saudáveis;
+- um cooldown com TTL para chaves que falharam, em vez de descartá-las.
+
+Como o estado fica no Redis, todos os workers Celery e a API veem o mesmo
+consumo e as mesmas chaves em cooldown.
+"""
+
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+import redis
+from src.redis_client import get_redis_client
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Consome um token do bucket, reabastecido continuamente a `rate` tokens por segundo.
+# Retorna 0 se o token foi consumido ou o tempo (ms) até o próximo token.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated_at) * rate)
+local wait_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait_ms = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return wait_ms
+"""
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Identificador da chave usado no Redis e nos logs (a chave nunca é gravada)."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:12]
+
+
+class KeyScheduler:
+    """Distribui as chamadas entre as chaves de uma API respeitando quota, taxa e cooldown."""
+    
+    def __init__(
+        self,
+        client: redis.Redis,
+        api_name: str,
+        api_keys: List[str],
+        daily_quota: Optional[int] = None,
+        rate_per_second: float = 5.0,
+        burst: int = 10,
+        cooldown_seconds: int = 300,
+        quota_timezone: str = "America/Los_Angeles",
+    ):
+        """
+        Inicializa o escalonador.
+        
+        Args:
+            client: Cliente Redis
+            api_name: Nome da API (prefixo das chaves no Redis e logging)
+            api_keys: Lista de chaves de API
+            daily_quota: Unidades de quota por chave por dia (None = sem limite)
+            rate_per_second: Chamadas por segundo por chave (reabastecimento do token bucket)
+            burst: Capacidade do token bucket
+            cooldown_seconds: Tempo de cooldown de uma chave após falhas
+            quota_timezone: Fuso horário em que o dia de quota vira
+        """
+        self.client = client
+        self.api_name = api_name
+        self.api_keys = [key for key in api_keys if key]
+        self.daily_quota = daily_quota
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.cooldown_seconds = cooldown_seconds
+        self.quota_timezone = ZoneInfo(quota_timezone)
+        self.prefix = f"key_scheduler:{api_name.lower()}"
+        self._take_token = client.register_script(TOKEN_BUCKET_SCRIPT)
+    
+    def _quota_day(self) -> str:
+        """Dia de quota atual."""
+        return datetime.now(self.quota_timezone).strftime('%Y-%m-%d')
+    
+    def seconds_until_quota_reset(self) -> int:
+        """Segundos até a virada do dia de quota."""
+        now = datetime.now(self.quota_timezone)
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return max(1, int((midnight - now).total_seconds()))
+    
+    def _quota_key(self) -> str:
+        return f"{self.prefix}:quota:{self._quota_day()}"
+    
+    def _cooldown_key(self, fingerprint: str) -> str:
+        return f"{self.prefix}:cooldown:{fingerprint}"
+    
+    def _bucket_key(self, fingerprint: str) -> str:
+        return f"{self.prefix}:bucket:{fingerprint}"
+    
+    def _used_units(self) -> dict:
+        """Unidades gastas no dia de quota atual, por fingerprint."""
+        return {
+            fingerprint: int(units)
+            for fingerprint, units in self.client.hgetall(self._quota_key()).items()
+        }
+    
+    def charge(self, api_key: str, units: int) -> None:
+        """Registra unidades de quota gastas por uma chave."""
+        if units <= 0:
+            return
+        quota_key = self._quota_key()
+        try:
+            pipe = self.client.pipeline()
+            pipe.hincrby(quota_key, key_fingerprint(api_key), units)
+            pipe.expire(quota_key, 2 * 86400)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"{self.api_name}: Erro ao registrar o consumo de quota: {e}")
+    
+    def cooldown(self, api_key: str, reason: str = "", seconds: Optional[int] = None) -> None:
+        """
+        Coloca uma chave em cooldown.
+        
+        Args:
+            api_key: Chave de API
+            reason: Motivo (exibido no status)
+            seconds: Duração do cooldown (padrão: `cooldown_seconds`)
+        """
+        seconds = seconds or self.cooldown_seconds
+        fingerprint = key_fingerprint(api_key)
+        self.client.set(self._cooldown_key(fingerprint), reason or "falha", ex=seconds)
+        logger.warning(f"{self.api_name}: Chave {fingerprint} em cooldown por {seconds}s ({reason})")
+    
+    def cooldown_until_reset(self, api_key: str, reason: str = "quota esgotada") -> None:
+        """Coloca uma chave em cooldown até a virada do dia de quota."""
+        self.cooldown(api_key, reason, self.seconds_until_quota_reset())
+    
+    def acquire(
+        self,
+        required_units: int = 1,
+        exclude: Optional[set] = None,
+        max_wait: float = 5.0,
+    ) -> Optional[str]:
+        """
+        Seleciona uma chave para a próxima chamada.
+        
+        Entre as chaves fora de cooldown e com quota suficiente, prefere a de maior
+        quota restante e consome um token do seu bucket. Se nenhuma tiver token
+        disponível, espera o próximo token (até `max_wait` segundos).
+        
+        Args:
+            required_units: Unidades de quota que a chamada deve consumir
+            exclude: Chaves a ignorar (ex: já tentadas nesta operação)
+            max_wait: Tempo máximo de espera por um token
+        
+        Returns:
+            Chave selecionada ou None se nenhuma chave estiver disponível
+        """
+        deadline = time.monotonic() + max_wait
+        
+        while True:
+            candidates = self._available_keys(required_units, exclude or set())
+            if not candidates:
+                return None
+            
+            min_wait_ms = None
+            for api_key in candidates:
+                wait_ms = self._take_token(
+                    keys=[self._bucket_key(key_fingerprint(api_key))],
+                    args=[self.burst, self.rate_per_second, time.time()],
+                )
+                if wait_ms == 0:
+                    return api_key
+                min_wait_ms = wait_ms if min_wait_ms is None else min(min_wait_ms, wait_ms)
+            
+            wait = min_wait_ms / 1000
+            if time.monotonic() + wait > deadline:
+                logger.warning(f"{self.api_name}: Nenhuma chave com tokens disponíveis")
+                return None
+            time.sleep(wait)
+    
+    def _available_keys(self, required_units: int, exclude: set) -> List[str]:
+        """Chaves fora de cooldown e com quota, da maior para a menor quota restante."""
+        used = self._used_units()
+        pipe = self.client.pipeline()
+        for api_key in self.api_keys:
+            pipe.exists(self._cooldown_key(key_fingerprint(api_key)))
+        cooling_down = pipe.execute()
+        
+        candidates = []
+        for api_key, in_cooldown in zip(self.api_keys, cooling_down):
+            if api_key in exclude or in_cooldown:
+                continue
+            used_units = used.get(key_fingerprint(api_key), 0)
+            if self.daily_quota is not None and used_units + required_units > self.daily_quota:
+                continue
+            candidates.append((used_units, api_key))
+        
+        return [api_key for _, api_key in sorted(candidates, key=lambda item: item[0])]
+    
+    def get_status(self) -> dict:
+        """Retorna o consumo de quota e o estado de cada chave, compartilhado por todos os workers."""
+        used = self._used_units()
+        keys = []
+        for index, api_key in enumerate(self.api_keys, start=1):
+            fingerprint = key_fingerprint(api_key)
+            cooldown_key = self._cooldown_key(fingerprint)
+            used_units = used.get(fingerprint, 0)
+            keys.append({
+                'index': index,
+                'fingerprint': fingerprint,
+                'used_units': used_units,
+                'remaining_units': None if self.daily_quota is None else max(0, self.daily_quota - used_units),
+                'cooldown_seconds': max(0, self.client.ttl(cooldown_key)),
+                'cooldown_reason': self.client.get(cooldown_key),
+            })
+        
+        return {
+            'api_name': self.api_name,
+            'quota_day': self._quota_day(),
+            'seconds_until_reset': self.seconds_until_quota_reset(),
+            'daily_quota_per_key': self.daily_quota,
+            'total_keys': len(self.api_keys),
+            'available_keys': sum(
+                1 for key in keys
+                if not key['cooldown_seconds'] and key['remaining_units'] != 0
+            ),
+            'used_units': sum(key['used_units'] for key in keys),
+            'keys': keys,
+        }
+
+
+@lru_cache()
+def get_youtube_key_scheduler() -> KeyScheduler:
+    """Retorna o escalonador das chaves da YouTube Data API configurado a partir das Settings."""
+    settings = get_settings()
+    return KeyScheduler(
+        get_redis_client(),
+        api_name="YouTube",
+        api_keys=settings.get_youtube_keys(),
+        daily_quota=settings.youtube_daily_quota_units,
+        rate_per_second=settings.api_key_rate_per_second,
+        burst=settings.api_key_burst,
+        cooldown_seconds=settings.api_key_cooldown_seconds,
+        quota_timezone=settings.api_quota_timezone,
+    )
+
+
+@lru_cache()
+def get_openai_key_scheduler() -> KeyScheduler:
+    """Retorna o escalonador das chaves OpenAI (sem quota diária) configurado a partir das Settings."""
+    settings = get_settings()
+    return KeyScheduler(
+        get_redis_client(),
+        api_name="OpenAI",
+        api_keys=settings.get_openai_keys(),
+        rate_per_second=settings.api_key_rate_per_second,
+        burst=settings.api_key_burst,
+        cooldown_seconds=settings.api_key_cooldown_seconds,
+    )
@@ -0,0 +1,137 @@
+"""
+Publicação agrupada do progresso das tarefas Celery.
+
+Callbacks de progresso (hooks do yt-dlp, frames da detecção de cenas) disparam
+muitas vezes por segundo. O `ProgressReporter` só grava no result backend
+quando passou um intervalo mínimo e o percentual avançou o suficiente, e
+sempre publica o estado final.
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+from celery import Task
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def percent_from_bytes(downloaded_bytes: Optional[int], total_bytes: Optional[int]) -> Optional[float]:
+    """Percentual a partir dos bytes baixados (None se o total for desconhecido)."""
+    if not total_bytes:
+        return None
+    return min(100.0, 100.0 * (downloaded_bytes or 0) / total_bytes)
+
+
+class ProgressReporter:
+    """Publica o progresso de uma tarefa com limite de frequência. Pode ser usado de várias threads."""
+    
+    def __init__(
+        self,
+        task: Task,
+        task_id: Optional[str] = None,
+        min_interval: float = 1.0,
+        min_percent_delta: float = 1.0,
+        max_interval: float = 5.0,
+    ):
+        """
+        Inicializa o reporter.
+        
+        Args:
+            task: Tarefa Celery (bind=True)
+            task_id: ID da tarefa (obrigatório quando usado fora da thread da tarefa)
+            min_interval: Intervalo mínimo em segundos entre publicações
+            min_percent_delta: Avanço mínimo do percentual para publicar
+            max_interval: Após esse intervalo, publica mesmo sem avanço (ex: velocidade e ETA)
+        """
+        self.task = task
+        self.task_id = task_id or task.request.id
+        self.min_interval = min_interval
+        self.min_percent_delta = min_percent_delta
+        self.max_interval = max_interval
+        self.last_published_at = None
+        self.last_percent = None
+        self.published = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+    
+    def _due(self, percent: float) -> bool:
+        """Indica se uma atualização com esse percentual deve ser publicada agora."""
+        if self.last_published_at is None:
+            return True
+        elapsed = time.monotonic() - self.last_published_at
+        if elapsed < self.min_interval:
+            return False
+        return abs(percent - self.last_percent) >= self.min_percent_delta or elapsed >= self.max_interval
+    
+    def update(
+        self,
+        percent: Optional[float] = None,
+        status: str = "",
+        downloaded_bytes: Optional[int] = None,
+        total_bytes: Optional[int] = None,
+        force: bool = False,
+        **extra,
+    ) -> bool:
+        """
+        Atualiza o progresso, publicando apenas se o limite de frequência permitir.
+        
+        Com `downloaded_bytes` e `total_bytes`, o percentual é calculado a partir dos bytes.
+        Valores chamáveis em `extra` só são avaliados quando o estado é publicado
+        (ex: serializar as cenas parciais).
+        
+        Args:
+            percent: Percentual concluído (0-100)
+            status: Mensagem de status
+            downloaded_bytes: Bytes baixados
+            total_bytes: Total de bytes
+            force: Publica independentemente do limite de frequência
+            **extra: Campos adicionais do estado
+        
+        Returns:
+            True se o estado foi publicado
+        """
+        byte_percent = percent_from_bytes(downloaded_bytes, total_bytes)
+        if byte_percent is not None:
+            percent = byte_percent
+        percent = percent if percent is not None else (self.last_percent or 0.0)
+        
+        # A publicação fica dentro do lock para que threads não gravem estados fora de ordem
+        with self._lock:
+            if not force and not self._due(percent):
+                self.skipped += 1
+                return False
+            self.last_published_at = time.monotonic()
+            self.last_percent = percent
+            self.published += 1
+            
+            meta = {'current': int(percent), 'total': 100, 'status': status}
+            if downloaded_bytes is not None:
+                meta['downloaded_bytes'] = downloaded_bytes
+            if total_bytes is not None:
+                meta['total_bytes'] = total_bytes
+            for name, value in extra.items():
+                meta[name] = value() if callable(value) else value
+            
+            self.task.update_state(task_id=self.task_id, state='PROGRESS', meta=meta)
+        return True
+    
+    def flush(self, status: str = "", percent: float = 100.0, **extra) -> None:
+        """Publica o estado final, ignorando o limite de frequência."""
+        self.update(percent, status, force=True, **extra)
+        logger.debug(
+            f"Progresso da tarefa {self.task_id}: {self.published} publicações, {self.skipped} agrupadas"
+        )
+
+
+def get_progress_reporter(task: Task, task_id: Optional[str] = None) -> ProgressReporter:
+    """Retorna um reporter configurado a partir das Settings."""
+    settings = get_settings()
+    return ProgressReporter(
+        task,
+        task_id=task_id,
+        min_interval=settings.progress_min_interval_seconds,
+        min_percent_delta=settings.progress_min_percent_delta,
+        max_interval=settings.progress_max_interval_seconds,
+    )
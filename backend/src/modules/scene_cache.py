@@ -0,0 +1,168 @@
+"""
+Cache de resultados da detecção de cenas endereçado pelo conteúdo do vídeo.
+Os resultados ficam no Redis com expulsão LRU limitada por quantidade e tamanho.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import Optional
+import redis
+from src.redis_client import get_redis_client
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Arquivos maiores que isso usam hash amostrado em vez do hash completo
+SAMPLED_HASH_THRESHOLD = 256 * 1024 * 1024  # 256 MB
+SAMPLE_SIZE = 4 * 1024 * 1024  # 4 MB por amostra
+SAMPLE_COUNT = 16
+READ_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# Formato dos hashes gerados por `compute_file_hash`; também usados em nomes de arquivo
+FILE_HASH_PATTERN = r'^(sha256|sampled):[0-9a-f]{64}$'
+
+
+def compute_file_hash(file_path: str) -> str:
+    """
+    Calcula o hash do conteúdo de um arquivo.
+    
+    Arquivos pequenos usam SHA-256 do conteúdo completo. Arquivos grandes usam
+    SHA-256 do tamanho mais `SAMPLE_COUNT` amostras espalhadas pelo arquivo,
+    evitando ler gigabytes só para montar a chave.
+    
+    Args:
+        file_path: Caminho para o arquivo
+    
+    Returns:
+        Hash no formato '<tipo>:<hex>' (ex: 'sha256:ab12...', 'sampled:cd34...')
+    """
+    size = os.path.getsize(file_path)
+    digest = hashlib.sha256()
+    
+    with open(file_path, 'rb') as f:
+        if size <= SAMPLED_HASH_THRESHOLD:
+            for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b''):
+                digest.update(chunk)
+            return f"sha256:{digest.hexdigest()}"
+        
+        digest.update(str(size).encode())
+        for i in range(SAMPLE_COUNT):
+            f.seek((size - SAMPLE_SIZE) * i // (SAMPLE_COUNT - 1))
+            digest.update(f.read(SAMPLE_SIZE))
+        return f"sampled:{digest.hexdigest()}"
+
+
+def is_valid_file_hash(file_hash: str) -> bool:
+    """Indica se o valor tem o formato de um hash de `compute_file_hash`."""
+    return re.fullmatch(FILE_HASH_PATTERN, file_hash or '') is not None
+
+
+def make_cache_key(file_hash: str, method: str, **params) -> str:
+    """
+    Monta a chave do cache a partir do hash do arquivo, do método e dos thresholds.
+    
+    Args:
+        file_hash: Hash do conteúdo do vídeo (ver `compute_file_hash`)
+        method: Método de detecção
+        **params: Parâmetros que influenciam o resultado (ex: thresholds)
+    
+    Returns:
+        Chave hexadecimal
+    """
+    payload = json.dumps({'file_hash': file_hash, 'method': method, **params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SceneResultCache:
+    """Cache LRU de resultados de detecção de cenas armazenado no Redis."""
+    
+    KEY_PREFIX = "scene_cache:entry:"
+    LRU_KEY = "scene_cache:lru"  # Sorted set: chave -> último acesso
+    SIZES_KEY = "scene_cache:sizes"  # Hash: chave -> tamanho em bytes
+    TOTAL_BYTES_KEY = "scene_cache:total_bytes"
+    
+    def __init__(self, client: redis.Redis, max_entries: int = 500, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Inicializa o cache.
+        
+        Args:
+            client: Cliente Redis
+            max_entries: Número máximo de resultados armazenados
+            max_bytes: Tamanho máximo total dos resultados armazenados
+        """
+        self.client = client
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+    
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Retorna o resultado armazenado e atualiza seu último acesso.
+        
+        Args:
+            key: Chave do cache (ver `make_cache_key`)
+        
+        Returns:
+            Resultado armazenado ou None se não existir
+        """
+        try:
+            data = self.client.get(self.KEY_PREFIX + key)
+            if data is None:
+                return None
+            self.client.zadd(self.LRU_KEY, {key: time.time()})
+            return json.loads(data)
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao consultar o cache de cenas: {e}")
+            return None
+    
+    def set(self, key: str, result: dict) -> None:
+        """
+        Armazena um resultado e expulsa os menos usados se os limites forem excedidos.
+        
+        Args:
+            key: Chave do cache (ver `make_cache_key`)
+            result: Resultado serializável em JSON
+        """
+        data = json.dumps(result)
+        try:
+            previous_size = int(self.client.hget(self.SIZES_KEY, key) or 0)
+            pipe = self.client.pipeline()
+            pipe.set(self.KEY_PREFIX + key, data)
+            pipe.zadd(self.LRU_KEY, {key: time.time()})
+            pipe.hset(self.SIZES_KEY, key, len(data))
+            pipe.incrby(self.TOTAL_BYTES_KEY, len(data) - previous_size)
+            pipe.execute()
+            self._evict()
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao gravar no cache de cenas: {e}")
+    
+    def _evict(self) -> None:
+        """Remove as entradas menos usadas até respeitar os limites."""
+        while (
+            self.client.zcard(self.LRU_KEY) > self.max_entries
+            or int(self.client.get(self.TOTAL_BYTES_KEY) or 0) > self.max_bytes
+        ):
+            oldest = self.client.zpopmin(self.LRU_KEY)
+            if not oldest:
+                break
+            key = oldest[0][0]
+            size = int(self.client.hget(self.SIZES_KEY, key) or 0)
+            pipe = self.client.pipeline()
+            pipe.delete(self.KEY_PREFIX + key)
+            pipe.hdel(self.SIZES_KEY, key)
+            pipe.decrby(self.TOTAL_BYTES_KEY, size)
+            pipe.execute()
+            logger.info(f"Resultado removido do cache de cenas (LRU): {key}")
+
+
+def get_scene_cache() -> SceneResultCache:
+    """Retorna o cache de resultados configurado a partir das Settings."""
+    settings = get_settings()
+    return SceneResultCache(
+        get_redis_client(),
+        max_entries=settings.scene_cache_max_entries,
+        max_bytes=settings.scene_cache_max_bytes,
+    )
@@ -0,0 +1,147 @@
+"""
+Checkpoints da detecção de cenas armazenados no Redis.
+
+Durante a detecção, a posição atual (frame) e os cortes encontrados são gravados
+periodicamente. Um retry ou uma nova execução da mesma detecção continua a partir
+do último checkpoint em vez de decodificar o vídeo desde o frame 0.
+
+Cada detecção é reservada por uma task (`acquire`): execuções simultâneas da mesma
+detecção não gravam nem retomam checkpoints, para não sobrescrever o progresso da outra.
+"""
+
+import json
+import logging
+import time
+from typing import Optional
+import redis
+from src.redis_client import get_redis_client
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class SceneCheckpointStore:
+    """Armazena o progresso das detecções de cenas em andamento."""
+    
+    KEY_PREFIX = "scene_checkpoint:entry:"
+    TASK_KEY_PREFIX = "scene_checkpoint:task:"  # task_id -> chave do checkpoint
+    LOCK_KEY_PREFIX = "scene_checkpoint:lock:"  # Reserva da detecção -> ID da task
+    
+    def __init__(self, client: redis.Redis, ttl_seconds: int = 48 * 3600, lock_seconds: int = 300):
+        """
+        Inicializa o armazenamento.
+        
+        Args:
+            client: Cliente Redis
+            ttl_seconds: Tempo de vida de um checkpoint sem atualizações
+            lock_seconds: Tempo de vida da reserva de uma detecção sem checkpoints
+        """
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+    
+    def acquire(self, key: str, task_id: str) -> bool:
+        """
+        Reserva os checkpoints de uma detecção para uma task.
+        
+        Um retry da mesma task mantém a reserva. A reserva vence após `lock_seconds`
+        sem checkpoints (ex: o worker caiu), e outra task pode então retomar a detecção.
+        
+        Returns:
+            True se a task detém a reserva, False se outra task está executando a detecção
+        """
+        lock_key = self.LOCK_KEY_PREFIX + key
+        try:
+            if self.client.set(lock_key, task_id, nx=True, ex=self.lock_seconds):
+                return True
+            if self.client.get(lock_key) == task_id:
+                self.client.expire(lock_key, self.lock_seconds)
+                return True
+            return False
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao reservar o checkpoint de cenas: {e}")
+            return False
+    
+    def release(self, key: str, task_id: str) -> None:
+        """Libera a reserva da detecção, se ainda pertencer à task."""
+        lock_key = self.LOCK_KEY_PREFIX + key
+        try:
+            with self.client.pipeline() as pipe:
+                pipe.watch(lock_key)
+                if pipe.get(lock_key) == task_id:
+                    pipe.multi()
+                    pipe.delete(lock_key)
+                    pipe.execute()
+        except redis.WatchError:
+            pass  # A reserva mudou de dono durante a liberação
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao liberar o checkpoint de cenas: {e}")
+    
+    def load(self, key: str) -> Optional[dict]:
+        """
+        Retorna o último checkpoint da detecção.
+        
+        Args:
+            key: Chave da detecção (ver `make_cache_key`)
+        
+        Returns:
+            Dicionário com 'frame', 'cuts', 'task_kwargs' e 'updated_at', ou None se não existir
+        """
+        try:
+            data = self.client.get(self.KEY_PREFIX + key)
+            return json.loads(data) if data is not None else None
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao consultar o checkpoint de cenas: {e}")
+            return None
+    
+    def load_for_task(self, task_id: str) -> Optional[dict]:
+        """Retorna o último checkpoint gravado por uma task, se existir."""
+        try:
+            key = self.client.get(self.TASK_KEY_PREFIX + task_id)
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao consultar o checkpoint de cenas: {e}")
+            return None
+        return self.load(key) if key else None
+    
+    def save(self, key: str, task_id: str, frame: int, cuts: list[int], task_kwargs: dict) -> None:
+        """
+        Grava o progresso da detecção.
+        
+        Args:
+            key: Chave da detecção (ver `make_cache_key`)
+            task_id: ID da task que gravou o checkpoint
+            frame: Próximo frame a ser processado
+            cuts: Cortes encontrados antes de `frame`
+            task_kwargs: Argumentos da task, usados para retomar manualmente a detecção
+        """
+        data = json.dumps({
+            'frame': frame,
+            'cuts': cuts,
+            'task_kwargs': task_kwargs,
+            'updated_at': time.time(),
+        })
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(self.KEY_PREFIX + key, data, ex=self.ttl_seconds)
+            pipe.set(self.TASK_KEY_PREFIX + task_id, key, ex=self.ttl_seconds)
+            pipe.expire(self.LOCK_KEY_PREFIX + key, self.lock_seconds)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao gravar o checkpoint de cenas: {e}")
+    
+    def delete(self, key: str) -> None:
+        """Remove o checkpoint de uma detecção concluída."""
+        try:
+            self.client.delete(self.KEY_PREFIX + key)
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao remover o checkpoint de cenas: {e}")
+
+
+def get_checkpoint_store() -> SceneCheckpointStore:
+    """Retorna o armazenamento de checkpoints configurado a partir das Settings."""
+    settings = get_settings()
+    return SceneCheckpointStore(
+        get_redis_client(),
+        ttl_seconds=settings.scene_checkpoint_ttl_hours * 3600,
+        lock_seconds=settings.scene_checkpoint_lock_seconds,
+    )
@@ -3,12 +3,102 @@ Módulo para detecção de cenas usando PySceneDetect.
 """
 
 import logging
-from scenedetect import detect, AdaptiveDetector, ContentDetector
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
+from scenedetect import open_video, SceneManager, StatsManager, AdaptiveDetector, ContentDetector
 from scenedetect.video_splitter import split_video_ffmpeg
 from scenedetect.frame_timecode import FrameTimecode
+from src.modules.numpy_scene_detector import NumpySceneDetector
 
 logger = logging.getLogger(__name__)
 
+# Duração mínima de cena (em frames) usada pelos detectores do PySceneDetect
+MIN_SCENE_LEN = 15
+
+# Métodos aceitos por SceneDetector.detect_scenes
+DETECTION_METHODS = ('adaptive', 'content', 'two_pass', 'numpy')
+
+# Métodos que não gravam checkpoints (`checkpoint_callback` é ignorado)
+NO_CHECKPOINT_METHODS = ('two_pass',)
+
+# Parâmetros da primeira passada (grossa) do método 'two_pass'
+COARSE_FRAME_SKIP = 4  # Analisa 1 a cada 5 frames
+COARSE_WIDTH = 160  # Largura aproximada dos frames na passada grossa
+COARSE_THRESHOLD_FACTOR = 0.6  # Mais sensível, para não perder candidatos
+
+# Intervalo (em segundos de vídeo) entre os relatórios de progresso da detecção
+PROGRESS_INTERVAL_SECONDS = 10
+
+# Segundos de vídeo decodificados antes do checkpoint ao retomar uma detecção,
+# para reconstruir o estado interno do detector (frame anterior e janela do adaptive)
+RESUME_WARMUP_SECONDS = 2
+
+
+def serialize_scenes(scene_list: list[tuple[FrameTimecode, FrameTimecode]]) -> list[dict]:
+    """Converte FrameTimecode para um formato serializável (string de tempo e frame number)."""
+    return [
+        {
+            'start_time': str(scene[0].get_seconds()),
+            'end_time': str(scene[1].get_seconds()),
+            'start_frame': scene[0].frame_num,
+            'end_frame': scene[1].frame_num,
+            'duration': (scene[1] - scene[0]).get_seconds()
+        }
+        for scene in scene_list
+    ]
+
+
+def _detect_cuts_in_range(
+    video_path: str,
+    method: str,
+    adaptive_threshold: float,
+    content_threshold: float,
+    start_frame: int,
+    end_frame: int,
+    owned_start: int,
+    owned_end: int,
+) -> list[int]:
+    """
+    Detecta cortes em um intervalo de frames do vídeo.
+    
+    Executada em um processo separado por shard. O intervalo [start_frame, end_frame)
+    inclui a sobreposição com os shards vizinhos, mas apenas os cortes dentro de
+    [owned_start, owned_end) são retornados.
+    
+    Returns:
+        Lista com os números de frame dos cortes pertencentes ao shard.
+    """
+    detector = SceneDetector(
+        adaptive_threshold=adaptive_threshold,
+        content_threshold=content_threshold
+    )
+    video = open_video(video_path)
+    if start_frame > 0:
+        video.seek(start_frame)
+    
+    scene_manager = SceneManager()
+    scene_manager.add_detector(detector._create_detector(method))
+    scene_manager.detect_scenes(video=video, end_time=end_frame)
+    
+    cuts = [cut.get_frames() for cut in scene_manager.get_cut_list()]
+    return [cut for cut in cuts if owned_start <= cut < owned_end]
+
+
+def _create_executor(max_workers: int):
+    """
+    Cria o pool de execução dos shards.
+    
+    Processos daemon (ex: workers prefork do Celery) não podem criar filhos,
+    então nesse caso usamos threads (a decodificação do OpenCV libera o GIL).
+    """
+    if multiprocessing.current_process().daemon:
+        logger.warning("Processo atual é daemon, usando threads para os shards")
+        return ThreadPoolExecutor(max_workers=max_workers)
+    return ProcessPoolExecutor(max_workers=max_workers)
+
+
 class SceneDetector:
     """
     Classe wrapper para o PySceneDetect.
@@ -17,38 +107,359 @@ class SceneDetector:
         self.adaptive_threshold = adaptive_threshold
         self.content_threshold = content_threshold
     
-    def detect_scenes(self, video_path: str, method: str = 'adaptive') -> list[tuple[FrameTimecode, FrameTimecode]]:
+    def _create_detector(self, method: str):
+        """Cria o detector do PySceneDetect para o método especificado."""
+        if method == 'adaptive':
+            return AdaptiveDetector(
+                adaptive_threshold=self.adaptive_threshold,
+                min_scene_len=MIN_SCENE_LEN
+            )
+        elif method == 'content':
+            return ContentDetector(
+                threshold=self.content_threshold,
+                min_scene_len=MIN_SCENE_LEN
+            )
+        raise ValueError(f"Método de detecção inválido: {method}. Use 'adaptive' ou 'content'.")
+    
+    def detect_scenes(
+        self,
+        video_path: str,
+        method: str = 'adaptive',
+        stats_manager: Optional[StatsManager] = None,
+        progress_callback: Optional[Callable] = None,
+        resume_from: Optional[dict] = None,
+        checkpoint_callback: Optional[Callable] = None,
+        checkpoint_interval: float = 30.0,
+    ) -> list[tuple[FrameTimecode, FrameTimecode]]:
         """
         Detecta cenas no vídeo usando o método especificado.
         
         Args:
             video_path: Caminho para o arquivo de vídeo.
-            method: 'adaptive' ou 'content'.
-            
+            method: 'adaptive', 'content', 'two_pass' ou 'numpy'.
+            stats_manager: StatsManager opcional para registrar as métricas por frame.
+            progress_callback: Chamado a cada `PROGRESS_INTERVAL_SECONDS` de vídeo processado com
+                (frame_position, total_frames, scene_list), onde scene_list contém apenas as
+                cenas já encerradas por um corte.
+            resume_from: Checkpoint ({'frame', 'cuts'}) a partir do qual a detecção continua.
+            checkpoint_callback: Chamado a cada `checkpoint_interval` segundos de processamento
+                com (frame_position, cuts). Não suportado por 'two_pass'.
+            checkpoint_interval: Intervalo mínimo (em segundos) entre checkpoints.
+        
         Returns:
             Lista de tuplas (start_timecode, end_timecode) representando as cenas.
         """
+        if method == 'two_pass':
+            return self.detect_scenes_two_pass(video_path)
+        if method == 'numpy':
+            return self.detect_scenes_numpy(
+                video_path,
+                progress_callback=progress_callback,
+                resume_from=resume_from,
+                checkpoint_callback=checkpoint_callback,
+                checkpoint_interval=checkpoint_interval,
+            )
+        
         logger.info(f"Iniciando detecção de cenas em {video_path} com método {method}")
         
-        if method == 'adaptive':
-            detector = AdaptiveDetector(
-                adaptive_threshold=self.adaptive_threshold
-            )
-        elif method == 'content':
-            detector = ContentDetector(
-                threshold=self.content_threshold
-            )
-        else:
-            raise ValueError(f"Método de detecção inválido: {method}. Use 'adaptive' ou 'content'.")
+        detector = self._create_detector(method)
         
         try:
-            scene_list = detect(video_path, detector)
+            video = open_video(video_path)
+            fps = video.frame_rate
+            total_frames = video.duration.get_frames()
+            scene_manager = SceneManager(stats_manager=stats_manager)
+            scene_manager.add_detector(detector)
+            
+            # Ao retomar, decodificar alguns segundos antes do checkpoint para reconstruir o
+            # estado do detector. Cortes muito próximos do início da retomada são descartados
+            # (o detector ainda não tem histórico ali) e os demais são unidos aos do checkpoint.
+            resumed_cuts = []
+            warmup_start = 0
+            if resume_from and resume_from['frame'] > 0:
+                resumed_cuts = list(resume_from['cuts'])
+                warmup_start = max(0, resume_from['frame'] - int(fps * RESUME_WARMUP_SECONDS))
+                video.seek(warmup_start)
+                logger.info(f"Retomando detecção do frame {resume_from['frame']} ({len(resumed_cuts)} cortes)")
+            
+            def current_cuts() -> list[int]:
+                cuts = [cut.get_frames() for cut in scene_manager.get_cut_list()]
+                if warmup_start > 0:
+                    cuts = resumed_cuts + [cut for cut in cuts if cut >= warmup_start + MIN_SCENE_LEN]
+                    return self._merge_cuts(cuts)
+                return cuts
+            
+            if progress_callback is None and checkpoint_callback is None:
+                scene_manager.detect_scenes(video=video)
+            else:
+                # Processar em blocos para publicar as cenas encontradas até o momento
+                chunk_frames = max(1, int(fps * PROGRESS_INTERVAL_SECONDS))
+                last_checkpoint = time.monotonic()
+                while True:
+                    processed = scene_manager.detect_scenes(video=video, duration=chunk_frames)
+                    frame_position = min(video.frame_number, total_frames)
+                    cuts = current_cuts()
+                    if progress_callback:
+                        progress_callback(
+                            frame_position,
+                            total_frames,
+                            self._scenes_from_cuts(cuts, cuts[-1], fps)[:-1] if cuts else [],
+                        )
+                    if processed == 0 or video.frame_number >= total_frames:
+                        break
+                    if checkpoint_callback and time.monotonic() - last_checkpoint >= checkpoint_interval:
+                        checkpoint_callback(frame_position, cuts)
+                        last_checkpoint = time.monotonic()
+            
+            cuts = current_cuts()
+            scene_list = self._scenes_from_cuts(cuts, total_frames, fps)
             logger.info(f"Detecção concluída. {len(scene_list)} cenas encontradas.")
             return scene_list
         except Exception as e:
             logger.error(f"Erro durante a detecção de cenas: {e}")
             raise
     
+    def detect_scenes_sharded(
+        self,
+        video_path: str,
+        method: str = 'adaptive',
+        shards: int = 4,
+        overlap: float = 5.0,
+        progress_callback: Optional[Callable] = None,
+    ) -> list[tuple[FrameTimecode, FrameTimecode]]:
+        """
+        Detecta cenas dividindo o vídeo em janelas de tempo processadas em paralelo.
+        
+        Cada shard processa sua janela mais `overlap` segundos de cada lado, para que
+        os detectores "aqueçam" antes da fronteira. Cada shard só mantém os cortes
+        dentro da sua própria janela e os cortes são unidos no final, reproduzindo
+        o resultado de uma passada única.
+        
+        Args:
+            video_path: Caminho para o arquivo de vídeo.
+            method: 'adaptive' ou 'content'.
+            shards: Número de janelas processadas em paralelo.
+            overlap: Sobreposição entre janelas vizinhas, em segundos.
+            progress_callback: Chamado a cada shard concluído com
+                (shard_index, completed_shards, total_shards).
+        
+        Returns:
+            Lista de tuplas (start_timecode, end_timecode) representando as cenas.
+        """
+        # Validar o método antes de disparar os processos
+        self._create_detector(method)
+        
+        video = open_video(video_path)
+        fps = video.frame_rate
+        total_frames = video.duration.get_frames()
+        shards = max(1, min(shards, total_frames // MIN_SCENE_LEN or 1))
+        overlap_frames = int(round(overlap * fps))
+        
+        logger.info(
+            f"Iniciando detecção em {shards} shards ({total_frames} frames, "
+            f"sobreposição de {overlap_frames} frames) em {video_path} com método {method}"
+        )
+        
+        bounds = [i * total_frames // shards for i in range(shards + 1)]
+        cuts = []
+        
+        try:
+            with _create_executor(shards) as executor:
+                futures = {
+                    executor.submit(
+                        _detect_cuts_in_range,
+                        video_path,
+                        method,
+                        self.adaptive_threshold,
+                        self.content_threshold,
+                        max(0, bounds[i] - overlap_frames),
+                        min(total_frames, bounds[i + 1] + overlap_frames),
+                        bounds[i],
+                        bounds[i + 1],
+                    ): i
+                    for i in range(shards)
+                }
+                
+                for completed, future in enumerate(as_completed(futures), start=1):
+                    shard_index = futures[future]
+                    cuts.extend(future.result())
+                    logger.info(f"Shard {shard_index + 1}/{shards} concluído")
+                    if progress_callback:
+                        progress_callback(shard_index, completed, shards)
+        except Exception as e:
+            logger.error(f"Erro durante a detecção de cenas em shards: {e}")
+            raise
+        
+        scene_list = self._scenes_from_cuts(self._merge_cuts(cuts), total_frames, fps)
+        logger.info(f"Detecção concluída. {len(scene_list)} cenas encontradas.")
+        return scene_list
+    
+    def detect_scenes_two_pass(
+        self,
+        video_path: str,
+        refine_method: str = 'adaptive',
+        frame_skip: int = COARSE_FRAME_SKIP,
+    ) -> list[tuple[FrameTimecode, FrameTimecode]]:
+        """
+        Detecta cenas em duas passadas (grossa e refinamento).
+        
+        A primeira passada analisa 1 a cada `frame_skip + 1` frames em resolução
+        reduzida, com um ContentDetector mais sensível, para encontrar cortes
+        candidatos. A segunda passada decodifica todos os frames apenas em pequenas
+        janelas ao redor de cada candidato, usando o detector de `refine_method`.
+        
+        A passada grossa ainda decodifica todos os frames (só não os analisa), então o
+        ganho depende da densidade de cortes: em vídeos com planos longos o refinamento
+        cobre pouco do vídeo e o método é mais rápido que a passada única; com cortes a
+        cada poucos segundos as janelas cobrem quase tudo e ele fica mais lento. Meça
+        com `benchmarks/benchmark_scene_detection.py` antes de usá-lo.
+        
+        Args:
+            video_path: Caminho para o arquivo de vídeo.
+            refine_method: Método usado no refinamento ('adaptive' ou 'content').
+            frame_skip: Número de frames pulados entre cada frame analisado na passada grossa.
+        
+        Returns:
+            Lista de tuplas (start_timecode, end_timecode) representando as cenas.
+        """
+        logger.info(f"Iniciando detecção em duas passadas em {video_path} (refinamento: {refine_method})")
+        
+        # Validar o método de refinamento antes de decodificar o vídeo
+        self._create_detector(refine_method)
+        
+        try:
+            # 1. Passada grossa: frames pulados e resolução reduzida
+            video = open_video(video_path)
+            fps = video.frame_rate
+            total_frames = video.duration.get_frames()
+            
+            scene_manager = SceneManager()
+            scene_manager.auto_downscale = False
+            scene_manager.downscale = max(1, video.frame_size[0] // COARSE_WIDTH)
+            scene_manager.add_detector(ContentDetector(
+                threshold=self.content_threshold * COARSE_THRESHOLD_FACTOR,
+                min_scene_len=1
+            ))
+            scene_manager.detect_scenes(video=video, frame_skip=frame_skip)
+            candidates = [cut.get_frames() for cut in scene_manager.get_cut_list()]
+            
+            logger.info(f"Passada grossa concluída. {len(candidates)} cortes candidatos.")
+            
+            # 2. Refinamento: o corte real está entre o frame analisado anterior e o candidato.
+            # A janela é estendida para trás (aquecimento do detector e duração mínima de cena)
+            # e para frente (o AdaptiveDetector só confirma um corte alguns frames depois).
+            # Janelas cujas margens se tocam são unidas e decodificadas uma única vez.
+            margin = MIN_SCENE_LEN + (frame_skip + 1)
+            windows = []
+            for candidate in candidates:
+                owned_start = max(0, candidate - frame_skip - 1)
+                owned_end = min(total_frames, candidate + 1)
+                if windows and owned_start - margin <= windows[-1][1] + margin:
+                    windows[-1][1] = owned_end
+                else:
+                    windows.append([owned_start, owned_end])
+            
+            # O mesmo stream é reaproveitado: cada janela só faz um seek, sem reabrir o vídeo
+            cuts = []
+            for owned_start, owned_end in windows:
+                video.seek(max(0, owned_start - margin))
+                window_manager = SceneManager()
+                window_manager.add_detector(self._create_detector(refine_method))
+                window_manager.detect_scenes(video=video, end_time=min(total_frames, owned_end + margin))
+                cuts.extend(
+                    cut for cut in (cut.get_frames() for cut in window_manager.get_cut_list())
+                    if owned_start <= cut < owned_end
+                )
+        except Exception as e:
+            logger.error(f"Erro durante a detecção de cenas em duas passadas: {e}")
+            raise
+        
+        scene_list = self._scenes_from_cuts(self._merge_cuts(cuts), total_frames, fps)
+        logger.info(
+            f"Detecção concluída. {len(scene_list)} cenas encontradas "
+            f"({len(windows)} janelas refinadas)."
+        )
+        return scene_list
+    
+    def detect_scenes_numpy(
+        self,
+        video_path: str,
+        progress_callback: Optional[Callable] = None,
+        resume_from: Optional[dict] = None,
+        checkpoint_callback: Optional[Callable] = None,
+        checkpoint_interval: float = 30.0,
+    ) -> list[tuple[FrameTimecode, FrameTimecode]]:
+        """
+        Detecta cenas com o backend vetorizado em NumPy (ver `NumpySceneDetector`).
+        
+        Args:
+            video_path: Caminho para o arquivo de vídeo.
+            progress_callback: Mesmo formato do `progress_callback` de `detect_scenes`.
+            resume_from: Mesmo formato do `resume_from` de `detect_scenes`.
+            checkpoint_callback: Mesmo formato do `checkpoint_callback` de `detect_scenes`.
+            checkpoint_interval: Intervalo mínimo (em segundos) entre checkpoints.
+        
+        Returns:
+            Lista de tuplas (start_timecode, end_timecode) representando as cenas.
+        """
+        numpy_detector = NumpySceneDetector(
+            threshold=self.content_threshold,
+            min_scene_len=MIN_SCENE_LEN
+        )
+        fps = None
+        last_checkpoint = time.monotonic()
+        
+        def cuts_progress_callback(frame_position, total_frames, cuts):
+            nonlocal last_checkpoint
+            if progress_callback:
+                closed_scenes = self._scenes_from_cuts(cuts, cuts[-1], fps)[:-1] if cuts else []
+                progress_callback(frame_position, total_frames, closed_scenes)
+            if checkpoint_callback and time.monotonic() - last_checkpoint >= checkpoint_interval:
+                checkpoint_callback(frame_position, list(cuts))
+                last_checkpoint = time.monotonic()
+        
+        try:
+            fps = open_video(video_path).frame_rate
+            cuts, total_frames, _ = numpy_detector.detect_cuts(
+                video_path,
+                progress_callback=cuts_progress_callback if progress_callback or checkpoint_callback else None,
+                start_frame=resume_from['frame'] if resume_from else 0,
+                initial_cuts=resume_from['cuts'] if resume_from else None,
+            )
+        except Exception as e:
+            logger.error(f"Erro durante a detecção de cenas vetorizada: {e}")
+            raise
+        
+        scene_list = self._scenes_from_cuts(cuts, total_frames, fps)
+        logger.info(f"Detecção concluída. {len(scene_list)} cenas encontradas.")
+        return scene_list
+    
+    @staticmethod
+    def _merge_cuts(cuts: list[int]) -> list[int]:
+        """Ordena os cortes, remove duplicatas e respeita a duração mínima de cena."""
+        merged = []
+        last_cut = 0
+        for cut in sorted(set(cuts)):
+            if cut - last_cut >= MIN_SCENE_LEN:
+                merged.append(cut)
+                last_cut = cut
+        return merged
+    
+    @staticmethod
+    def _scenes_from_cuts(
+        cuts: list[int],
+        total_frames: int,
+        fps: float,
+    ) -> list[tuple[FrameTimecode, FrameTimecode]]:
+        """Converte uma lista de cortes em cenas, como o `detect()` do PySceneDetect."""
+        if not cuts:
+            return []
+        boundaries = [0] + cuts + [total_frames]
+        return [
+            (FrameTimecode(start, fps=fps), FrameTimecode(end, fps=fps))
+            for start, end in zip(boundaries, boundaries[1:])
+        ]
+    
     def split_video(self, video_path: str, scene_list: list[tuple[FrameTimecode, FrameTimecode]], output_dir: str = 'clips') -> None:
         """
         Divide o vídeo em clipes usando a lista de cenas detectadas.
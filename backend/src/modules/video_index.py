@@ -0,0 +1,172 @@
+"""
+Índice persistente dos vídeos já coletados e baixados.
+
+Os IDs dos vídeos coletados ficam no Redis em um set (exato) ou, para históricos
+grandes, em um filtro de Bloom sobre um bitmap (tamanho fixo, com uma pequena
+taxa de falsos positivos). Os downloads ficam em um hash video_id -> metadados,
+usado para reaproveitar o arquivo já baixado em vez de baixar de novo.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from typing import Iterable, List, Optional
+import redis
+from src.redis_client import get_redis_client
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# IDs de vídeo do YouTube: 11 caracteres [A-Za-z0-9_-]
+VIDEO_ID_PATTERN = re.compile(
+    r'(?:v=|youtu\.be/|/shorts/|/embed/|/live/|/v/)([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])'
+)
+BARE_VIDEO_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+
+def extract_video_id(url_or_id: str) -> Optional[str]:
+    """
+    Extrai o ID do vídeo de uma URL do YouTube (watch, youtu.be, shorts, embed, live).
+    
+    Args:
+        url_or_id: URL do vídeo ou o próprio ID
+    
+    Returns:
+        ID do vídeo ou None se não for possível identificá-lo
+    """
+    value = (url_or_id or '').strip()
+    if BARE_VIDEO_ID.match(value):
+        return value
+    match = VIDEO_ID_PATTERN.search(value)
+    return match.group(1) if match else None
+
+
+class VideoIndex:
+    """Índice no Redis dos vídeos já coletados e baixados, compartilhado por todas as execuções."""
+    
+    COLLECTED_KEY = "video_index:collected"  # Set de IDs coletados
+    BLOOM_KEY = "video_index:collected:bloom"  # Bitmap do filtro de Bloom
+    DOWNLOADS_KEY = "video_index:downloads"  # Hash: video_id -> metadados do download (JSON)
+    
+    def __init__(
+        self,
+        client: redis.Redis,
+        backend: str = "set",
+        bloom_bits: int = 8 * 1024 * 1024,
+        bloom_hashes: int = 7,
+    ):
+        """
+        Inicializa o índice.
+        
+        Args:
+            client: Cliente Redis
+            backend: 'set' (exato) ou 'bloom' (memória fixa, com falsos positivos)
+            bloom_bits: Tamanho do bitmap do filtro de Bloom
+            bloom_hashes: Número de funções de hash do filtro de Bloom
+        """
+        self.client = client
+        self.use_bloom = backend == "bloom"
+        self.bloom_bits = bloom_bits
+        self.bloom_hashes = bloom_hashes
+    
+    def _bloom_offsets(self, video_id: str) -> List[int]:
+        """Posições do vídeo no bitmap (double hashing sobre o SHA-256 do ID)."""
+        digest = hashlib.sha256(video_id.encode()).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:16], 'big') | 1
+        return [(h1 + i * h2) % self.bloom_bits for i in range(self.bloom_hashes)]
+    
+    def mark_collected(self, video_ids: Iterable[str]) -> None:
+        """Registra os vídeos como já coletados."""
+        video_ids = [video_id for video_id in video_ids if video_id]
+        if not video_ids:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        if self.use_bloom:
+            for video_id in video_ids:
+                for offset in self._bloom_offsets(video_id):
+                    pipe.setbit(self.BLOOM_KEY, offset, 1)
+        else:
+            pipe.sadd(self.COLLECTED_KEY, *video_ids)
+        pipe.execute()
+    
+    def seen(self, video_ids: List[str]) -> List[bool]:
+        """
+        Indica, para cada vídeo, se ele já foi coletado ou baixado antes.
+        
+        Args:
+            video_ids: IDs dos vídeos
+        
+        Returns:
+            Lista de booleanos na ordem dos IDs
+        """
+        if not video_ids:
+            return []
+        pipe = self.client.pipeline(transaction=False)
+        for video_id in video_ids:
+            pipe.hexists(self.DOWNLOADS_KEY, video_id)
+            if self.use_bloom:
+                for offset in self._bloom_offsets(video_id):
+                    pipe.getbit(self.BLOOM_KEY, offset)
+            else:
+                pipe.sismember(self.COLLECTED_KEY, video_id)
+        replies = pipe.execute()
+        
+        checks_per_video = 1 + (self.bloom_hashes if self.use_bloom else 1)
+        results = []
+        for i in range(len(video_ids)):
+            downloaded, *collected = replies[i * checks_per_video:(i + 1) * checks_per_video]
+            results.append(bool(downloaded) or all(collected))
+        return results
+    
+    def annotate_collected(self, videos: List[dict], exclude_seen: bool = False) -> List[dict]:
+        """
+        Marca os vídeos de uma coleta como novos ou já vistos e os registra no índice.
+        
+        Args:
+            videos: Vídeos coletados (com 'video_id')
+            exclude_seen: Remove da lista os vídeos já vistos em vez de apenas marcá-los
+        
+        Returns:
+            Vídeos com o campo 'seen'
+        """
+        try:
+            flags = self.seen([video.get('video_id') or '' for video in videos])
+            self.mark_collected(video.get('video_id') for video in videos)
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao consultar o índice de vídeos: {e}")
+            return videos
+        
+        annotated = [{**video, 'seen': flag} for video, flag in zip(videos, flags)]
+        if exclude_seen:
+            annotated = [video for video in annotated if not video['seen']]
+        logger.info(f"Índice de vídeos: {flags.count(False)} novos, {flags.count(True)} já vistos")
+        return annotated
+    
+    def get_download(self, video_id: str) -> Optional[dict]:
+        """Retorna os metadados do download do vídeo, se ele já foi baixado."""
+        data = self.client.hget(self.DOWNLOADS_KEY, video_id)
+        return json.loads(data) if data else None
+    
+    def record_download(self, download_info: dict) -> None:
+        """Registra um download concluído (ver `YouTubeDownloader.download_video`)."""
+        video_id = download_info.get('video_id')
+        if not video_id:
+            return
+        self.client.hset(self.DOWNLOADS_KEY, video_id, json.dumps(download_info))
+    
+    def forget_download(self, video_id: str) -> None:
+        """Remove o registro de download (ex: o arquivo foi apagado)."""
+        self.client.hdel(self.DOWNLOADS_KEY, video_id)
+
+
+def get_video_index() -> VideoIndex:
+    """Retorna o índice de vídeos configurado a partir das Settings."""
+    settings = get_settings()
+    return VideoIndex(
+        get_redis_client(),
+        backend=settings.video_index_backend,
+        bloom_bits=settings.video_index_bloom_bits,
+        bloom_hashes=settings.video_index_bloom_hashes,
+    )
@@ -3,13 +3,83 @@ Módulo de coleta de vídeos do YouTube.
 Responsável apenas pela lógica de busca e download usando yt-dlp.
 """
 
+import base64
 import logging
-from typing import List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, List, Optional
+from urllib.parse import urlencode
 import yt_dlp
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Queries padrão da busca automática
+DEFAULT_AUTO_QUERIES = ["Jogo Completo", "Melhores Momentos"]
+
+SEARCH_BASE_URL = "https://www.youtube.com/results"
+
+# Valores do parâmetro de filtro `sp` da busca do YouTube (mensagem protobuf em base64)
+SEARCH_SORT_ORDERS = {'relevance': 0, 'date': 2}
+SEARCH_UPLOAD_DATES = {'hour': 1, 'day': 2, 'week': 3, 'month': 4, 'year': 5}
+SEARCH_TYPE_VIDEO = 1
+SEARCH_DURATION_SHORT = 1  # Vídeos com menos de 4 minutos
+SHORT_VIDEO_MAX_MINUTES = 4
+
+# Número máximo de resultados percorridos (paginando) para preencher uma busca filtrada
+MAX_SCANNED_RESULTS = 200
+
+
+def build_search_url(
+    search_query: str,
+    filter_by: str = "relevance",
+    time_range: str = "any",
+    max_duration: Optional[int] = None,
+) -> str:
+    """
+    Monta a URL de busca do YouTube com os filtros nativos da busca.
+    
+    A ordenação, o intervalo de upload e o tipo (apenas vídeos) vão no parâmetro `sp`,
+    então o YouTube já retorna os vídeos certos em vez de filtrarmos depois. A duração
+    máxima só é enviada quando cabe no filtro de vídeos curtos (< 4 minutos); nos demais
+    casos ela continua sendo aplicada sobre os resultados.
+    
+    Args:
+        search_query: Termo de busca
+        filter_by: 'relevance' ou 'date'
+        time_range: 'any', 'hour', 'day', 'week', 'month' ou 'year'
+        max_duration: Duração máxima em minutos (opcional)
+    
+    Returns:
+        URL de busca
+    """
+    filters = bytes([0x10, SEARCH_TYPE_VIDEO])
+    if time_range in SEARCH_UPLOAD_DATES:
+        filters = bytes([0x08, SEARCH_UPLOAD_DATES[time_range]]) + filters
+    if max_duration and max_duration <= SHORT_VIDEO_MAX_MINUTES:
+        filters += bytes([0x18, SEARCH_DURATION_SHORT])
+    
+    message = b''
+    if SEARCH_SORT_ORDERS.get(filter_by):
+        message += bytes([0x08, SEARCH_SORT_ORDERS[filter_by]])
+    message += bytes([0x12, len(filters)]) + filters
+    
+    params = {'search_query': search_query, 'sp': base64.b64encode(message).decode()}
+    return f"{SEARCH_BASE_URL}?{urlencode(params)}"
+
+
+def time_range_for_age(max_age_days: int) -> str:
+    """Retorna o menor intervalo de upload da busca que cobre `max_age_days` dias."""
+    if max_age_days <= 1:
+        return 'day'
+    if max_age_days <= 7:
+        return 'week'
+    if max_age_days <= 31:
+        return 'month'
+    if max_age_days <= 365:
+        return 'year'
+    return 'any'
+
 
 class YouTubeCollector:
     """Classe responsável pela coleta de vídeos do YouTube."""
@@ -28,6 +98,91 @@ class YouTubeCollector:
             'extract_flat': 'in_playlist',
             'skip_download': True,
         }
+        # Latência e resultados de cada query da última busca automática
+        self.last_query_stats = []
+    
+    @staticmethod
+    def _normalize_entry(entry: dict) -> dict:
+        """Converte uma entrada do yt-dlp para o formato de `VideoInfo`."""
+        return {
+            'video_id': entry.get('id'),
+            'title': entry.get('title'),
+            'channel': entry.get('uploader'),
+            'duration': entry.get('duration'),
+            'upload_date': entry.get('upload_date'),
+            'url': f"https://www.youtube.com/watch?v={entry.get('id')}"
+        }
+    
+    def _iter_entries(self, search_url: str) -> Iterator[dict]:
+        """
+        Percorre as entradas de uma busca, buscando as páginas seguintes sob demanda.
+        
+        Com `process=False` o yt-dlp retorna as entradas como um gerador que só busca a
+        próxima página de resultados quando a anterior é consumida. Cada chamada usa sua
+        própria instância do YoutubeDL, que não é thread-safe.
+        """
+        with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
+            info = ydl.extract_info(search_url, download=False, process=False)
+            if info:
+                yield from info.get('entries') or []
+    
+    def iter_search(
+        self,
+        search_query: str,
+        filter_by: str = "relevance",
+        time_range: str = "any",
+        max_duration: Optional[int] = None,
+        predicate: Optional[Callable[[dict], bool]] = None,
+        limit: Optional[int] = None,
+        max_scanned: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """
+        Gera os vídeos de uma busca, página por página, sob demanda.
+        
+        Nenhuma página é buscada além do necessário: a busca termina quando o chamador
+        para de consumir o gerador, quando `limit` vídeos foram gerados ou quando
+        `max_scanned` resultados foram percorridos.
+        
+        Exemplo (os 5 primeiros vídeos com menos de 15 minutos):
+            collector.iter_search("Flamengo", max_duration=15, limit=5)
+        
+        Args:
+            search_query: Termo de busca
+            filter_by: Filtro por 'relevance' ou 'date'
+            time_range: Intervalo de tempo ('any', 'hour', 'day', 'week', 'month', 'year')
+            max_duration: Duração máxima em minutos (opcional)
+            predicate: Função que recebe o vídeo e indica se ele deve ser gerado (opcional)
+            limit: Número máximo de vídeos gerados (opcional)
+            max_scanned: Número máximo de resultados percorridos
+                (padrão: `MAX_SCANNED_RESULTS` ou 5x o limite, o que for maior)
+        
+        Yields:
+            Vídeos no formato de `VideoInfo`
+        """
+        if max_scanned is None and limit:
+            max_scanned = max(MAX_SCANNED_RESULTS, limit * 5)
+        
+        # Construir a URL de busca do YouTube com os filtros nativos
+        search_url = build_search_url(search_query, filter_by, time_range, max_duration)
+        generated = 0
+        
+        for scanned, entry in enumerate(self._iter_entries(search_url), start=1):
+            video = self._normalize_entry(entry)
+            duration = video['duration']
+            
+            if (
+                video['video_id']
+                and not (max_duration and duration and duration > max_duration * 60)
+                and (predicate is None or predicate(video))
+            ):
+                yield video
+                generated += 1
+                if limit and generated >= limit:
+                    return
+            
+            if max_scanned and scanned >= max_scanned:
+                logger.info(f"Busca '{search_query}' encerrada após {scanned} resultados percorridos")
+                return
     
     def search_manual(
         self,
@@ -36,9 +191,10 @@ class YouTubeCollector:
         filter_by: str = "relevance",
         time_range: str = "any",
         max_duration: Optional[int] = None,
+        max_results: int = 20,
     ) -> List[dict]:
         """
-        Busca vídeos manualmente usando uma query de pesquisa.
+        Busca vídeos manualmente usando uma query de pesquisa (ver `iter_search`).
         
         Args:
             search_query: Termo de busca
@@ -46,38 +202,21 @@ class YouTubeCollector:
             filter_by: Filtro por 'relevance' ou 'date'
             time_range: Intervalo de tempo ('any', 'hour', 'day', 'week', 'month', 'year')
             max_duration: Duração máxima em minutos (opcional)
+            max_results: Número máximo de vídeos retornados
         
         Returns:
             Lista de vídeos encontrados
         """
         logger.info(f"Iniciando busca manual: {search_query}")
         
-        videos = []
-        
         try:
-            # Construir a URL de busca do YouTube
-            search_url = f"https://www.youtube.com/results?search_query={search_query}"
-            
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                info = ydl.extract_info(search_url, download=False)
-                
-                if info and 'entries' in info:
-                    for entry in info['entries'][:20]:  # Limitar a 20 resultados
-                        video_info = {
-                            'video_id': entry.get('id'),
-                            'title': entry.get('title'),
-                            'channel': entry.get('uploader'),
-                            'duration': entry.get('duration'),
-                            'upload_date': entry.get('upload_date'),
-                            'url': f"https://www.youtube.com/watch?v={entry.get('id')}"
-                        }
-                        
-                        # Filtrar por duração se especificado
-                        if max_duration and entry.get('duration'):
-                            if entry.get('duration') > max_duration * 60:
-                                continue
-                        
-                        videos.append(video_info)
+            videos = list(self.iter_search(
+                search_query,
+                filter_by=filter_by,
+                time_range=time_range,
+                max_duration=max_duration,
+                limit=max_results,
+            ))
             
             logger.info(f"Encontrados {len(videos)} vídeos na busca manual")
             return videos
@@ -86,54 +225,102 @@ class YouTubeCollector:
             logger.error(f"Erro na busca manual: {str(e)}")
             raise
     
-    def search_auto(self) -> List[dict]:
+    def _timed_search(self, query: str, max_results: int, max_age_days: int) -> dict:
+        """Executa uma query e mede sua latência, isolando falhas das demais queries."""
+        logger.info(f"Buscando: {query}")
+        
+        def is_recent(video: dict) -> bool:
+            upload_date = video['upload_date']
+            if not upload_date:
+                return True
+            try:
+                date_obj = datetime.strptime(upload_date, '%Y%m%d')
+            except ValueError:
+                return True
+            return datetime.now() - date_obj <= timedelta(days=max_age_days)
+        
+        start = time.perf_counter()
+        try:
+            videos = list(self.iter_search(
+                query,
+                time_range=time_range_for_age(max_age_days),
+                predicate=is_recent,
+                limit=max_results,
+            ))
+            error = None
+        except Exception as e:
+            logger.error(f"Erro na query '{query}': {str(e)}")
+            videos = []
+            error = str(e)
+        
+        latency = time.perf_counter() - start
+        logger.info(f"Query '{query}': {len(videos)} resultados em {latency:.2f}s")
+        return {
+            'query': query,
+            'videos': videos,
+            'results': len(videos),
+            'latency': round(latency, 3),
+            'error': error,
+        }
+    
+    def search_auto(
+        self,
+        queries: Optional[List[str]] = None,
+        max_workers: int = 4,
+        results_per_query: int = 10,
+        max_age_days: int = 7,
+        progress_callback: Optional[Callable] = None,
+    ) -> List[dict]:
         """
-        Busca automaticamente "Jogo Completo" e "Melhores Momentos" dos canais GETV e CazeTV.
+        Busca automaticamente um conjunto de queries (ex: por canal, time ou competição).
+        
+        As queries são executadas em paralelo em um pool de threads limitado, então a
+        busca leva aproximadamente o tempo da query mais lenta. Os resultados são
+        unidos na ordem das queries e sem duplicatas de `video_id`. A latência de cada
+        query fica em `last_query_stats`.
+        
+        Args:
+            queries: Queries de busca (padrão: "Jogo Completo" e "Melhores Momentos")
+            max_workers: Número máximo de queries simultâneas
+            results_per_query: Número máximo de resultados por query
+            max_age_days: Idade máxima dos vídeos em dias
+            progress_callback: Chamado a cada query concluída com (completed, total, query)
         
         Returns:
             Lista de vídeos encontrados
         """
-        logger.info("Iniciando busca automática")
+        queries = queries or DEFAULT_AUTO_QUERIES
+        logger.info(f"Iniciando busca automática com {len(queries)} queries")
         
-        videos = []
-        queries = ["Jogo Completo", "Melhores Momentos"]
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries)))) as executor:
+            futures = [
+                executor.submit(self._timed_search, query, results_per_query, max_age_days)
+                for query in queries
+            ]
+            for completed, future in enumerate(as_completed(futures), start=1):
+                if progress_callback:
+                    progress_callback(completed, len(queries), future.result()['query'])
+            query_results = [future.result() for future in futures]
         
-        try:
-            for query in queries:
-                logger.info(f"Buscando: {query}")
-                search_url = f"https://www.youtube.com/results?search_query={query}"
-                
-                with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                    info = ydl.extract_info(search_url, download=False)
-                    
-                    if info and 'entries' in info:
-                        for entry in info['entries'][:10]:  # Limitar a 10 resultados por query
-                            # Filtrar por data recente (últimos 7 dias)
-                            upload_date = entry.get('upload_date')
-                            if upload_date:
-                                try:
-                                    date_obj = datetime.strptime(upload_date, '%Y%m%d')
-                                    if datetime.now() - date_obj > timedelta(days=7):
-                                        continue
-                                except ValueError:
-                                    pass
-                            
-                            video_info = {
-                                'video_id': entry.get('id'),
-                                'title': entry.get('title'),
-                                'channel': entry.get('uploader'),
-                                'duration': entry.get('duration'),
-                                'upload_date': entry.get('upload_date'),
-                                'url': f"https://www.youtube.com/watch?v={entry.get('id')}"
-                            }
-                            videos.append(video_info)
-            
-            logger.info(f"Encontrados {len(videos)} vídeos na busca automática")
-            return videos
+        self.last_query_stats = [
+            {key: value for key, value in result.items() if key != 'videos'}
+            for result in query_results
+        ]
         
-        except Exception as e:
-            logger.error(f"Erro na busca automática: {str(e)}")
-            raise
+        if all(result['error'] for result in query_results):
+            raise RuntimeError(f"Todas as queries da busca automática falharam: {query_results[0]['error']}")
+        
+        videos = []
+        seen_ids = set()
+        for result in query_results:
+            for video in result['videos']:
+                if video['video_id'] in seen_ids:
+                    continue
+                seen_ids.add(video['video_id'])
+                videos.append({**video, 'query': result['query']})
+        
+        logger.info(f"Encontrados {len(videos)} vídeos na busca automática")
+        return videos
     
     def download_video(self, video_url: str, output_path: str = "downloads") -> dict:
         """
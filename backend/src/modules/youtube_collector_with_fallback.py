@@ -1,6 +1,6 @@
 """
 Módulo de coleta de vídeos do YouTube com suporte a múltiplas chaves de API.
-Responsável apenas pela lógica de busca e download usando yt-dlp.
+As buscas usam a YouTube Data API com a chave selecionada (ou yt-dlp, sem chaves).
 Com fallback automático para outras chaves em caso de falha.
 """
 
@@ -9,10 +9,16 @@ from typing import List, Optional
 import yt_dlp
 from datetime import datetime, timedelta
 from src.modules.api_key_manager import YouTubeKeyManager
+from src.modules.key_scheduler import get_youtube_key_scheduler
+from src.modules.youtube_collector import build_search_url
+from src.modules.youtube_data_api import QUOTA_COSTS, get_youtube_api_client
 from src.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Quota mínima de uma página de busca: search.list + videos.list dos resultados
+SEARCH_PAGE_UNITS = QUOTA_COSTS['/search'] + QUOTA_COSTS['/videos']
+
 
 class YouTubeCollectorWithFallback:
     """Classe responsável pela coleta de vídeos do YouTube com fallback de chaves."""
@@ -35,7 +41,7 @@ class YouTubeCollectorWithFallback:
         # Inicializar gerenciador de chaves YouTube
         settings = get_settings()
         youtube_keys = settings.get_youtube_keys()
-        self.key_manager = YouTubeKeyManager(youtube_keys)
+        self.key_manager = YouTubeKeyManager(youtube_keys, scheduler=get_youtube_key_scheduler())
         
         if youtube_keys:
             logger.info(f"YouTube Collector inicializado com {len(youtube_keys)} chave(s)")
@@ -49,36 +55,57 @@ class YouTubeCollectorWithFallback:
         filter_by: str = "relevance",
         time_range: str = "any",
         max_duration: Optional[int] = None,
+        max_results: int = 20,
     ) -> List[dict]:
         """
         Busca vídeos manualmente usando uma query de pesquisa.
         Com retry automático em caso de falha de chave.
         
+        Com chaves configuradas, a busca usa a YouTube Data API (search.list + videos.list),
+        que retorna a duração e as estatísticas de todos os vídeos.
+        
         Args:
             search_query: Termo de busca
             channel_ids: Lista de IDs de canais para filtrar
             filter_by: Filtro por 'relevance' ou 'date'
             time_range: Intervalo de tempo
             max_duration: Duração máxima em minutos
+            max_results: Número máximo de vídeos retornados
         
         Returns:
             Lista de vídeos encontrados
         """
         logger.info(f"Iniciando busca manual: {search_query}")
         
-        def _search_with_key(api_key: str) -> List[dict]:
+        # Nomes configurados (ex: 'getv') são convertidos para os IDs dos canais
+        api_channel_ids = [self.channel_ids.get(channel, channel) for channel in channel_ids or []]
+        
+        def _search_with_key(api_key: Optional[str]) -> List[dict]:
             """Função interna que executa a busca com uma chave específica."""
             videos = []
             
             try:
-                # Construir a URL de busca do YouTube
-                search_url = f"https://www.youtube.com/results?search_query={search_query}"
+                if api_key:
+                    videos = get_youtube_api_client().search_videos(
+                        api_key,
+                        search_query,
+                        channel_ids=api_channel_ids,
+                        filter_by=filter_by,
+                        time_range=time_range,
+                        max_duration=max_duration,
+                        max_results=max_results,
+                    )
+                    logger.info(f"Encontrados {len(videos)} vídeos na busca manual")
+                    return videos
+                
+                # Construir a URL de busca do YouTube com os filtros nativos
+                search_url = build_search_url(search_query, filter_by, time_range, max_duration)
                 
                 with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
                     info = ydl.extract_info(search_url, download=False)
                     
                     if info and 'entries' in info:
-                        for entry in info['entries'][:20]:  # Limitar a 20 resultados
+                        for entry in info['entries'][:max_results]:
                             video_info = {
                                 'video_id': entry.get('id'),
                                 'title': entry.get('title'),
@@ -102,12 +129,17 @@ class YouTubeCollectorWithFallback:
                 logger.error(f"Erro na busca manual: {str(e)}")
                 raise
         
+        # Sem chaves configuradas: busca direta com yt-dlp
+        if not self.key_manager.api_keys:
+            return _search_with_key(None)
+        
         # Tentar com fallback de chaves
         try:
             return self.key_manager.retry_with_fallback(
                 _search_with_key,
                 max_retries=3,
-                delay=2.0
+                delay=2.0,
+                required_units=SEARCH_PAGE_UNITS * max(1, len(api_channel_ids))  # uma página por canal
             )
         except Exception as e:
             logger.error(f"Falha na busca manual após todas as chaves: {str(e)}")
@@ -123,12 +155,26 @@ class YouTubeCollectorWithFallback:
         """
         logger.info("Iniciando busca automática")
         
-        def _search_with_key(api_key: str) -> List[dict]:
+        def _search_with_key(api_key: Optional[str]) -> List[dict]:
             """Função interna que executa a busca automática com uma chave."""
             videos = []
             queries = ["Jogo Completo", "Melhores Momentos"]
             
             try:
+                if api_key:
+                    seen_ids = set()
+                    for query in queries:
+                        logger.info(f"Buscando: {query}")
+                        for video in get_youtube_api_client().search_videos(
+                            api_key, query, time_range='week', max_results=10
+                        ):
+                            if video['video_id'] not in seen_ids:
+                                seen_ids.add(video['video_id'])
+                                videos.append(video)
+                    
+                    logger.info(f"Encontrados {len(videos)} vídeos na busca automática")
+                    return videos
+                
                 for query in queries:
                     logger.info(f"Buscando: {query}")
                     search_url = f"https://www.youtube.com/results?search_query={query}"
@@ -165,12 +211,17 @@ class YouTubeCollectorWithFallback:
                 logger.error(f"Erro na busca automática: {str(e)}")
                 raise
         
+        # Sem chaves configuradas: busca direta com yt-dlp
+        if not self.key_manager.api_keys:
+            return _search_with_key(None)
+        
         # Tentar com fallback de chaves
         try:
             return self.key_manager.retry_with_fallback(
                 _search_with_key,
                 max_retries=3,
-                delay=2.0
+                delay=2.0,
+                required_units=2 * SEARCH_PAGE_UNITS  # uma página por query
             )
         except Exception as e:
             logger.error(f"Falha na busca automática após todas as chaves: {str(e)}")
@@ -217,10 +268,5 @@ class YouTubeCollectorWithFallback:
             raise
     
     def get_key_status(self) -> dict:
-        """Retorna o status do gerenciador de chaves."""
-        return {
-            'total_keys': len(self.key_manager.api_keys),
-            'current_key_index': self.key_manager.current_key_index,
-            'failed_keys_count': len(self.key_manager.failed_keys),
-            'available_keys': len(self.key_manager.api_keys) - self.key_manager.current_key_index
-        }
+        """Retorna a quota e o estado de cada chave, compartilhados por todos os workers."""
+        return self.key_manager.get_status()
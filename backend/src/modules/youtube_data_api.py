@@ -0,0 +1,264 @@
+"""
+Cliente da YouTube Data API v3.
+
+Usa um único cliente httpx com pool de conexões. A descoberta é feita com
+`search.list` e os vídeos encontrados são completados (duração e estatísticas)
+com `videos.list`, até 50 IDs por chamada.
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import List, Optional
+import httpx
+from src.modules.key_scheduler import KeyScheduler, get_youtube_key_scheduler
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Número máximo de IDs por chamada de videos.list e de resultados por página de search.list
+MAX_IDS_PER_REQUEST = 50
+
+# Custo em unidades de quota de cada endpoint
+QUOTA_COSTS = {'/search': 100, '/videos': 1}
+
+# Intervalos de tempo da busca convertidos em publishedAfter
+TIME_RANGE_DELTAS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+    'month': timedelta(days=30),
+    'year': timedelta(days=365),
+}
+
+ISO8601_DURATION = re.compile(
+    r'P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$'
+)
+
+
+class YouTubeAPIError(Exception):
+    """Erro retornado pela YouTube Data API."""
+    
+    def __init__(self, status_code: int, reason: str, message: str):
+        super().__init__(f"YouTube API {status_code} ({reason}): {message}")
+        self.status_code = status_code
+        self.reason = reason
+
+
+def parse_iso8601_duration(value: Optional[str]) -> Optional[int]:
+    """Converte uma duração ISO 8601 (ex: 'PT1H2M3S') em segundos."""
+    match = ISO8601_DURATION.match(value or '')
+    if not match:
+        return None
+    parts = {name: int(number or 0) for name, number in match.groupdict().items()}
+    return parts['days'] * 86400 + parts['hours'] * 3600 + parts['minutes'] * 60 + parts['seconds']
+
+
+class YouTubeDataAPIClient:
+    """Cliente da YouTube Data API v3 com pool de conexões."""
+    
+    def __init__(
+        self,
+        base_url: str = "https://www.googleapis.com/youtube/v3",
+        timeout: float = 10.0,
+        max_connections: int = 10,
+        quota_tracker: Optional[KeyScheduler] = None,
+    ):
+        """
+        Inicializa o cliente.
+        
+        Args:
+            base_url: URL base da API (configurável para apontar para um servidor local)
+            timeout: Timeout das requisições em segundos
+            max_connections: Número máximo de conexões simultâneas no pool
+            quota_tracker: Escalonador que registra as unidades de quota gastas por chave
+        """
+        self.quota_tracker = quota_tracker
+        self.http = httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+    
+    def close(self) -> None:
+        """Fecha as conexões do pool."""
+        self.http.close()
+    
+    def _get(self, api_key: str, endpoint: str, params: dict) -> dict:
+        """Executa uma requisição GET e converte erros da API em `YouTubeAPIError`."""
+        response = self.http.get(endpoint, params={**params, 'key': api_key})
+        if self.quota_tracker is not None:
+            self.quota_tracker.charge(api_key, QUOTA_COSTS.get(endpoint, 1))
+        if response.is_success:
+            return response.json()
+        
+        try:
+            error = response.json()['error']
+            reason = error['errors'][0]['reason'] if error.get('errors') else error.get('status', '')
+            message = error.get('message', response.text)
+        except (ValueError, KeyError, IndexError):
+            reason, message = '', response.text
+        raise YouTubeAPIError(response.status_code, reason, message)
+    
+    def search(
+        self,
+        api_key: str,
+        query: str,
+        channel_id: Optional[str] = None,
+        order: str = "relevance",
+        published_after: Optional[datetime] = None,
+        max_results: int = MAX_IDS_PER_REQUEST,
+        page_token: Optional[str] = None,
+    ) -> tuple[List[str], Optional[str]]:
+        """
+        Busca vídeos com search.list.
+        
+        Returns:
+            Tupla (IDs dos vídeos, token da próxima página)
+        """
+        params = {
+            'part': 'id',
+            'type': 'video',
+            'q': query,
+            'order': order,
+            'maxResults': min(max_results, MAX_IDS_PER_REQUEST),
+        }
+        if channel_id:
+            params['channelId'] = channel_id
+        if published_after:
+            params['publishedAfter'] = published_after.strftime('%Y-%m-%dT%H:%M:%SZ')
+        if page_token:
+            params['pageToken'] = page_token
+        
+        data = self._get(api_key, '/search', params)
+        video_ids = [item['id']['videoId'] for item in data.get('items', []) if item.get('id', {}).get('videoId')]
+        return video_ids, data.get('nextPageToken')
+    
+    def get_videos(self, api_key: str, video_ids: List[str]) -> List[dict]:
+        """
+        Obtém detalhes, duração e estatísticas dos vídeos com videos.list.
+        
+        Os IDs são enviados em lotes de até 50 por chamada.
+        
+        Returns:
+            Vídeos no formato de `VideoInfo` com estatísticas, na ordem dos IDs
+        """
+        videos = {}
+        for start in range(0, len(video_ids), MAX_IDS_PER_REQUEST):
+            batch = video_ids[start:start + MAX_IDS_PER_REQUEST]
+            data = self._get(api_key, '/videos', {
+                'part': 'snippet,contentDetails,statistics',
+                'id': ','.join(batch),
+                'maxResults': MAX_IDS_PER_REQUEST,
+            })
+            for item in data.get('items', []):
+                snippet = item.get('snippet', {})
+                statistics = item.get('statistics', {})
+                published_at = snippet.get('publishedAt', '')
+                videos[item['id']] = {
+                    'video_id': item['id'],
+                    'title': snippet.get('title'),
+                    'channel': snippet.get('channelTitle'),
+                    'duration': parse_iso8601_duration(item.get('contentDetails', {}).get('duration')),
+                    'upload_date': published_at[:10].replace('-', '') or None,
+                    'url': f"https://www.youtube.com/watch?v={item['id']}",
+                    'published_at': published_at or None,
+                    'view_count': int(statistics['viewCount']) if 'viewCount' in statistics else None,
+                    'like_count': int(statistics['likeCount']) if 'likeCount' in statistics else None,
+                    'comment_count': int(statistics['commentCount']) if 'commentCount' in statistics else None,
+                }
+        return [videos[video_id] for video_id in video_ids if video_id in videos]
+    
+    def search_videos(
+        self,
+        api_key: str,
+        query: str,
+        channel_ids: Optional[List[str]] = None,
+        filter_by: str = "relevance",
+        time_range: str = "any",
+        max_duration: Optional[int] = None,
+        max_results: int = 20,
+        max_pages: int = 5,
+    ) -> List[dict]:
+        """
+        Busca vídeos e completa seus detalhes, página por página, até reunir `max_results`.
+        
+        Com vários canais, cada canal contribui com até `max_results` vídeos. Os
+        resultados são intercalados (por data de publicação com 'date', ou pela
+        posição em cada canal com 'relevance') antes de limitar a `max_results`.
+        
+        Args:
+            api_key: Chave da API
+            query: Termo de busca
+            channel_ids: IDs de canais para restringir a busca (uma busca por canal)
+            filter_by: 'relevance' ou 'date'
+            time_range: 'any', 'hour', 'day', 'week', 'month' ou 'year'
+            max_duration: Duração máxima em minutos (opcional)
+            max_results: Número máximo de vídeos retornados
+            max_pages: Número máximo de páginas de search.list por canal
+        
+        Returns:
+            Vídeos no formato de `VideoInfo` com estatísticas
+        """
+        order = 'date' if filter_by == 'date' else 'relevance'
+        published_after = (
+            datetime.now(timezone.utc) - TIME_RANGE_DELTAS[time_range]
+            if time_range in TIME_RANGE_DELTAS else None
+        )
+        
+        channel_videos = []
+        seen_ids = set()
+        for channel_id in channel_ids or [None]:
+            found = []
+            page_token = None
+            for _ in range(max_pages):
+                video_ids, page_token = self.search(
+                    api_key,
+                    query,
+                    channel_id=channel_id,
+                    order=order,
+                    published_after=published_after,
+                    page_token=page_token,
+                )
+                new_ids = [video_id for video_id in video_ids if video_id not in seen_ids]
+                seen_ids.update(new_ids)
+                
+                for video in self.get_videos(api_key, new_ids):
+                    if max_duration and video['duration'] and video['duration'] > max_duration * 60:
+                        continue
+                    found.append(video)
+                
+                if len(found) >= max_results or not page_token:
+                    break
+            channel_videos.append(found[:max_results])
+        
+        if order == 'date':
+            # Buscas de vários canais são intercaladas pela data de publicação
+            videos = sorted(
+                (video for found in channel_videos for video in found),
+                key=lambda video: video['published_at'] or '',
+                reverse=True,
+            )
+        else:
+            # Por relevância: o 1º de cada canal, depois o 2º de cada canal, ...
+            videos = [
+                found[position]
+                for position in range(max(map(len, channel_videos), default=0))
+                for found in channel_videos
+                if position < len(found)
+            ]
+        
+        logger.info(f"YouTube API: {len(videos[:max_results])} vídeos encontrados para '{query}'")
+        return videos[:max_results]
+
+
+@lru_cache()
+def get_youtube_api_client() -> YouTubeDataAPIClient:
+    """Retorna a instância única (com pool de conexões compartilhado) do cliente da API."""
+    settings = get_settings()
+    return YouTubeDataAPIClient(
+        base_url=settings.youtube_api_base_url,
+        timeout=settings.youtube_api_timeout_seconds,
+        quota_tracker=get_youtube_key_scheduler(),
+    )
@@ -3,26 +3,69 @@ Módulo para download de vídeos do YouTube usando yt-dlp.
 Responsável apenas pela lógica de download.
 """
 
+import glob
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, Callable
+from typing import List, Optional, Callable
 import yt_dlp
+from yt_dlp.utils import download_range_func
 
 logger = logging.getLogger(__name__)
 
+# Formato usado quando o pedido não escolhe um (e atribuído a arquivos sem formato registrado)
+DEFAULT_FORMAT_CHOICE = "best"
+
+
+class _DownloadStatsLogger:
+    """Logger do yt-dlp que repassa as mensagens ao logging e conta as novas tentativas."""
+    
+    def __init__(self):
+        self.fragments_retried = 0
+        self.retries = 0
+    
+    def _count(self, message: str) -> None:
+        # Mensagens do RetryManager: "Retrying fragment 12 (1/10)..." ou "Retrying (1/10)..."
+        if 'Retrying fragment' in message:
+            self.fragments_retried += 1
+        elif 'Retrying (' in message:
+            self.retries += 1
+    
+    def debug(self, message: str) -> None:
+        # O yt-dlp envia as mensagens de tela (incluindo as novas tentativas) para debug
+        self._count(message)
+        logger.debug(message)
+    
+    def info(self, message: str) -> None:
+        self._count(message)
+        logger.info(message)
+    
+    def warning(self, message: str) -> None:
+        self._count(message)
+        logger.warning(message)
+    
+    def error(self, message: str) -> None:
+        logger.error(message)
+
 
 class YouTubeDownloader:
     """Classe responsável pelo download de vídeos do YouTube."""
     
-    def __init__(self, output_path: str = "downloads"):
+    def __init__(self, output_path: str = "downloads", concurrent_fragments: int = 1, info_cache=None):
         """
         Inicializa o downloader.
         
         Args:
             output_path: Caminho para salvar os vídeos
+            concurrent_fragments: Fragmentos baixados ao mesmo tempo em formatos DASH/HLS
+            info_cache: Cache do info_dict compartilhado entre extrações (ver `InfoDictCache`)
         """
         self.output_path = output_path
+        self.concurrent_fragments = concurrent_fragments
+        self.info_cache = info_cache
         
         # Criar diretório se não existir
         Path(self.output_path).mkdir(parents=True, exist_ok=True)
@@ -38,38 +81,63 @@ class YouTubeDownloader:
         """
         Faz o download de um vídeo do YouTube.
         
+        O nome do arquivo depende só do ID do vídeo, então um download
+        interrompido (retry da tarefa, reinício do worker) continua a partir
+        dos arquivos `.part` deixados na pasta de downloads. Um arquivo final
+        já existente (de outro formato ou de um download forçado) é substituído.
+        
         Args:
             video_url: URL do vídeo
             format_choice: Formato desejado ('best', 'best[ext=mp4]', etc)
             progress_callback: Callback para atualizar progresso
         
         Returns:
-            Dicionário com informações do download
+            Dicionário com informações do download e estatísticas em 'download_stats'
         
         Raises:
             Exception: Se houver erro no download
         """
         logger.info(f"Iniciando download: {video_url}")
+        stats_logger = _DownloadStatsLogger()
         
         # Configurar opções do yt-dlp
         ydl_opts = {
             'format': format_choice,
             'outtmpl': os.path.join(self.output_path, '%(id)s.%(ext)s'),
+            'continuedl': True,  # Continuar a partir dos arquivos .part
+            'nopart': False,
+            'overwrites': True,  # Sem isso o yt-dlp devolve o arquivo existente, mesmo de outro formato
+            'concurrent_fragment_downloads': self.concurrent_fragments,
+            'logger': stats_logger,
             'quiet': False,
             'no_warnings': False,
-            'progress_hooks': [self._progress_hook] if progress_callback else [],
+            'progress_hooks': [self._make_progress_hook(progress_callback)] if progress_callback else [],
         }
         
-        # Armazenar callback para uso no hook
-        self._progress_callback = progress_callback
-        
         try:
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 logger.info(f"Extraindo informações do vídeo...")
-                info = ydl.extract_info(video_url, download=True)
+                info = self._extract_info(ydl, video_url)
+                
+                # Bytes já baixados em uma tentativa anterior
+                bytes_resumed = self._partial_bytes(info.get('id'))
+                started_at = time.monotonic()
+                info = ydl.process_ie_result(info, download=True)
+                elapsed = time.monotonic() - started_at
                 
                 filename = ydl.prepare_filename(info)
                 file_size = os.path.getsize(filename) if os.path.exists(filename) else 0
+                bytes_downloaded = max(0, file_size - bytes_resumed)
+                download_stats = {
+                    'fragments_retried': stats_logger.fragments_retried,
+                    'retries': stats_logger.retries,
+                    'bytes_resumed': bytes_resumed,
+                    'bytes_downloaded': bytes_downloaded,
+                    'elapsed_seconds': round(elapsed, 2),
+                    'throughput_bytes_per_second': int(bytes_downloaded / elapsed) if elapsed > 0 else 0,
+                    'concurrent_fragments': self.concurrent_fragments,
+                }
+                logger.info(f"Estatísticas do download {info.get('id')}: {download_stats}")
                 
                 download_info = {
                     'status': 'success',
@@ -77,10 +145,12 @@ class YouTubeDownloader:
                     'title': info.get('title'),
                     'filename': filename,
                     'file_size': file_size,
+                    'format_choice': format_choice,
                     'duration': info.get('duration'),
                     'url': video_url,
                     'uploader': info.get('uploader'),
                     'upload_date': info.get('upload_date'),
+                    'download_stats': download_stats,
                 }
                 
                 logger.info(f"Download concluído: {info.get('title')}")
@@ -90,53 +160,198 @@ class YouTubeDownloader:
             logger.error(f"Erro no download: {str(e)}")
             raise
     
-    def _progress_hook(self, d: dict) -> None:
+    def download_sections(
+        self,
+        video_url: str,
+        sections: List[tuple[float, float]],
+        format_choice: str = "best",
+        output_path: Optional[str] = None,
+        keyframe_padding: float = 2.0,
+        progress_callback: Optional[Callable] = None,
+    ) -> dict:
         """
-        Hook para atualizar progresso do download.
+        Baixa apenas trechos de um vídeo (ex: o lance de um gol), sem baixar o vídeo inteiro.
+        
+        Usa o download por seções do yt-dlp, que busca só os fragmentos que cobrem
+        cada trecho. Os trechos são estendidos por `keyframe_padding` segundos de cada
+        lado: sem recodificação, o corte começa no keyframe anterior, e a margem
+        garante que o trecho pedido fique inteiro dentro do arquivo.
         
         Args:
-            d: Dicionário com informações do progresso
+            video_url: URL do vídeo
+            sections: Lista de trechos (início, fim) em segundos
+            format_choice: Formato desejado
+            output_path: Diretório dos trechos (padrão: diretório de downloads)
+            keyframe_padding: Margem em segundos antes e depois de cada trecho
+            progress_callback: Callback para atualizar progresso
+        
+        Returns:
+            Dicionário com as informações do vídeo e um item em 'clips' por trecho
         """
-        if d['status'] == 'downloading':
-            percent = d.get('_percent_str', 'N/A')
-            speed = d.get('_speed_str', 'N/A')
-            eta = d.get('_eta_str', 'N/A')
-            
-            progress_info = {
-                'status': 'downloading',
-                'percent': percent,
-                'speed': speed,
-                'eta': eta,
-                'total_bytes': d.get('total_bytes', 0),
-                'downloaded_bytes': d.get('downloaded_bytes', 0),
-            }
+        output_path = output_path or self.output_path
+        Path(output_path).mkdir(parents=True, exist_ok=True)
+        padded_sections = [
+            (max(0.0, start - keyframe_padding), end + keyframe_padding)
+            for start, end in sections
+        ]
+        logger.info(f"Iniciando download de {len(sections)} trechos: {video_url}")
+        
+        ydl_opts = {
+            'format': format_choice,
+            'outtmpl': os.path.join(output_path, '%(id)s.%(section_start)d-%(section_end)d.%(ext)s'),
+            'download_ranges': download_range_func(None, padded_sections),
+            'quiet': False,
+            'no_warnings': False,
+            'progress_hooks': [self._make_progress_hook(progress_callback)] if progress_callback else [],
+        }
+        
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.process_ie_result(self._extract_info(ydl, video_url), download=True)
+                
+                # Um download por trecho, na ordem de `sections`
+                downloads = sorted(
+                    info.get('requested_downloads') or [],
+                    key=lambda download: download.get('section_start') or 0,
+                )
+                clips = []
+                for (start, end), (padded_start, padded_end), download in zip(
+                    sorted(sections), sorted(padded_sections), downloads
+                ):
+                    filename = download.get('filepath') or download.get('_filename')
+                    clips.append({
+                        'filename': filename,
+                        'file_size': os.path.getsize(filename) if filename and os.path.exists(filename) else 0,
+                        'start_time': start,
+                        'end_time': end,
+                        # Posição do trecho pedido dentro do arquivo baixado
+                        'offset_in_file': start - padded_start,
+                        'downloaded_start': padded_start,
+                        'downloaded_end': padded_end,
+                    })
+                
+                logger.info(f"Download de {len(clips)} trechos concluído: {info.get('title')}")
+                return {
+                    'status': 'success',
+                    'video_id': info.get('id'),
+                    'title': info.get('title'),
+                    'duration': info.get('duration'),
+                    'url': video_url,
+                    'uploader': info.get('uploader'),
+                    'upload_date': info.get('upload_date'),
+                    'clips': clips,
+                    'total_bytes': sum(clip['file_size'] for clip in clips),
+                }
+        
+        except Exception as e:
+            logger.error(f"Erro no download dos trechos: {str(e)}")
+            raise
+    
+    def find_downloaded_file(self, video_id: str) -> Optional[str]:
+        """
+        Procura um vídeo já baixado na biblioteca (salvo como `<video_id>.<ext>`).
+        
+        Args:
+            video_id: ID do vídeo no YouTube
+        
+        Returns:
+            Caminho do arquivo ou None se o vídeo não foi baixado
+        """
+        for path in Path(self.output_path).glob(f"{glob.escape(video_id)}.*"):
+            # O arquivo final é exatamente `<video_id>.<ext>`. Ficam de fora os intermediários
+            # do yt-dlp: `.part`/`.ytdl`/`.part-FragN` (incompletos), `<id>.f137.mp4`
+            # (stream separado de um merge que falhou) e `<id>.temp.mp4` (merge em andamento)
+            if path.stem != video_id or path.suffix in ('.part', '.ytdl'):
+                continue
+            return str(path)
+        return None
+    
+    def _extract_info(self, ydl: yt_dlp.YoutubeDL, video_url: str) -> dict:
+        """
+        Extrai as informações do vídeo, reaproveitando o cache quando configurado.
+        
+        Retorna um info_dict serializável, que pode ser baixado com
+        `ydl.process_ie_result(info, download=True)` (como o `--load-info-json` do yt-dlp).
+        Os campos da seleção de formatos da extração (`requested_formats`,
+        `requested_downloads`, ...) são removidos, para que cada chamada selecione
+        os formatos do seu próprio `format_choice`.
+        """
+        info = self.info_cache.get(video_url) if self.info_cache else None
+        if info is None:
+            info = ydl.sanitize_info(ydl.extract_info(video_url, download=False), remove_private_keys=True)
+            if self.info_cache:
+                self.info_cache.set(info)
+        return info
+    
+    def _partial_bytes(self, video_id: Optional[str]) -> int:
+        """Soma o tamanho dos downloads incompletos (`.part`) do vídeo na pasta de downloads."""
+        if not video_id:
+            return 0
+        return sum(
+            path.stat().st_size
+            for path in Path(self.output_path).glob(f"{glob.escape(video_id)}.*")
+            if path.suffix == '.part' or '.part-Frag' in path.name
+        )
+    
+    def _make_progress_hook(self, progress_callback: Callable) -> Callable:
+        """
+        Cria o hook de progresso do yt-dlp de um download.
+        
+        Cada download tem seu próprio hook, então downloads simultâneos não
+        compartilham o callback.
+        
+        Args:
+            progress_callback: Callback que recebe o progresso do download
+        
+        Returns:
+            Hook para `progress_hooks` do yt-dlp
+        """
+        def progress_hook(d: dict) -> None:
+            if d['status'] == 'downloading':
+                percent = d.get('_percent_str', 'N/A')
+                speed = d.get('_speed_str', 'N/A')
+                eta = d.get('_eta_str', 'N/A')
+                
+                progress_callback({
+                    'status': 'downloading',
+                    'percent': percent,
+                    'speed': speed,
+                    'eta': eta,
+                    'total_bytes': d.get('total_bytes') or d.get('total_bytes_estimate') or 0,
+                    'downloaded_bytes': d.get('downloaded_bytes', 0),
+                    'speed_bytes_per_second': d.get('speed'),
+                    'eta_seconds': d.get('eta'),
+                })
             
-            if self._progress_callback:
-                self._progress_callback(progress_info)
+            elif d['status'] == 'finished':
+                logger.info("Download finalizado, processando arquivo...")
+                progress_callback({'status': 'finished'})
         
-        elif d['status'] == 'finished':
-            logger.info("Download finalizado, processando arquivo...")
-            if self._progress_callback:
-                self._progress_callback({'status': 'finished'})
+        return progress_hook
     
     def download_multiple_videos(
         self,
         video_urls: list,
         format_choice: str = "best",
         progress_callback: Optional[Callable] = None,
+        max_workers: int = 1,
     ) -> dict:
         """
-        Faz o download de múltiplos vídeos.
+        Faz o download de múltiplos vídeos, até `max_workers` ao mesmo tempo.
+        
+        A falha de um vídeo não interrompe os demais. O progresso informa os bytes
+        baixados somados entre todos os downloads em andamento.
         
         Args:
             video_urls: Lista de URLs
             format_choice: Formato desejado
-            progress_callback: Callback para progresso
+            progress_callback: Callback para progresso (chamado das threads de download)
+            max_workers: Número máximo de downloads simultâneos
         
         Returns:
-            Dicionário com resultados
+            Dicionário com resultados, bytes totais e vazão média
         """
-        logger.info(f"Iniciando download de {len(video_urls)} vídeos")
+        logger.info(f"Iniciando download de {len(video_urls)} vídeos com até {max_workers} simultâneos")
         
         results = {
             'total': len(video_urls),
@@ -146,31 +361,74 @@ class YouTubeDownloader:
             'errors': [],
         }
         
-        for idx, url in enumerate(video_urls):
-            try:
-                if progress_callback:
-                    progress_callback({
-                        'status': 'downloading_multiple',
-                        'current': idx + 1,
-                        'total': len(video_urls),
+        started_at = time.monotonic()
+        lock = threading.Lock()
+        bytes_by_url = {}
+        finished = 0
+        
+        def report(url: str, video_finished: bool = False) -> None:
+            """Publica o progresso agregado de todos os downloads."""
+            if not progress_callback:
+                return
+            with lock:
+                downloaded_bytes = sum(bytes_by_url.values())
+                completed = finished
+            elapsed = time.monotonic() - started_at
+            progress_callback({
+                'status': 'downloading_multiple',
+                'current': completed,
+                'total': len(video_urls),
+                'url': url,
+                'downloaded_bytes': downloaded_bytes,
+                'throughput_bytes_per_second': int(downloaded_bytes / elapsed) if elapsed > 0 else 0,
+                'video_finished': video_finished,
+            })
+        
+        def download(url: str) -> dict:
+            def on_progress(info: dict) -> None:
+                if info.get('status') == 'downloading':
+                    with lock:
+                        bytes_by_url[url] = info.get('downloaded_bytes') or 0
+                    report(url)
+            
+            return self.download_video(url, format_choice, progress_callback=on_progress)
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(download, url): url for url in video_urls}
+            
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    video_info = future.result()
+                    results['videos'].append(video_info)
+                    results['successful'] += 1
+                    with lock:
+                        bytes_by_url[url] = video_info.get('file_size') or bytes_by_url.get(url, 0)
+                
+                except Exception as e:
+                    logger.error(f"Erro ao baixar {url}: {str(e)}")
+                    results['errors'].append({
                         'url': url,
+                        'error': str(e),
                     })
+                    results['failed'] += 1
                 
-                video_info = self.download_video(url, format_choice)
-                results['videos'].append(video_info)
-                results['successful'] += 1
-            
-            except Exception as e:
-                logger.error(f"Erro ao baixar {url}: {str(e)}")
-                results['errors'].append({
-                    'url': url,
-                    'error': str(e),
-                })
-                results['failed'] += 1
+                with lock:
+                    finished += 1
+                report(url, video_finished=True)
+        
+        elapsed = time.monotonic() - started_at
+        results['total_bytes'] = sum(video.get('file_size') or 0 for video in results['videos'])
+        results['elapsed_seconds'] = round(elapsed, 2)
+        results['throughput_bytes_per_second'] = int(results['total_bytes'] / elapsed) if elapsed > 0 else 0
+        stats = [video.get('download_stats') or {} for video in results['videos']]
+        results['bytes_resumed'] = sum(item.get('bytes_resumed', 0) for item in stats)
+        results['fragments_retried'] = sum(item.get('fragments_retried', 0) for item in stats)
         
         logger.info(
             f"Download múltiplo concluído: "
-            f"{results['successful']} sucesso, {results['failed']} falhas"
+            f"{results['successful']} sucesso, {results['failed']} falhas, "
+            f"{results['total_bytes'] / 1024 / 1024:.1f} MB em {elapsed:.1f}s"
         )
         
         return results
@@ -195,7 +453,7 @@ class YouTubeDownloader:
         
         try:
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(video_url, download=False)
+                info = self._extract_info(ydl, video_url)
                 
                 video_info = {
                     'video_id': info.get('id'),
@@ -237,7 +495,7 @@ class YouTubeDownloader:
         
         try:
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(video_url, download=False)
+                info = self._extract_info(ydl, video_url)
                 
                 formats = []
                 for fmt in info.get('formats', []):
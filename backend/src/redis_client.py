@@ -0,0 +1,19 @@
+"""
+Cliente Redis compartilhado pela aplicação (API e workers Celery).
+"""
+
+import redis
+from functools import lru_cache
+from src.settings import get_settings
+
+
+@lru_cache()
+def get_redis_client() -> redis.Redis:
+    """Retorna a instância única do cliente Redis."""
+    settings = get_settings()
+    return redis.Redis(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        db=settings.redis_db,
+        decode_responses=True,
+    )
@@ -20,21 +20,100 @@ class Settings(BaseSettings):
     celery_broker_url: str = "redis://localhost:6379/0"
     celery_result_backend: str = "redis://localhost:6379/1"
     
+    # Publicação do progresso das tarefas: intervalo mínimo, avanço mínimo e intervalo máximo sem publicar
+    progress_min_interval_seconds: float = 1.0
+    progress_min_percent_delta: float = 1.0
+    progress_max_interval_seconds: float = 5.0
+    
     # Redis
     redis_host: str = "localhost"
     redis_port: int = 6379
     redis_db: int = 0
     
+    # Diretório dos vídeos baixados (biblioteca)
+    download_dir: str = "downloads"
+    download_max_workers: int = 3  # Downloads simultâneos em um download múltiplo
+    download_concurrent_fragments: int = 4  # Fragmentos baixados ao mesmo tempo em formatos DASH/HLS
+    
+    # Banco de metadados da biblioteca (SQLAlchemy assíncrono; SQLite local por padrão)
+    database_url: str = "sqlite+aiosqlite:///./canal_automatizado.db"
+    
+    # Cache de resultados da detecção de cenas
+    scene_cache_max_entries: int = 500
+    scene_cache_max_bytes: int = 64 * 1024 * 1024  # 64 MB
+    
+    # Diretório das métricas por frame da detecção de cenas
+    scene_metrics_dir: str = "scene_metrics"
+    
+    # Tempo de retenção dos uploads de vídeo para detecção de cenas
+    scene_upload_retention_hours: int = 24
+    
+    # Checkpoints da detecção de cenas (retomada após falha ou retry)
+    scene_checkpoint_interval_seconds: int = 30
+    scene_checkpoint_ttl_hours: int = 48
+    # Reserva da detecção por uma task; renovada a cada checkpoint e liberada se o worker cair
+    scene_checkpoint_lock_seconds: int = 300
+    
+    # Máximo de shards de uma detecção (cada shard ocupa um processo ou thread do worker)
+    max_scene_shards: int = 8
+    
+    # Exportação de clipes das cenas
+    clips_dir: str = "clips"
+    # Margem em segundos em volta de cada trecho baixado por seção (corte sem recodificação cai no keyframe anterior)
+    section_keyframe_padding_seconds: float = 2.0
+    clip_export_max_workers: int = 4
+    
     # YouTube Channels
     getv_channel_id: str = "UCXXXXXXXXXXXXXXXXXXXXXXXx"
     cazetv_channel_id: str = "UCYYYYYYYYYYYYYYYYYYYYYYYy"
     
+    # Busca automática: queries (ex: por canal, time ou competição) executadas em paralelo
+    auto_search_queries: List[str] = ["Jogo Completo", "Melhores Momentos"]
+    auto_search_max_workers: int = 4
+    auto_search_results_per_query: int = 10
+    auto_search_max_age_days: int = 7
+    
+    # Coleta incremental pelos feeds de upload dos canais
+    youtube_feed_base_url: str = "https://www.youtube.com/feeds/videos.xml"
+    feed_poll_timeout_seconds: float = 10.0
+    
+    # Cache de resultados de coleta (stale-while-revalidate)
+    collect_cache_ttl_seconds: int = 600
+    collect_cache_stale_seconds: int = 3600
+    collect_cache_refresh_lock_seconds: int = 300
+    
+    # Cache do info_dict do yt-dlp compartilhado por /video-info, /formats e downloads
+    info_dict_cache_max_ttl_seconds: int = 3600
+    info_dict_cache_expiry_margin_seconds: int = 600  # Vence antes da expiração das URLs dos streams
+    
+    # Índice de vídeos já coletados e baixados: 'set' (exato) ou 'bloom' (memória fixa)
+    video_index_backend: str = "set"
+    video_index_bloom_bits: int = 8 * 1024 * 1024  # 1 MB; ~1% de falsos positivos com 800 mil vídeos
+    video_index_bloom_hashes: int = 7
+    
+    # Backend da busca manual: 'scrape' (yt-dlp) ou 'data_api' (YouTube Data API v3)
+    youtube_search_backend: str = "scrape"
+    youtube_api_base_url: str = "https://www.googleapis.com/youtube/v3"
+    youtube_api_timeout_seconds: float = 10.0
+    
     # YouTube Data API Keys (múltiplas para fallback)
     youtube_api_key: str = ""
     youtube_api_key_2: str = ""
     youtube_api_key_3: str = ""
     youtube_api_key_4: str = ""
     
+    # Escalonamento das chaves de API (estado compartilhado no Redis)
+    youtube_daily_quota_units: int = 10000
+    api_key_rate_per_second: float = 5.0
+    api_key_burst: int = 10
+    api_key_cooldown_seconds: int = 300
+    api_quota_timezone: str = "America/Los_Angeles"
+    
+    # Retry das chamadas com chaves de API: backoff exponencial com jitter e circuit breaker por chave
+    api_retry_max_delay_seconds: float = 30.0
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_reset_seconds: float = 60.0
+    
     # OpenAI API Keys (múltiplas para fallback)
     openai_api_key: str = ""
     openai_api_key_2: str = ""
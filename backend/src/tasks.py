@@ -7,6 +7,13 @@ import logging
 from celery import shared_task, Task
 from src.celery_app import celery_app
 from src.modules.youtube_collector import YouTubeCollector
+from src.modules.youtube_collector_with_fallback import YouTubeCollectorWithFallback
+from src.modules.channel_feed_poller import ChannelFeedPoller
+from src.modules.collect_cache import get_collect_cache
+from src.modules.video_index import get_video_index
+from src.modules.progress_reporter import get_progress_reporter
+from src.database.repository import save_collected_videos
+from src.redis_client import get_redis_client
 from src.settings import get_settings
 
 logger = logging.getLogger(__name__)
@@ -32,9 +39,40 @@ class CallbackTask(Task):
         super().on_success(result, task_id, args, kwargs)
 
 
+class CollectTask(CallbackTask):
+    """Task de coleta: libera a atualização do cache quando a coleta falha de vez."""
+    
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        """Callback ao falhar (depois de esgotar os retries)."""
+        # Sem isso, novas requisições ficariam presas a esta task até o lock expirar
+        if kwargs.get('cache_key'):
+            get_collect_cache().release_refresh(kwargs['cache_key'], task_id)
+        super().on_failure(exc, task_id, args, kwargs, einfo)
+
+
+def annotate_collect_result(result: dict, exclude_seen: bool = False) -> dict:
+    """
+    Marca (ou remove) os vídeos de uma coleta já coletados ou baixados em execuções anteriores.
+    
+    Args:
+        result: Resultado bruto da coleta (o que fica no cache)
+        exclude_seen: Remove os vídeos já vistos em vez de apenas marcá-los
+    
+    Returns:
+        Cópia do resultado com o campo 'seen' nos vídeos e a contagem de novos
+    """
+    videos = get_video_index().annotate_collected(result['videos'], exclude_seen=exclude_seen)
+    return {
+        **result,
+        'total_videos': len(videos),
+        'new_videos': sum(1 for video in videos if not video.get('seen')),
+        'videos': videos,
+    }
+
+
 @celery_app.task(
     bind=True,
-    base=CallbackTask,
+    base=CollectTask,
     max_retries=3,
     default_retry_delay=60,
 )
@@ -46,17 +84,24 @@ def collect_youtube_videos(
     filter_by: str = "relevance",
     time_range: str = "any",
     max_duration: int = None,
+    max_results: int = None,
+    exclude_seen: bool = False,
+    cache_key: str = None,
 ):
     """
     Tarefa Celery para coletar vídeos do YouTube.
     
     Args:
-        mode: 'manual' ou 'auto'
+        mode: 'manual', 'auto' ou 'incremental'
         search_query: Query de busca (apenas para modo manual)
-        channel_ids: Lista de IDs de canais (apenas para modo manual)
+        channel_ids: Lista de IDs (ou nomes configurados, ex: 'getv') de canais
+            (modo manual e incremental)
         filter_by: Filtro por 'relevance' ou 'date'
         time_range: Intervalo de tempo
         max_duration: Duração máxima em minutos
+        max_results: Número máximo de vídeos (manual: total; automático: por query)
+        exclude_seen: Remove os vídeos já vistos em execuções anteriores (senão apenas os marca)
+        cache_key: Chave do cache de coleta (ver `make_collect_cache_key`), se houver
     
     Returns:
         Lista de vídeos coletados
@@ -64,10 +109,8 @@ def collect_youtube_videos(
     
     try:
         # Atualizar estado da tarefa
-        self.update_state(
-            state='PROGRESS',
-            meta={'current': 0, 'total': 100, 'status': 'Inicializando coleta...'}
-        )
+        reporter = get_progress_reporter(self)
+        reporter.update(0, 'Inicializando coleta...', force=True)
         
         # Inicializar o coletor
         channel_ids_dict = {
@@ -77,39 +120,73 @@ def collect_youtube_videos(
         collector = YouTubeCollector(channel_ids_dict)
         
         # Executar coleta conforme o modo
-        if mode == "auto":
+        if mode == "incremental":
+            # Apenas uploads novos desde a última consulta, pelos feeds dos canais
+            if channel_ids:
+                feed_channels = {
+                    channel: channel_ids_dict.get(channel, channel) for channel in channel_ids
+                }
+            else:
+                feed_channels = channel_ids_dict
+            logger.info(f"Executando coleta incremental de {len(feed_channels)} canais")
+            reporter.update(50, 'Consultando feeds dos canais...', force=True)
+            poller = ChannelFeedPoller(
+                get_redis_client(),
+                feed_base_url=settings.youtube_feed_base_url,
+                timeout=settings.feed_poll_timeout_seconds,
+            )
+            videos = poller.poll_channels(feed_channels)
+        elif mode == "auto":
             logger.info("Executando coleta automática")
-            self.update_state(
-                state='PROGRESS',
-                meta={'current': 50, 'total': 100, 'status': 'Buscando vídeos automaticamente...'}
+            reporter.update(10, 'Buscando vídeos automaticamente...', force=True)
+            videos = collector.search_auto(
+                queries=settings.auto_search_queries,
+                max_workers=settings.auto_search_max_workers,
+                results_per_query=max_results or settings.auto_search_results_per_query,
+                max_age_days=settings.auto_search_max_age_days,
+                # Chamado a cada query concluída; o reporter agrupa as publicações
+                progress_callback=lambda completed, total, query: reporter.update(
+                    10 + 85 * completed / total,
+                    f'Query {completed}/{total} concluída: {query}',
+                ),
             )
-            videos = collector.search_auto()
         else:
             logger.info(f"Executando coleta manual: {search_query}")
-            self.update_state(
-                state='PROGRESS',
-                meta={'current': 50, 'total': 100, 'status': f'Buscando: {search_query}...'}
-            )
+            reporter.update(50, f'Buscando: {search_query}...', force=True)
+            # Com o backend da Data API, a busca usa as chaves configuradas (com fallback)
+            if settings.youtube_search_backend == "data_api" and settings.get_youtube_keys():
+                collector = YouTubeCollectorWithFallback(channel_ids_dict)
             videos = collector.search_manual(
                 search_query=search_query,
                 channel_ids=channel_ids,
                 filter_by=filter_by,
                 time_range=time_range,
                 max_duration=max_duration,
+                max_results=max_results or 20,
             )
         
+        # Registrar os vídeos no banco de metadados da biblioteca
+        try:
+            save_collected_videos(videos, source=mode)
+        except Exception as e:
+            logger.warning(f"Erro ao registrar os vídeos coletados no banco: {str(e)}")
+        
         # Atualizar estado final
-        self.update_state(
-            state='PROGRESS',
-            meta={'current': 100, 'total': 100, 'status': f'Coleta concluída! {len(videos)} vídeos encontrados.'}
-        )
+        reporter.flush(f'Coleta concluída! {len(videos)} vídeos encontrados.')
         
         logger.info(f"Coleta concluída com sucesso: {len(videos)} vídeos")
-        return {
+        result = {
             'status': 'success',
             'total_videos': len(videos),
             'videos': videos,
+            'query_stats': collector.last_query_stats if mode == "auto" else [],
         }
+        
+        # Armazenar no cache a coleta bruta: as marcas de vistos são de cada requisição
+        if cache_key:
+            get_collect_cache().set(cache_key, result)
+        
+        return annotate_collect_result(result, exclude_seen=exclude_seen)
     
     except Exception as exc:
         logger.error(f"Erro na coleta: {str(exc)}")
@@ -3,11 +3,134 @@ Tarefas Celery para download de vídeos.
 """
 
 import logging
+import os
+from typing import Optional
+import redis
 from celery import shared_task, Task
 from src.celery_app import celery_app
-from src.modules.youtube_downloader import YouTubeDownloader
+from src.database.repository import save_clips, save_downloads
+from src.modules.clip_exporter import ClipExporter
+from src.modules.info_dict_cache import get_info_dict_cache
+from src.modules.progress_reporter import get_progress_reporter
+from src.modules.video_index import VideoIndex, extract_video_id, get_video_index
+from src.modules.youtube_downloader import DEFAULT_FORMAT_CHOICE, YouTubeDownloader
+from src.settings import get_settings
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def _find_existing_download(
+    downloader: YouTubeDownloader,
+    index: VideoIndex,
+    video_url: str,
+    format_choice: str = DEFAULT_FORMAT_CHOICE,
+) -> Optional[dict]:
+    """
+    Procura um download anterior do vídeo: primeiro no índice, depois na pasta de downloads.
+    
+    O download só é reaproveitado se foi feito no mesmo `format_choice`. Registros
+    antigos sem o formato e arquivos encontrados apenas na pasta de downloads são
+    considerados do formato padrão.
+    
+    Returns:
+        Metadados do download (com 'already_downloaded') ou None se o vídeo precisa ser baixado
+    """
+    video_id = extract_video_id(video_url)
+    if not video_id:
+        return None
+    
+    try:
+        entry = index.get_download(video_id)
+        if entry and os.path.exists(entry.get('filename') or ''):
+            if entry.get('format_choice', DEFAULT_FORMAT_CHOICE) != format_choice:
+                # Outro formato (ex: 360p ou só áudio): baixar de novo, o registro é substituído
+                return None
+            return {**entry, 'already_downloaded': True}
+        
+        # O formato de um arquivo sem registro é desconhecido
+        filename = downloader.find_downloaded_file(video_id) if format_choice == DEFAULT_FORMAT_CHOICE else None
+        if filename is None:
+            if entry:
+                index.forget_download(video_id)
+            return None
+        
+        # Arquivo baixado antes do índice existir (ou movido): registrar com os metadados conhecidos
+        entry = {
+            **(entry or {}),
+            'status': 'success',
+            'video_id': video_id,
+            'filename': filename,
+            'file_size': os.path.getsize(filename),
+            'format_choice': DEFAULT_FORMAT_CHOICE,
+            'url': (entry or {}).get('url', video_url),
+        }
+        index.record_download(entry)
+        return {**entry, 'already_downloaded': True}
+    
+    except redis.RedisError as e:
+        logger.warning(f"Erro ao consultar o índice de vídeos: {e}")
+        return None
+
+
+def _save_clips(source: dict, clips: list) -> None:
+    """Registra os trechos no banco sem falhar a tarefa."""
+    try:
+        save_clips(source, clips)
+    except Exception as e:
+        logger.warning(f"Erro ao registrar os trechos no banco: {str(e)}")
+
+
+def _cut_local_sections(reporter, existing: dict, sections: list) -> dict:
+    """
+    Corta os trechos do arquivo já baixado, sem acessar a rede.
+    
+    Returns:
+        Resultado no mesmo formato de `YouTubeDownloader.download_sections`
+    """
+    logger.info(f"Vídeo já baixado, cortando {len(sections)} trechos localmente: {existing['filename']}")
+    
+    def progress_callback(clip_info, completed, total):
+        reporter.update(
+            completed * 100 / total,
+            f"Cortando trecho {completed}/{total}",
+        )
+    
+    # Nome pelo trecho, como no download por seções: pedidos diferentes não sobrescrevem os clipes uns dos outros
+    exporter = ClipExporter(
+        output_dir=settings.clips_dir,
+        max_workers=settings.clip_export_max_workers,
+        name_template="{stem}.{start:g}-{end:g}{ext}",
+    )
+    exported = exporter.export_clips(
+        existing['filename'],
+        [tuple(section) for section in sections],
+        progress_callback=progress_callback,
+    )
+    if exported['failed']:
+        raise RuntimeError(f"Erro ao cortar {exported['failed']} trechos: {exported['errors']}")
+    
+    clips = [
+        {
+            'filename': clip['path'],
+            'file_size': os.path.getsize(clip['path']),
+            'start_time': clip['start_time'],
+            'end_time': clip['end_time'],
+            'offset_in_file': 0.0,
+        }
+        for clip in exported['clips']
+    ]
+    result = {
+        **existing,
+        'clips': clips,
+        'total_bytes': sum(clip['file_size'] for clip in clips),
+    }
+    _save_clips(result, clips)
+    reporter.flush('Trechos cortados do arquivo já baixado!')
+    return {
+        'status': 'success',
+        'video_info': result,
+    }
 
 
 class DownloadTask(Task):
@@ -39,13 +162,21 @@ def download_youtube_video(
     self,
     video_url: str,
     format_choice: str = "best",
+    force: bool = False,
+    sections: Optional[list] = None,
 ):
     """
     Tarefa Celery para fazer download de um vídeo do YouTube.
     
+    Se o vídeo já foi baixado, retorna o arquivo existente sem baixar de novo.
+    Com `sections`, baixa apenas os trechos pedidos (ou os corta do arquivo
+    já baixado) e os registra como clipes do vídeo de origem.
+    
     Args:
         video_url: URL do vídeo
         format_choice: Formato desejado ('best', 'best[ext=mp4]', etc)
+        force: Baixa novamente mesmo se o vídeo já estiver na pasta de downloads
+        sections: Lista de trechos (início, fim) em segundos
     
     Returns:
         Informações do download
@@ -53,38 +184,54 @@ def download_youtube_video(
     
     try:
         # Atualizar estado da tarefa
-        self.update_state(
-            state='PROGRESS',
-            meta={'current': 0, 'total': 100, 'status': 'Iniciando download...'}
-        )
+        reporter = get_progress_reporter(self)
+        reporter.update(0, 'Iniciando download...', force=True)
         
         # Inicializar downloader
-        downloader = YouTubeDownloader(output_path="downloads")
+        downloader = YouTubeDownloader(
+            output_path=settings.download_dir,
+            concurrent_fragments=settings.download_concurrent_fragments,
+            info_cache=get_info_dict_cache(),
+        )
+        index = get_video_index()
         
-        # Callback para atualizar progresso
+        existing = None if force else _find_existing_download(downloader, index, video_url, format_choice)
+        if existing and sections:
+            return _cut_local_sections(reporter, existing, sections)
+        if existing:
+            logger.info(f"Vídeo já baixado: {existing['filename']}")
+            return {
+                'status': 'success',
+                'video_info': existing,
+            }
+        
+        # Callback para atualizar progresso (publicações agrupadas pelo reporter)
         def progress_callback(info):
             if info.get('status') == 'downloading':
-                percent_str = info.get('percent', '0%').strip('%')
-                try:
-                    percent = float(percent_str)
-                except ValueError:
-                    percent = 0
-                
-                self.update_state(
-                    state='PROGRESS',
-                    meta={
-                        'current': int(percent),
-                        'total': 100,
-                        'status': f"Baixando: {info.get('speed', 'N/A')} - ETA: {info.get('eta', 'N/A')}",
-                        'downloaded_bytes': info.get('downloaded_bytes', 0),
-                        'total_bytes': info.get('total_bytes', 0),
-                    }
+                reporter.update(
+                    status=f"Baixando: {info.get('speed', 'N/A')} - ETA: {info.get('eta', 'N/A')}",
+                    downloaded_bytes=info.get('downloaded_bytes', 0),
+                    total_bytes=info.get('total_bytes', 0),
+                    speed_bytes_per_second=info.get('speed_bytes_per_second'),
                 )
             elif info.get('status') == 'finished':
-                self.update_state(
-                    state='PROGRESS',
-                    meta={'current': 100, 'total': 100, 'status': 'Processando arquivo...'}
-                )
+                reporter.update(100, 'Processando arquivo...', force=True)
+        
+        if sections:
+            result = downloader.download_sections(
+                video_url=video_url,
+                sections=[tuple(section) for section in sections],
+                format_choice=format_choice,
+                output_path=settings.clips_dir,
+                keyframe_padding=settings.section_keyframe_padding_seconds,
+                progress_callback=progress_callback,
+            )
+            _save_clips(result, result['clips'])
+            reporter.flush('Download dos trechos concluído!')
+            return {
+                'status': 'success',
+                'video_info': result,
+            }
         
         # Fazer download
         logger.info(f"Iniciando download: {video_url}")
@@ -94,11 +241,17 @@ def download_youtube_video(
             progress_callback=progress_callback,
         )
         
+        try:
+            index.record_download(result)
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao registrar o download no índice: {e}")
+        try:
+            save_downloads([result], quality=format_choice)
+        except Exception as e:
+            logger.warning(f"Erro ao registrar o download no banco: {str(e)}")
+        
         # Atualizar estado final
-        self.update_state(
-            state='PROGRESS',
-            meta={'current': 100, 'total': 100, 'status': 'Download concluído!'}
-        )
+        reporter.flush('Download concluído!')
         
         logger.info(f"Download concluído: {result.get('title')}")
         return {
@@ -123,54 +276,92 @@ def download_multiple_youtube_videos(
     self,
     video_urls: list,
     format_choice: str = "best",
+    force: bool = False,
+    max_workers: int = None,
 ):
     """
     Tarefa Celery para fazer download de múltiplos vídeos.
     
+    Vídeos já baixados não são baixados de novo.
+    
     Args:
         video_urls: Lista de URLs
         format_choice: Formato desejado
+        force: Baixa novamente os vídeos que já estão na pasta de downloads
+        max_workers: Número máximo de downloads simultâneos (padrão: `download_max_workers`)
     
     Returns:
-        Resultados dos downloads
+        Resultados dos downloads, com bytes totais e vazão
     """
     
     try:
         # Inicializar downloader
-        downloader = YouTubeDownloader(output_path="downloads")
+        downloader = YouTubeDownloader(
+            output_path=settings.download_dir,
+            concurrent_fragments=settings.download_concurrent_fragments,
+            info_cache=get_info_dict_cache(),
+        )
+        index = get_video_index()
+        
+        # Separar os vídeos já baixados
+        existing_videos = []
+        pending_urls = []
+        for url in video_urls:
+            existing = None if force else _find_existing_download(downloader, index, url, format_choice)
+            if existing:
+                existing_videos.append(existing)
+            else:
+                pending_urls.append(url)
+        if existing_videos:
+            logger.info(f"{len(existing_videos)} vídeos já baixados serão reaproveitados")
+        
+        # O progresso é publicado pelas threads de download, onde `self.request` não está disponível
+        reporter = get_progress_reporter(self, task_id=self.request.id)
         
         # Callback para atualizar progresso
         def progress_callback(info):
             if info.get('status') == 'downloading_multiple':
                 current = info.get('current', 0)
-                total = info.get('total', len(video_urls))
-                percent = int((current / total) * 100)
+                total = info.get('total', len(video_urls)) or 1
                 
-                self.update_state(
-                    state='PROGRESS',
-                    meta={
-                        'current': percent,
-                        'total': 100,
-                        'status': f"Baixando vídeo {current}/{total}: {info.get('url', 'N/A')}",
-                    }
+                reporter.update(
+                    100 * current / total,
+                    f"Baixados {current}/{total} vídeos",
+                    downloaded_bytes=info.get('downloaded_bytes', 0),
+                    throughput_bytes_per_second=info.get('throughput_bytes_per_second', 0),
+                    # Cada vídeo concluído é publicado imediatamente
+                    force=info.get('video_finished', False),
                 )
         
         # Fazer downloads
         logger.info(f"Iniciando download de {len(video_urls)} vídeos")
         results = downloader.download_multiple_videos(
-            video_urls=video_urls,
+            video_urls=pending_urls,
             format_choice=format_choice,
             progress_callback=progress_callback,
+            max_workers=max_workers or settings.download_max_workers,
         )
         
+        try:
+            for video_info in results['videos']:
+                index.record_download(video_info)
+        except redis.RedisError as e:
+            logger.warning(f"Erro ao registrar os downloads no índice: {e}")
+        try:
+            save_downloads(results['videos'], quality=format_choice)
+        except Exception as e:
+            logger.warning(f"Erro ao registrar os downloads no banco: {str(e)}")
+        
+        results['total'] += len(existing_videos)
+        results['successful'] += len(existing_videos)
+        results['already_downloaded'] = len(existing_videos)
+        results['videos'] = existing_videos + results['videos']
+        
         # Atualizar estado final
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                'current': 100,
-                'total': 100,
-                'status': f"Downloads concluídos! {results['successful']} sucesso, {results['failed']} falhas",
-            }
+        reporter.flush(
+            f"Downloads concluídos! {results['successful']} sucesso, {results['failed']} falhas",
+            downloaded_bytes=results['total_bytes'],
+            throughput_bytes_per_second=results['throughput_bytes_per_second'],
         )
         
         logger.info(f"Downloads múltiplos concluídos: {results}")
@@ -197,7 +388,7 @@ def get_video_info_task(self, video_url: str):
     """
     
     try:
-        downloader = YouTubeDownloader()
+        downloader = YouTubeDownloader(info_cache=get_info_dict_cache())
         info = downloader.get_video_info(video_url)
         
         return {
@@ -223,7 +414,7 @@ def get_available_formats_task(self, video_url: str):
     """
     
     try:
-        downloader = YouTubeDownloader()
+        downloader = YouTubeDownloader(info_cache=get_info_dict_cache())
         formats = downloader.get_available_formats(video_url)
         
         return {
@@ -3,11 +3,20 @@ Tarefas Celery para detecção de cenas em vídeos.
 """
 
 import logging
+import os
 from celery import shared_task, Task
 from src.celery_app import celery_app
-from src.modules.scene_detector import SceneDetector
+from scenedetect import StatsManager
+from src.modules.scene_detector import NO_CHECKPOINT_METHODS, SceneDetector, serialize_scenes
+from src.modules.scene_cache import get_scene_cache, make_cache_key
+from src.modules.scene_checkpoint import get_checkpoint_store
+from src.modules.frame_metrics import FrameMetricsStore, METRIC_METHODS
+from src.modules.clip_exporter import ClipExporter
+from src.modules.progress_reporter import get_progress_reporter
+from src.settings import get_settings
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 class SceneDetectionTask(Task):
     """Task base para detecção de cenas com suporte a callbacks."""
@@ -31,8 +40,10 @@ class SceneDetectionTask(Task):
 @celery_app.task(
     bind=True,
     base=SceneDetectionTask,
-    max_retries=1,
+    max_retries=3,
     default_retry_delay=10,
+    acks_late=True,
+    reject_on_worker_lost=True,
 )
 def detect_scenes_task(
     self,
@@ -40,59 +51,247 @@ def detect_scenes_task(
     method: str = 'adaptive',
     adaptive_threshold: float = 3.0,
     content_threshold: float = 27.0,
+    shards: int = 1,
+    shard_overlap: float = 5.0,
+    cache_key: str = None,
+    file_hash: str = None,
 ):
     """
     Tarefa Celery para detecção de cenas em um vídeo.
     
+    O progresso é gravado em checkpoints periódicos. Retries, reentregas após a queda
+    do worker e novas execuções da mesma detecção continuam do último checkpoint.
+    Apenas a task que reservou a detecção usa checkpoints: uma execução simultânea da
+    mesma detecção roda do início, sem gravar progresso. A detecção em shards
+    (`shards > 1`), o método 'two_pass' e o recálculo a partir das métricas persistidas
+    não usam checkpoints: os shards e as janelas do refinamento são independentes e o
+    recálculo não decodifica o vídeo.
+    
     Args:
         video_path: Caminho para o arquivo de vídeo.
-        method: Método de detecção ('adaptive' ou 'content').
+        method: Método de detecção ('adaptive', 'content', 'two_pass' ou 'numpy').
         adaptive_threshold: Threshold para AdaptiveDetector.
         content_threshold: Threshold para ContentDetector.
+        shards: Número de janelas de tempo processadas em paralelo (1 = passada única).
+        shard_overlap: Sobreposição entre janelas vizinhas, em segundos.
+        cache_key: Chave do cache de resultados (ver `make_cache_key`), se houver.
+        file_hash: Hash do conteúdo do vídeo, usado para persistir e reutilizar as métricas por frame.
     
     Returns:
         Informações da detecção de cenas.
     """
     
+    # Mesmo limite da API para tarefas enfileiradas por outros caminhos
+    shards = max(1, min(shards, settings.max_scene_shards))
+    
+    checkpoint_store = get_checkpoint_store()
+    checkpoint_key = cache_key or make_cache_key(
+        file_hash or video_path,
+        method,
+        adaptive_threshold=adaptive_threshold,
+        content_threshold=content_threshold,
+    )
+    task_kwargs = {
+        'video_path': video_path,
+        'method': method,
+        'adaptive_threshold': adaptive_threshold,
+        'content_threshold': content_threshold,
+        'shards': shards,
+        'shard_overlap': shard_overlap,
+        'cache_key': cache_key,
+        'file_hash': file_hash,
+    }
+    checkpoint_saved = False
+    
+    # Reservar a detecção: duas tasks com a mesma chave não podem gravar o mesmo checkpoint.
+    # Os shards e o método 'two_pass' não gravam checkpoints, então não reservam nada.
+    supports_checkpoints = shards == 1 and method not in NO_CHECKPOINT_METHODS
+    uses_checkpoints = supports_checkpoints and checkpoint_store.acquire(checkpoint_key, self.request.id)
+    if supports_checkpoints and not uses_checkpoints:
+        logger.info(f"Detecção {checkpoint_key} em andamento em outra task; executando sem checkpoints")
+    
     try:
-        self.update_state(
-            state='PROGRESS',
-            meta={'current': 0, 'total': 100, 'status': 'Iniciando detecção de cenas...'}
+        resume_from = checkpoint_store.load(checkpoint_key) if uses_checkpoints else None
+        resumed_frame = resume_from['frame'] if resume_from else 0
+        reporter = get_progress_reporter(self)
+        reporter.update(
+            0,
+            f'Retomando detecção do frame {resumed_frame}...' if resume_from else 'Iniciando detecção de cenas...',
+            force=True,
+            resumed_from=resumed_frame,
         )
         
+        # Callback para gravar o progresso e permitir a retomada após falhas
+        def checkpoint_callback(frame_position, cuts):
+            nonlocal checkpoint_saved
+            checkpoint_store.save(checkpoint_key, self.request.id, frame_position, cuts, task_kwargs)
+            checkpoint_saved = True
+        
         detector = SceneDetector(
             adaptive_threshold=adaptive_threshold,
             content_threshold=content_threshold
         )
         
-        scene_list = detector.detect_scenes(video_path, method)
+        # Callback para publicar o progresso e as cenas encontradas até o momento.
+        # As cenas só são serializadas quando o reporter publica o estado.
+        def scenes_progress_callback(frame_position, total_frames, partial_scenes):
+            reporter.update(
+                100 * frame_position / total_frames if total_frames else 0,
+                f'Frame {frame_position}/{total_frames} - {len(partial_scenes)} cenas encontradas',
+                frame=frame_position,
+                total_frames=total_frames,
+                scenes=lambda: serialize_scenes(partial_scenes),
+                resumed_from=resumed_frame,
+            )
         
-        # Converter FrameTimecode para um formato serializável (string de tempo e frame number)
-        scenes_json = [
-            {
-                'start_time': str(scene[0].get_seconds()),
-                'end_time': str(scene[1].get_seconds()),
-                'start_frame': scene[0].frame_num,
-                'end_frame': scene[1].frame_num,
-                'duration': (scene[1] - scene[0]).get_seconds()
-            }
-            for scene in scene_list
-        ]
+        if shards > 1:
+            shard_status = []
+            
+            # Callback para atualizar progresso por shard
+            def progress_callback(shard_index, completed, total):
+                if len(shard_status) != total:
+                    shard_status[:] = ['pending'] * total
+                shard_status[shard_index] = 'done'
+                reporter.update(
+                    100 * completed / total,
+                    f'Shard {completed}/{total} concluído',
+                    shards=list(shard_status),
+                )
+            
+            scene_list = detector.detect_scenes_sharded(
+                video_path,
+                method,
+                shards=shards,
+                overlap=shard_overlap,
+                progress_callback=progress_callback,
+            )
+        elif file_hash and method in METRIC_METHODS:
+            # Reaproveitar as métricas por frame se o vídeo já foi decodificado antes
+            metrics_store = FrameMetricsStore(settings.scene_metrics_dir)
+            threshold = adaptive_threshold if method == 'adaptive' else content_threshold
+            scene_list = metrics_store.detect_scenes(file_hash, method, threshold)
+            
+            if scene_list is None:
+                stats_manager = StatsManager()
+                scene_list = detector.detect_scenes(
+                    video_path,
+                    method,
+                    stats_manager=stats_manager,
+                    progress_callback=scenes_progress_callback,
+                    resume_from=resume_from,
+                    checkpoint_callback=checkpoint_callback if uses_checkpoints else None,
+                    checkpoint_interval=settings.scene_checkpoint_interval_seconds,
+                )
+                # Uma detecção retomada não tem as métricas dos frames anteriores ao checkpoint
+                if not resume_from:
+                    metrics_store.save(file_hash, stats_manager, video_path)
+            else:
+                logger.info(f"Cenas recalculadas a partir das métricas persistidas de {file_hash}")
+        else:
+            scene_list = detector.detect_scenes(
+                video_path,
+                method,
+                progress_callback=scenes_progress_callback,
+                resume_from=resume_from,
+                checkpoint_callback=checkpoint_callback if uses_checkpoints else None,
+                checkpoint_interval=settings.scene_checkpoint_interval_seconds,
+            )
         
-        self.update_state(
-            state='PROGRESS',
-            meta={'current': 100, 'total': 100, 'status': f'Detecção concluída! {len(scenes_json)} cenas encontradas.'}
-        )
+        scenes_json = serialize_scenes(scene_list)
+        
+        reporter.flush(f'Detecção concluída! {len(scenes_json)} cenas encontradas.')
         
         logger.info(f"Detecção de cenas concluída: {len(scenes_json)} cenas.")
-        return {
+        result = {
             'status': 'success',
             'scenes_count': len(scenes_json),
             'scenes': scenes_json,
-            'video_path': video_path,
+            'file_hash': file_hash,
         }
+        
+        # Armazenar no cache para que novas requisições do mesmo vídeo não reprocessem
+        if cache_key:
+            get_scene_cache().set(cache_key, result)
+        if uses_checkpoints:
+            checkpoint_store.delete(checkpoint_key)
+            checkpoint_store.release(checkpoint_key, self.request.id)
+        
+        return {**result, 'video_path': video_path}
     
     except Exception as exc:
         logger.error(f"Erro na detecção de cenas: {str(exc)}")
-        # Não faremos retry para evitar reprocessamento de vídeo longo
+        # Retry apenas se houver progresso salvo: o retry continua do último checkpoint
+        # em vez de reprocessar o vídeo desde o início (e mantém a reserva da detecção)
+        if checkpoint_saved and self.request.retries < self.max_retries:
+            raise self.retry(exc=exc)
+        if uses_checkpoints:
+            checkpoint_store.release(checkpoint_key, self.request.id)
+        raise
+
+
+@celery_app.task(
+    bind=True,
+    base=SceneDetectionTask,
+    max_retries=1,
+    default_retry_delay=10,
+)
+def export_scene_clips_task(
+    self,
+    video_path: str,
+    scenes: list,
+    output_dir: str = None,
+    max_workers: int = None,
+):
+    """
+    Tarefa Celery para exportar as cenas detectadas como clipes, em paralelo.
+    
+    Args:
+        video_path: Caminho para o arquivo de vídeo.
+        scenes: Lista de cenas no formato retornado por `detect_scenes_task`.
+        output_dir: Diretório dos clipes (padrão: `<clips_dir>/<nome do vídeo>`).
+        max_workers: Número máximo de processos ffmpeg simultâneos.
+    
+    Returns:
+        Informações dos clipes exportados.
+    """
+    
+    try:
+        reporter = get_progress_reporter(self)
+        reporter.update(0, f'Iniciando exportação de {len(scenes)} clipes...', force=True)
+        
+        if output_dir is None:
+            video_name = os.path.splitext(os.path.basename(video_path))[0]
+            output_dir = os.path.join(settings.clips_dir, video_name)
+        
+        exporter = ClipExporter(
+            output_dir=output_dir,
+            max_workers=max_workers or settings.clip_export_max_workers,
+        )
+        clips_status = ['pending'] * len(scenes)
+        
+        # Callback para atualizar progresso por clipe
+        def progress_callback(clip_info, completed, total):
+            clips_status[clip_info['index'] - 1] = 'error' if 'error' in clip_info else clip_info['mode']
+            reporter.update(
+                100 * completed / total,
+                f'Clipe {completed}/{total} exportado',
+                clips=lambda: list(clips_status),
+            )
+        
+        results = exporter.export_clips(
+            video_path,
+            [(float(scene['start_time']), float(scene['end_time'])) for scene in scenes],
+            progress_callback=progress_callback,
+        )
+        
+        reporter.flush(f"Exportação concluída! {results['successful']} clipes.", clips=clips_status)
+        logger.info(f"Exportação de clipes concluída: {results['successful']} clipes.")
+        return {
+            'status': 'success',
+            'output_dir': output_dir,
+            'results': results,
+        }
+    
+    except Exception as exc:
+        logger.error(f"Erro na exportação de clipes: {str(exc)}")
         raise
@@ -0,0 +1,101 @@
+"""
+Fixtures compartilhadas dos testes.
+
+`local_server` sobe um servidor HTTP local, em uma thread, que responde com uma
+função definida pelo teste: um substituto dos serviços do YouTube, sem rede.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+import cv2
+import fakeredis
+import numpy as np
+import pytest
+
+# Vídeo sintético com cortes conhecidos: (cor BGR, frames) de cada cena.
+# Várias cenas têm o mesmo tom de verde (como planos diferentes do gramado),
+# mudando apenas brilho e saturação.
+SCENE_VIDEO_FPS = 25
+SCENE_VIDEO_SHOTS = [
+    ((40, 150, 40), 40),
+    ((200, 60, 60), 30),
+    ((20, 90, 20), 35),
+    ((110, 220, 110), 30),
+    ((40, 40, 200), 30),
+    ((40, 150, 40), 35),
+]
+
+
+class LocalServer:
+    """Servidor HTTP local que registra as requisições e delega as respostas a um handler."""
+    
+    def __init__(self):
+        self.requests = []
+        self.handler: Callable = lambda request: (404, {}, b'')
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                request = {
+                    'path': url.path,
+                    'params': {name: values[0] for name, values in parse_qs(url.query).items()},
+                    'headers': self.headers,
+                }
+                server.requests.append(request)
+                status, headers, body = server.handler(request)
+                
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    
+    def requests_to(self, path: str) -> list:
+        """Requisições recebidas em um caminho."""
+        return [request for request in self.requests if request['path'] == path]
+
+
+@pytest.fixture
+def local_server():
+    """Servidor HTTP local; o teste define `local_server.handler`."""
+    server = LocalServer()
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture(scope='session')
+def scene_video(tmp_path_factory) -> str:
+    """Vídeo curto (160x120) gerado com os planos de `SCENE_VIDEO_SHOTS`, com ruído e movimento."""
+    path = str(tmp_path_factory.mktemp("videos") / "scenes.mp4")
+    rng = np.random.default_rng(0)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), SCENE_VIDEO_FPS, (160, 120))
+    frame_number = 0
+    for color, length in SCENE_VIDEO_SHOTS:
+        for _ in range(length):
+            frame = np.full((120, 160, 3), color, dtype=np.int16) + rng.integers(-8, 8, (120, 160, 3))
+            frame = np.clip(frame, 0, 255).astype(np.uint8)
+            x = frame_number % 120
+            cv2.rectangle(frame, (x, 40), (x + 30, 80), (230, 230, 230), -1)
+            writer.write(frame)
+            frame_number += 1
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def redis_client():
+    """Redis em memória com a mesma configuração do cliente da aplicação."""
+    return fakeredis.FakeRedis(decode_responses=True)
@@ -0,0 +1,131 @@
+"""
+Testes da classificação de erros e do fallback de chaves.
+"""
+
+import time
+import httpx
+import pytest
+from src.modules import api_key_manager
+from src.modules.api_key_manager import (
+    ERROR_FATAL,
+    ERROR_KEY,
+    ERROR_NETWORK,
+    ERROR_QUOTA,
+    ERROR_RETRYABLE,
+    APIKeyManager,
+    CircuitBreaker,
+    classify_error,
+    get_circuit_breaker,
+)
+from src.modules.youtube_data_api import YouTubeAPIError
+
+
+@pytest.fixture(autouse=True)
+def isolated_circuit_breakers(monkeypatch):
+    """Cada teste começa com os circuit breakers do processo vazios."""
+    monkeypatch.setattr(api_key_manager, '_circuit_breakers', {})
+
+
+@pytest.mark.parametrize('error, expected', [
+    (YouTubeAPIError(403, 'quotaExceeded', 'quota'), ERROR_QUOTA),
+    (YouTubeAPIError(403, 'rateLimitExceeded', 'rate'), ERROR_RETRYABLE),
+    (YouTubeAPIError(400, 'keyInvalid', 'invalid'), ERROR_KEY),
+    (YouTubeAPIError(503, '', 'unavailable'), ERROR_RETRYABLE),
+    (YouTubeAPIError(400, 'badRequest', 'bad'), ERROR_FATAL),
+    (httpx.ConnectError('down'), ERROR_NETWORK),
+    (httpx.ReadTimeout('slow'), ERROR_NETWORK),
+    (TimeoutError(), ERROR_NETWORK),
+    (KeyError('items'), ERROR_FATAL),
+    (TypeError('bug'), ERROR_FATAL),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+
+def test_programming_error_is_not_retried():
+    manager = APIKeyManager(['key-1', 'key-2'], api_name='Test')
+    calls = []
+    
+    def call(api_key):
+        calls.append(api_key)
+        raise KeyError('items')
+    
+    with pytest.raises(KeyError):
+        manager.retry_with_fallback(call, delay=0)
+    
+    assert calls == ['key-1']
+
+
+def test_network_error_does_not_penalize_key():
+    manager = APIKeyManager(['key-1', 'key-2'], api_name='Test')
+    calls = []
+    
+    def call(api_key):
+        calls.append(api_key)
+        raise httpx.ConnectError('down')
+    
+    with pytest.raises(httpx.ConnectError):
+        manager.retry_with_fallback(call, max_retries=3, delay=0)
+    
+    assert calls == ['key-1'] * 3
+    assert get_circuit_breaker('Test', 'key-1').failures == 0
+
+
+def test_quota_error_moves_to_next_key():
+    manager = APIKeyManager(['key-1', 'key-2'], api_name='Test')
+    
+    def call(api_key):
+        if api_key == 'key-1':
+            raise YouTubeAPIError(403, 'quotaExceeded', 'quota')
+        return api_key
+    
+    assert manager.retry_with_fallback(call, delay=0) == 'key-2'
+    assert get_circuit_breaker('Test', 'key-1').state == CircuitBreaker.OPEN
+
+
+def test_half_open_circuit_lets_a_single_trial_through(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    
+    now[0] += 61
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    assert not breaker.is_available()
+    
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+
+
+def test_failed_trial_reopens_circuit(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    now[0] += 61
+    
+    assert breaker.allow_request()
+    breaker.record_failure()
+    
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+
+def test_released_trial_can_be_taken_again(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    now[0] += 61
+    
+    assert breaker.allow_request()
+    breaker.release()
+    
+    assert breaker.allow_request()
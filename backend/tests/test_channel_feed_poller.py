@@ -0,0 +1,146 @@
+"""
+Testes da coleta incremental pelos feeds dos canais, contra um feed local.
+"""
+
+import pytest
+from src.modules.channel_feed_poller import ChannelFeedPoller, parse_feed
+
+CHANNEL_ID = "UCchannel0000000000000001"
+
+
+def make_feed(entries: list[tuple[str, str]]) -> bytes:
+    """Monta um feed Atom do YouTube com entradas (video_id, published)."""
+    items = "".join(
+        f"""
+        <entry>
+            <yt:videoId>{video_id}</yt:videoId>
+            <title>Vídeo {video_id}</title>
+            <author><name>Canal</name></author>
+            <published>{published}</published>
+        </entry>"""
+        for video_id, published in entries
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns="http://www.w3.org/2005/Atom">
+    <title>Canal</title>{items}
+</feed>""".encode()
+
+
+class FeedStandIn:
+    """Feed de um canal com ETag: responde 304 quando o cliente já tem a versão atual."""
+    
+    def __init__(self, entries: list[tuple[str, str]], etag: str = '"v1"'):
+        self.entries = entries
+        self.etag = etag
+    
+    def publish(self, video_id: str, published: str, etag: str) -> None:
+        """Adiciona um upload no topo do feed e muda o ETag."""
+        self.entries = [(video_id, published), *self.entries]
+        self.etag = etag
+    
+    def __call__(self, request: dict):
+        if request['headers'].get('If-None-Match') == self.etag:
+            return 304, {'ETag': self.etag}, b''
+        return 200, {'ETag': self.etag, 'Content-Type': 'application/atom+xml'}, make_feed(self.entries)
+
+
+@pytest.fixture
+def feed(local_server):
+    stand_in = FeedStandIn([
+        ("video000002", "2025-01-02T10:00:00+00:00"),
+        ("video000001", "2025-01-01T10:00:00+00:00"),
+    ])
+    local_server.handler = stand_in
+    return stand_in
+
+
+@pytest.fixture
+def poller(local_server, redis_client):
+    return ChannelFeedPoller(redis_client, feed_base_url=f"{local_server.url}/feeds/videos.xml")
+
+
+def test_parse_feed_orders_by_published_date():
+    videos = parse_feed(make_feed([
+        ("older000001", "2025-01-01T10:00:00+00:00"),
+        ("newer000001", "2025-01-03T10:00:00+00:00"),
+    ]))
+    
+    assert [video['video_id'] for video in videos] == ["newer000001", "older000001"]
+    assert videos[0]['upload_date'] == "20250103"
+    assert videos[0]['url'] == "https://www.youtube.com/watch?v=newer000001"
+
+
+def test_first_poll_returns_whole_feed_and_sets_watermark(feed, poller, local_server):
+    videos = poller.poll_channels({'canal': CHANNEL_ID})
+    
+    assert [video['video_id'] for video in videos] == ["video000002", "video000001"]
+    assert all(video['channel_key'] == 'canal' for video in videos)
+    assert local_server.requests[0]['params'] == {'channel_id': CHANNEL_ID}
+    
+    watermark = poller.get_watermark(CHANNEL_ID)
+    assert watermark['video_id'] == "video000002"
+    assert watermark['published'] == "2025-01-02T10:00:00+00:00"
+    assert watermark['etag'] == '"v1"'
+
+
+def test_unchanged_feed_is_revalidated_with_etag(feed, poller, local_server):
+    poller.poll_channels({'canal': CHANNEL_ID})
+    watermark = poller.get_watermark(CHANNEL_ID)
+    
+    assert poller.poll_channels({'canal': CHANNEL_ID}) == []
+    
+    assert local_server.requests[1]['headers'].get('If-None-Match') == '"v1"'
+    assert poller.get_watermark(CHANNEL_ID) == watermark
+
+
+def test_new_upload_advances_watermark(feed, poller):
+    poller.poll_channels({'canal': CHANNEL_ID})
+    feed.publish("video000003", "2025-01-03T10:00:00+00:00", etag='"v2"')
+    
+    videos = poller.poll_channels({'canal': CHANNEL_ID})
+    
+    assert [video['video_id'] for video in videos] == ["video000003"]
+    watermark = poller.get_watermark(CHANNEL_ID)
+    assert watermark['video_id'] == "video000003"
+    assert watermark['published'] == "2025-01-03T10:00:00+00:00"
+    assert watermark['etag'] == '"v2"'
+
+
+def test_changed_feed_without_new_uploads_keeps_watermark(feed, poller):
+    poller.poll_channels({'canal': CHANNEL_ID})
+    feed.etag = '"v2"'  # ex: título de um vídeo antigo editado
+    
+    assert poller.poll_channels({'canal': CHANNEL_ID}) == []
+    
+    watermark = poller.get_watermark(CHANNEL_ID)
+    assert watermark['video_id'] == "video000002"
+    assert watermark['etag'] == '"v2"'
+
+
+def test_reset_watermark_returns_whole_feed_again(feed, poller):
+    poller.poll_channels({'canal': CHANNEL_ID})
+    poller.reset_watermark(CHANNEL_ID)
+    
+    assert len(poller.poll_channels({'canal': CHANNEL_ID})) == 2
+
+
+def test_failing_channel_does_not_block_others(feed, poller, local_server):
+    broken_id = "UCbroken00000000000000001"
+    
+    def handler(request):
+        if request['params'].get('channel_id') == broken_id:
+            return 500, {}, b'erro'
+        return feed(request)
+    
+    local_server.handler = handler
+    videos = poller.poll_channels({'canal': CHANNEL_ID, 'quebrado': broken_id})
+    
+    assert len(videos) == 2
+    assert poller.get_watermark(broken_id) == {}
+
+
+def test_all_channels_failing_raises(local_server, poller):
+    local_server.handler = lambda request: (500, {}, b'erro')
+    
+    with pytest.raises(RuntimeError):
+        poller.poll_channels({'canal': CHANNEL_ID})
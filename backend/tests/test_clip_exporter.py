@@ -0,0 +1,71 @@
+"""
+Testes da exportação de clipes, com os comandos do ffmpeg/ffprobe registrados em vez de executados.
+"""
+
+import json
+import pytest
+from src.modules import clip_exporter
+from src.modules.clip_exporter import ClipExporter
+
+H264_PROBE = {
+    'keyframes': [0.0, 2.0, 4.0],
+    'video_codec': 'h264',
+    'video_profile': 'High',
+    'video_level': 40,
+    'pix_fmt': 'yuv420p',
+    'audio_codec': 'aac',
+}
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    """Comandos executados; ffprobe responde como um MPEG-TS que começa em 1.4s."""
+    executed = []
+    
+    def run(command):
+        executed.append(command)
+        if command[0] != 'ffprobe':
+            return ''
+        if 'packet=pts_time,flags' in command:
+            return "1.400000,K__\n1.440000,___\n3.400000,K__\n"
+        if 'a:0' in command:
+            return json.dumps({'streams': [{'codec_name': 'aac'}]})
+        return json.dumps({'streams': [{
+            'codec_name': 'h264', 'profile': 'High', 'level': 40,
+            'pix_fmt': 'yuv420p', 'start_time': '1.400000',
+        }]})
+    
+    monkeypatch.setattr(clip_exporter, '_run', run)
+    return executed
+
+
+def test_probe_measures_keyframes_from_stream_start(commands, tmp_path):
+    probe = ClipExporter(output_dir=str(tmp_path)).probe("video.ts")
+    
+    assert probe['keyframes'] == pytest.approx([0.0, 2.0])
+    assert probe['video_codec'] == 'h264'
+    assert probe['audio_codec'] == 'aac'
+
+
+def test_smart_cut_joins_parts_with_in_band_parameter_sets(commands, tmp_path):
+    result = ClipExporter(output_dir=str(tmp_path)).export_clip("video.mp4", H264_PROBE, 1, 1.5, 3.5)
+    
+    head, tail, join = commands
+    assert result['mode'] == 'smart'
+    assert result['path'].endswith("video-Scene-001.mp4")
+    assert head[-3:-1] == ['-f', 'mpegts'] and head[-1].endswith("head.ts")
+    assert head[head.index('-x264-params') + 1] == 'repeat-headers=1'
+    assert tail[tail.index('-bsf:v') + 1] == 'h264_mp4toannexb'
+    assert tail[-1].endswith("tail.ts")
+    assert join[join.index('-i') + 1] == f"concat:{head[-1]}|{tail[-1]}"
+    assert join[-1] == result['path']
+
+
+def test_codec_without_encoder_is_reencoded_to_mp4(commands, tmp_path):
+    probe = {**H264_PROBE, 'video_codec': 'vp9', 'video_profile': 'Profile 0', 'audio_codec': 'opus'}
+    
+    result = ClipExporter(output_dir=str(tmp_path)).export_clip("video.webm", probe, 2, 1.5, 3.5)
+    
+    assert result['mode'] == 'reencode'
+    assert result['path'].endswith("video-Scene-002.mp4")
+    assert commands[0][commands[0].index('-c:v') + 1] == 'libx264'
@@ -0,0 +1,36 @@
+"""
+Testes do lock de atualização do cache de coleta.
+"""
+
+import pytest
+from src import tasks
+from src.modules.collect_cache import CollectResultCache
+
+KEY = "collect-key"
+
+
+@pytest.fixture
+def cache(redis_client):
+    return CollectResultCache(redis_client, refresh_lock_seconds=300)
+
+
+def test_release_frees_the_refresh_only_for_its_owner(cache):
+    assert cache.acquire_refresh(KEY, 'task-1')
+    
+    cache.release_refresh(KEY, 'task-2')
+    assert cache.get_refresh_task(KEY) == 'task-1'
+    
+    cache.release_refresh(KEY, 'task-1')
+    assert cache.acquire_refresh(KEY, 'task-2')
+
+
+def test_failed_collection_releases_the_refresh(cache, monkeypatch):
+    monkeypatch.setattr(tasks, 'get_collect_cache', lambda: cache)
+    cache.acquire_refresh(KEY, 'task-1')
+    
+    tasks.collect_youtube_videos.on_failure(
+        RuntimeError("quota"), 'task-1', (), {'cache_key': KEY}, None,
+    )
+    
+    assert cache.get_refresh_task(KEY) is None
+    assert cache.acquire_refresh(KEY, 'task-2')
@@ -0,0 +1,52 @@
+"""
+Testes do armazenamento das métricas por frame.
+"""
+
+import json
+import pytest
+from scenedetect import StatsManager
+from src.modules.frame_metrics import FrameMetricsStore
+from src.modules.scene_cache import compute_file_hash
+from src.modules.scene_detector import SceneDetector
+
+FILE_HASH = "sha256:" + "ab" * 32
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FrameMetricsStore(str(tmp_path / "metrics"))
+
+
+def test_base_path_stays_in_metrics_dir(store):
+    assert store._base_path(FILE_HASH) == f"{store.metrics_dir}/sha256_{'ab' * 32}"
+    assert not store.exists("sampled:" + "cd" * 32)
+
+
+@pytest.mark.parametrize('file_hash', [
+    "../../etc/passwd",
+    "sha256:../../" + "a" * 58,
+    "sha256:" + "AB" * 32,
+    "sha256:" + "ab" * 31,
+    "md5:" + "ab" * 32,
+    "",
+])
+def test_invalid_file_hash_is_rejected(store, file_hash):
+    with pytest.raises(ValueError):
+        store.exists(file_hash)
+
+
+@pytest.mark.parametrize('method', ['adaptive', 'content'])
+def test_stored_metrics_reproduce_detector_cuts(store, scene_video, method):
+    file_hash = compute_file_hash(scene_video)
+    stats_manager = StatsManager()
+    detected = SceneDetector().detect_scenes(scene_video, method, stats_manager=stats_manager)
+    
+    store.save(file_hash, stats_manager, scene_video)
+    replayed = store.detect_scenes(file_hash, method, 3.0 if method == 'adaptive' else 27.0)
+    
+    assert len(detected) > 1
+    assert [(start.frame_num, end.frame_num) for start, end in replayed] == [
+        (start.frame_num, end.frame_num) for start, end in detected
+    ]
+    with open(f"{store._base_path(file_hash)}.json") as f:
+        assert json.load(f)['fps'] == 25.0
@@ -0,0 +1,45 @@
+"""
+Testes do backend vetorizado de detecção de cenas, comparado ao PySceneDetect.
+"""
+
+from scenedetect import ContentDetector, SceneManager, open_video
+from scenedetect.detector import FlashFilter
+from src.modules.numpy_scene_detector import NumpySceneDetector, downscaled_size
+
+
+def content_detector_cuts(video_path: str) -> list[int]:
+    """Cortes do ContentDetector com o mesmo descarte de cortes próximos do backend vetorizado."""
+    scene_manager = SceneManager()
+    scene_manager.add_detector(ContentDetector(min_scene_len=15, filter_mode=FlashFilter.Mode.SUPPRESS))
+    scene_manager.detect_scenes(video=open_video(video_path))
+    return [start.frame_num for start, _ in scene_manager.get_scene_list()[1:]]
+
+
+def test_downscaled_size_matches_scene_manager():
+    assert downscaled_size(1280, 720) == (256, 144)
+    assert downscaled_size(1920, 1080) == (256, 144)
+    assert downscaled_size(160, 120) == (160, 120)
+
+
+def test_cuts_match_content_detector(scene_video):
+    cuts, total_frames, fps = NumpySceneDetector(min_scene_len=15).detect_cuts(scene_video)
+    
+    # Inclui os cortes entre planos do mesmo tom de verde
+    assert cuts == content_detector_cuts(scene_video)
+    assert len(cuts) == 5
+    assert total_frames == 200
+    assert fps == 25
+
+
+def test_resumed_detection_matches_full_run(scene_video):
+    detector = NumpySceneDetector(min_scene_len=15, batch_size=16)
+    full_cuts, _, _ = detector.detect_cuts(scene_video)
+    
+    resumed_cuts, total_frames, _ = detector.detect_cuts(
+        scene_video,
+        start_frame=80,
+        initial_cuts=[cut for cut in full_cuts if cut < 80],
+    )
+    
+    assert resumed_cuts == full_cuts
+    assert total_frames == 200
@@ -0,0 +1,78 @@
+"""
+Testes do banco de metadados da biblioteca, sobre um SQLite local.
+"""
+
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import pytest
+from src.database import repository
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Arquivo SQLite usado pelas funções síncronas dos workers."""
+    path = tmp_path / "library.db"
+    monkeypatch.setattr(repository, 'get_settings', lambda: SimpleNamespace(database_url=f"sqlite+aiosqlite:///{path}"))
+    repository._get_worker_runtime.cache_clear()
+    yield path
+    repository._get_worker_runtime.cache_clear()
+
+
+def columns(path, table: str) -> set:
+    with sqlite3.connect(path) as conn:
+        return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def test_existing_tables_get_new_columns(database):
+    # Tabelas criadas antes de `video_clips.source_video_id` e `video_downloads.video_id`
+    with sqlite3.connect(database) as conn:
+        conn.execute(
+            "CREATE TABLE video_downloads (id VARCHAR PRIMARY KEY, video_url VARCHAR NOT NULL, "
+            "video_title VARCHAR NOT NULL, video_channel VARCHAR NOT NULL, file_path VARCHAR NOT NULL, "
+            "file_size INTEGER, quality VARCHAR, duration INTEGER, downloaded_at DATETIME, status VARCHAR)"
+        )
+        conn.execute(
+            "CREATE TABLE video_clips (id VARCHAR PRIMARY KEY, video_download_id VARCHAR, title VARCHAR NOT NULL, "
+            "start_time INTEGER, end_time INTEGER, duration INTEGER, file_path VARCHAR, created_at DATETIME, "
+            "is_exported BOOLEAN)"
+        )
+    
+    saved = repository.save_clips(
+        {'video_id': 'abcdefghijk', 'title': "Gol"},
+        [{'filename': 'gol.10-20.mp4', 'start_time': 10, 'end_time': 20}],
+    )
+    
+    assert saved == 1
+    assert 'source_video_id' in columns(database, 'video_clips')
+    assert 'video_id' in columns(database, 'video_downloads')
+    with sqlite3.connect(database) as conn:
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(video_clips)")}
+        clip = conn.execute("SELECT source_video_id FROM video_clips").fetchone()
+    assert 'ix_video_clips_source_video_id' in indexes
+    assert clip == ('abcdefghijk',)
+
+
+def test_worker_calls_reuse_one_engine(database):
+    repository.save_collected_videos([{'video_id': 'abcdefghijk', 'title': "Gol"}], source='manual')
+    repository.save_collected_videos([{'video_id': 'bcdefghijkl', 'title': "Lance"}], source='manual')
+    
+    assert repository._get_worker_runtime.cache_info().misses == 1
+    with sqlite3.connect(database) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM collected_videos").fetchone() == (2,)
+
+
+def test_overlapping_collections_register_each_video_once(database):
+    videos = [{'video_id': f"video{index:06d}", 'title': f"Vídeo {index}"} for index in range(20)]
+    
+    # Coletas simultâneas (ex: feed e busca manual) encontrando os mesmos vídeos novos
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(
+            lambda source: repository.save_collected_videos(videos, source=source),
+            ['incremental', 'manual', 'auto', 'manual'],
+        ))
+    
+    assert results == [20] * 4
+    with sqlite3.connect(database) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM collected_videos").fetchone() == (20,)
+    assert repository._get_worker_runtime.cache_info().misses == 1
@@ -0,0 +1,48 @@
+"""
+Testes dos checkpoints da detecção de cenas.
+"""
+
+import pytest
+from src.modules.scene_checkpoint import SceneCheckpointStore
+
+KEY = "detection-key"
+
+
+@pytest.fixture
+def store(redis_client):
+    return SceneCheckpointStore(redis_client, ttl_seconds=60, lock_seconds=30)
+
+
+def test_concurrent_task_cannot_take_the_detection(store):
+    assert store.acquire(KEY, 'task-1')
+    assert not store.acquire(KEY, 'task-2')
+    
+    # Retry da mesma task mantém a reserva
+    assert store.acquire(KEY, 'task-1')
+
+
+def test_release_frees_the_detection_only_for_its_owner(store):
+    store.acquire(KEY, 'task-1')
+    
+    store.release(KEY, 'task-2')
+    assert not store.acquire(KEY, 'task-2')
+    
+    store.release(KEY, 'task-1')
+    assert store.acquire(KEY, 'task-2')
+
+
+def test_checkpoint_renews_the_reservation(store, redis_client):
+    store.acquire(KEY, 'task-1')
+    redis_client.expire(store.LOCK_KEY_PREFIX + KEY, 1)
+    
+    store.save(KEY, 'task-1', frame=120, cuts=[40, 80], task_kwargs={'video_path': 'video.mp4'})
+    
+    assert redis_client.ttl(store.LOCK_KEY_PREFIX + KEY) > 1
+    assert store.load_for_task('task-1')['cuts'] == [40, 80]
+
+
+def test_expired_reservation_can_be_taken_over(store, redis_client):
+    store.acquire(KEY, 'task-1')
+    redis_client.delete(store.LOCK_KEY_PREFIX + KEY)  # reserva vencida: o worker caiu
+    
+    assert store.acquire(KEY, 'task-2')
@@ -0,0 +1,60 @@
+"""
+Testes do reaproveitamento de vídeos já baixados.
+"""
+
+import pytest
+from src.modules.video_index import VideoIndex
+from src.modules.youtube_downloader import YouTubeDownloader
+from src.tasks_download import _find_existing_download
+
+VIDEO_ID = "abcDEF12345"
+VIDEO_URL = f"https://www.youtube.com/watch?v={VIDEO_ID}"
+
+
+@pytest.fixture
+def downloader(tmp_path):
+    return YouTubeDownloader(output_path=str(tmp_path))
+
+
+@pytest.fixture
+def index(redis_client):
+    return VideoIndex(redis_client)
+
+
+def _record(index, tmp_path, format_choice):
+    filename = tmp_path / f"{VIDEO_ID}.mp4"
+    filename.write_bytes(b'video')
+    index.record_download({
+        'status': 'success',
+        'video_id': VIDEO_ID,
+        'filename': str(filename),
+        'file_size': 5,
+        'format_choice': format_choice,
+        'url': VIDEO_URL,
+    })
+
+
+def test_download_is_reused_for_the_same_format(downloader, index, tmp_path):
+    _record(index, tmp_path, 'bestvideo[height<=1080]+bestaudio')
+    
+    existing = _find_existing_download(downloader, index, VIDEO_URL, 'bestvideo[height<=1080]+bestaudio')
+    
+    assert existing['already_downloaded']
+    assert existing['filename'] == str(tmp_path / f"{VIDEO_ID}.mp4")
+
+
+@pytest.mark.parametrize('format_choice', ['bestaudio', 'best'])
+def test_download_of_another_format_is_not_reused(downloader, index, tmp_path, format_choice):
+    _record(index, tmp_path, 'worst[height<=360]')
+    
+    assert _find_existing_download(downloader, index, VIDEO_URL, format_choice) is None
+
+
+def test_unindexed_file_counts_as_the_default_format(downloader, index, tmp_path):
+    (tmp_path / f"{VIDEO_ID}.mp4").write_bytes(b'video')
+    
+    assert _find_existing_download(downloader, index, VIDEO_URL, 'bestaudio') is None
+    
+    existing = _find_existing_download(downloader, index, VIDEO_URL)
+    assert existing['already_downloaded']
+    assert index.get_download(VIDEO_ID)['format_choice'] == 'best'
@@ -0,0 +1,188 @@
+"""
+Testes do cliente da YouTube Data API v3, contra uma API local.
+"""
+
+import json
+import pytest
+from src.modules.youtube_data_api import (
+    MAX_IDS_PER_REQUEST,
+    YouTubeAPIError,
+    YouTubeDataAPIClient,
+    parse_iso8601_duration,
+)
+
+API_KEY = "test-key"
+
+
+def json_response(data: dict, status: int = 200):
+    return status, {'Content-Type': 'application/json'}, json.dumps(data).encode()
+
+
+def video_item(video_id: str, duration: str = "PT5M", published_at: str = "2025-01-01T10:00:00Z") -> dict:
+    """Item de videos.list no formato da API."""
+    return {
+        'id': video_id,
+        'snippet': {'title': f"Vídeo {video_id}", 'channelTitle': "Canal", 'publishedAt': published_at},
+        'contentDetails': {'duration': duration},
+        'statistics': {'viewCount': "10", 'likeCount': "2"},
+    }
+
+
+class FakeDataAPI:
+    """
+    API local com search.list paginado por canal e videos.list.
+    
+    `channels` mapeia channelId (ou None, sem canal) para as páginas de IDs
+    da busca; `videos` mapeia o ID do vídeo para o item de videos.list.
+    """
+    
+    def __init__(self, channels: dict, videos: dict):
+        self.channels = channels
+        self.videos = videos
+    
+    def __call__(self, request: dict):
+        params = request['params']
+        if request['path'] == '/search':
+            pages = self.channels[params.get('channelId')]
+            page = int(params.get('pageToken', 0))
+            data = {'items': [{'id': {'kind': 'youtube#video', 'videoId': video_id}} for video_id in pages[page]]}
+            if page + 1 < len(pages):
+                data['nextPageToken'] = str(page + 1)
+            return json_response(data)
+        if request['path'] == '/videos':
+            ids = params['id'].split(',')
+            return json_response({'items': [self.videos[video_id] for video_id in ids if video_id in self.videos]})
+        return json_response({'error': {'code': 404, 'message': 'Not Found'}}, 404)
+
+
+@pytest.fixture
+def client(local_server):
+    api_client = YouTubeDataAPIClient(base_url=local_server.url)
+    yield api_client
+    api_client.close()
+
+
+@pytest.mark.parametrize('value, expected', [
+    ("PT1H2M3S", 3723),
+    ("PT45S", 45),
+    ("PT10M", 600),
+    ("P1DT1M", 86460),
+    ("P0D", 0),
+    ("invalid", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_iso8601_duration(value, expected):
+    assert parse_iso8601_duration(value) == expected
+
+
+def test_search_follows_pages_until_max_results(client, local_server):
+    ids = [f"vid{index:08d}" for index in range(6)]
+    local_server.handler = FakeDataAPI(
+        channels={None: [ids[0:2], ids[2:4], ids[4:6]]},
+        videos={video_id: video_item(video_id) for video_id in ids},
+    )
+    
+    videos = client.search_videos(API_KEY, "gol", max_results=3)
+    
+    assert [video['video_id'] for video in videos] == ids[:3]
+    searches = local_server.requests_to('/search')
+    assert len(searches) == 2
+    assert 'pageToken' not in searches[0]['params']
+    assert searches[1]['params']['pageToken'] == "1"
+    assert searches[0]['params']['key'] == API_KEY
+    assert searches[0]['params']['q'] == "gol"
+
+
+def test_search_stops_without_next_page(client, local_server):
+    ids = ["vid00000001", "vid00000002"]
+    local_server.handler = FakeDataAPI(
+        channels={None: [ids]},
+        videos={video_id: video_item(video_id) for video_id in ids},
+    )
+    
+    videos = client.search_videos(API_KEY, "gol", max_results=20)
+    
+    assert len(videos) == 2
+    assert len(local_server.requests_to('/search')) == 1
+
+
+def test_search_filters_by_max_duration(client, local_server):
+    local_server.handler = FakeDataAPI(
+        channels={None: [["short000001", "long0000001"]]},
+        videos={
+            'short000001': video_item('short000001', duration="PT4M"),
+            'long0000001': video_item('long0000001', duration="PT1H"),
+        },
+    )
+    
+    videos = client.search_videos(API_KEY, "gol", max_duration=10)
+    
+    assert [video['video_id'] for video in videos] == ['short000001']
+    assert videos[0]['duration'] == 240
+
+
+def test_get_videos_batches_ids_by_50(client, local_server):
+    ids = [f"vid{index:08d}" for index in range(120)]
+    missing = ids[7]
+    local_server.handler = FakeDataAPI(
+        channels={},
+        videos={video_id: video_item(video_id) for video_id in ids if video_id != missing},
+    )
+    
+    videos = client.get_videos(API_KEY, ids)
+    
+    batches = [request['params']['id'].split(',') for request in local_server.requests_to('/videos')]
+    assert [len(batch) for batch in batches] == [MAX_IDS_PER_REQUEST, MAX_IDS_PER_REQUEST, 20]
+    assert [video['video_id'] for video in videos] == [video_id for video_id in ids if video_id != missing]
+    assert videos[0]['view_count'] == 10
+    assert videos[0]['comment_count'] is None
+    assert videos[0]['upload_date'] == "20250101"
+
+
+def test_multi_channel_search_returns_every_channel(client, local_server):
+    local_server.handler = FakeDataAPI(
+        channels={
+            'UCa': [["a0000000001", "a0000000002"]],
+            'UCb': [["b0000000001", "b0000000002"]],
+        },
+        videos={
+            'a0000000001': video_item('a0000000001', published_at="2025-01-04T10:00:00Z"),
+            'a0000000002': video_item('a0000000002', published_at="2025-01-01T10:00:00Z"),
+            'b0000000001': video_item('b0000000001', published_at="2025-01-03T10:00:00Z"),
+            'b0000000002': video_item('b0000000002', published_at="2025-01-02T10:00:00Z"),
+        },
+    )
+    
+    by_date = client.search_videos(API_KEY, "gol", channel_ids=['UCa', 'UCb'], filter_by='date', max_results=3)
+    by_relevance = client.search_videos(API_KEY, "gol", channel_ids=['UCa', 'UCb'], max_results=3)
+    
+    assert [video['video_id'] for video in by_date] == ['a0000000001', 'b0000000001', 'b0000000002']
+    assert [video['video_id'] for video in by_relevance] == ['a0000000001', 'b0000000001', 'a0000000002']
+
+
+def test_api_error_is_mapped_to_youtube_api_error(client, local_server):
+    local_server.handler = lambda request: json_response({
+        'error': {
+            'code': 403,
+            'message': 'The request cannot be completed because you have exceeded your quota.',
+            'errors': [{'reason': 'quotaExceeded', 'domain': 'youtube.quota'}],
+        },
+    }, 403)
+    
+    with pytest.raises(YouTubeAPIError) as excinfo:
+        client.search_videos(API_KEY, "gol")
+    
+    assert excinfo.value.status_code == 403
+    assert excinfo.value.reason == 'quotaExceeded'
+    assert 'exceeded your quota' in str(excinfo.value)
+
+
+def test_non_json_error_is_mapped_to_youtube_api_error(client, local_server):
+    local_server.handler = lambda request: (502, {'Content-Type': 'text/html'}, b'<html>Bad Gateway</html>')
+    
+    with pytest.raises(YouTubeAPIError) as excinfo:
+        client.get_videos(API_KEY, ["vid00000001"])
+    
+    assert excinfo.value.status_code == 502
+    assert excinfo.value.reason == ''
@@ -0,0 +1,31 @@
+"""
+Testes da localização de vídeos já baixados na biblioteca.
+"""
+
+import pytest
+from src.modules.youtube_downloader import YouTubeDownloader
+
+VIDEO_ID = "abcDEF12345"
+
+
+@pytest.mark.parametrize('intermediate', [
+    f"{VIDEO_ID}.mp4.part",
+    f"{VIDEO_ID}.mp4.ytdl",
+    f"{VIDEO_ID}.mp4.part-Frag3",
+    f"{VIDEO_ID}.f137.mp4",
+    f"{VIDEO_ID}.f251.webm",
+    f"{VIDEO_ID}.temp.mp4",
+])
+def test_find_downloaded_file_ignores_yt_dlp_intermediates(tmp_path, intermediate):
+    (tmp_path / intermediate).write_bytes(b'')
+    
+    assert YouTubeDownloader(output_path=str(tmp_path)).find_downloaded_file(VIDEO_ID) is None
+
+
+def test_find_downloaded_file_returns_final_file(tmp_path):
+    (tmp_path / f"{VIDEO_ID}.f137.mp4").write_bytes(b'')
+    (tmp_path / f"{VIDEO_ID}.mp4").write_bytes(b'')
+    
+    found = YouTubeDownloader(output_path=str(tmp_path)).find_downloaded_file(VIDEO_ID)
+    
+    assert found == str(tmp_path / f"{VIDEO_ID}.mp4")
@@ -9,6 +9,8 @@ const CollectForm = ({ onTaskCreated }) => {
   const [filterBy, setFilterBy] = useState('relevance');
   const [timeRange, setTimeRange] = useState('any');
   const [maxDuration, setMaxDuration] = useState('');
+  const [maxResults, setMaxResults] = useState('');
+  const [excludeSeen, setExcludeSeen] = useState(false);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
 
@@ -38,6 +40,8 @@ const CollectForm = ({ onTaskCreated }) => {
         filter_by: filterBy,
         time_range: timeRange,
         max_duration: maxDuration ? parseInt(maxDuration) : null,
+        max_results: maxResults ? parseInt(maxResults) : null,
+        exclude_seen: excludeSeen,
       };
 
       const response = await axios.post(
@@ -51,6 +55,7 @@ const CollectForm = ({ onTaskCreated }) => {
         setSearchQuery('');
         setSelectedChannels([]);
         setMaxDuration('');
+        setMaxResults('');
       }
     } catch (err) {
       setError(err.response?.data?.detail || 'Erro ao iniciar coleta');
@@ -88,6 +93,15 @@ const CollectForm = ({ onTaskCreated }) => {
             />
             Automático
           </label>
+          <label className="toggle-label">
+            <input
+              type="radio"
+              value="incremental"
+              checked={mode === 'incremental'}
+              onChange={(e) => setMode(e.target.value)}
+            />
+            Novos uploads
+          </label>
         </div>
       </div>
 
@@ -172,6 +186,36 @@ const CollectForm = ({ onTaskCreated }) => {
         </div>
       )}
 
+      {/* Número de Resultados */}
+      {mode !== 'incremental' && (
+        <div className="form-group">
+          <label htmlFor="max-results">
+            {mode === 'manual' ? 'Número de Resultados' : 'Resultados por Busca'}
+          </label>
+          <input
+            id="max-results"
+            type="number"
+            value={maxResults}
+            onChange={(e) => setMaxResults(e.target.value)}
+            placeholder={mode === 'manual' ? 'Ex: 20' : 'Ex: 10'}
+            min="1"
+            max="500"
+          />
+        </div>
+      )}
+
+      {/* Vídeos já vistos */}
+      <div className="form-group">
+        <label className="checkbox-label">
+          <input
+            type="checkbox"
+            checked={excludeSeen}
+            onChange={(e) => setExcludeSeen(e.target.checked)}
+          />
+          Ocultar vídeos já coletados ou baixados
+        </label>
+      </div>
+
       {/* Botão de Envio */}
       <button
         type="submit"
@@ -79,6 +79,10 @@ const SceneDetectionPanel = () => {
             clearInterval(interval);
           } else if (data.status === 'PROGRESS') {
             setTaskStatus(`Processando: ${data.progress}% - ${data.status_message}`);
+            // Cenas já encontradas enquanto a detecção continua
+            if (data.scenes && data.scenes.length > 0) {
+              setScenes(data.scenes);
+            }
           }
         } catch (err) {
           console.error('Erro ao verificar status da tarefa:', err);
@@ -126,10 +130,12 @@ const SceneDetectionPanel = () => {
             >
               <option value="adaptive">AdaptiveDetector (Recomendado para Esportes)</option>
               <option value="content">ContentDetector (Cortes Rápidos)</option>
+              <option value="two_pass">Duas Passadas (planos longos)</option>
+              <option value="numpy">Vetorizado NumPy (Experimental)</option>
             </select>
           </div>
 
-          {method === 'adaptive' && (
+          {(method === 'adaptive' || method === 'two_pass') && (
             <div className="form-group">
               <label htmlFor="adaptive-threshold">Adaptive Threshold:</label>
               <input
@@ -144,7 +150,7 @@ const SceneDetectionPanel = () => {
             </div>
           )}
 
-          {method === 'content' && (
+          {(method === 'content' || method === 'numpy') && (
             <div className="form-group">
               <label htmlFor="content-threshold">Content Threshold:</label>
               <input
@@ -129,6 +129,7 @@ const StatusPanel = ({ taskId, onClose, onCollectComplete }) => {
                   {result.videos.slice(0, 5).map((video, index) => (
                     <li key={index}>
                       <strong>{video.title}</strong>
+                      {video.seen && <small> (já visto)</small>}
                       <br />
                       <small>Canal: {video.channel}</small>
                       <br />